@@ -0,0 +1,25 @@
+-- --------------------------------------------------------
+-- Migration 001: unique bid_no + InnoDB for `contracts`
+--
+-- Lets Phase 1 upsert (INSERT ... ON DUPLICATE KEY UPDATE) so reruns only
+-- add new contracts and keep download_link / seller columns already filled.
+-- ContractsController applies the same steps automatically on startup;
+-- this file is for running it by hand (phpMyAdmin / mysql CLI).
+-- --------------------------------------------------------
+
+-- 1. Drop duplicate bid_no rows, keeping the one with the most progress
+--    (already downloaded first, then the oldest row)
+DELETE c
+FROM contracts c
+JOIN contracts k
+  ON k.bid_no = c.bid_no
+ AND (
+      (k.download_link IS NOT NULL) > (c.download_link IS NOT NULL)
+   OR ((k.download_link IS NOT NULL) = (c.download_link IS NOT NULL) AND k.id < c.id)
+ );
+
+-- 2. Transactional engine (row locks, crash safety)
+ALTER TABLE contracts ENGINE=InnoDB;
+
+-- 3. One row per contract
+ALTER TABLE contracts ADD UNIQUE KEY uq_contracts_bid_no (bid_no);
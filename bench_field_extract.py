@@ -0,0 +1,127 @@
+"""
+Phase 3: Field Extraction Benchmark
+Times the seller field extraction of run_phase3_json_to_csv.py (text
+fields as one dict, unit price through the header-column lookup) against
+the original implementation, over the bundled data/ContractJSON.zip corpus
+(and optionally a directory of fresh extraction output), and checks both
+give the same CSV row for every document.
+
+Usage:
+    python bench_field_extract.py [--zip data/ContractJSON.zip] [--json data/JSON] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+import zipfile
+from pathlib import Path
+
+from run_phase3_json_to_csv import (CSV_HEADERS, PRICE_CELL_RE, extract_contract_number,
+                                    extract_email, extract_seller_id, extract_seller_info_from_data,
+                                    extract_seller_name, iter_extracted, normalize_for_match)
+
+CORPUS_ZIP = "data/ContractJSON.zip"
+
+
+# --------------------------------------------------
+# ORIGINAL IMPLEMENTATION (before find_price_column / extract_text_fields)
+# --------------------------------------------------
+def legacy_unit_price_from_tables(tables, doubled=True):
+    if not tables:
+        return None
+    for table in tables:
+        table_data = table.get('data', [])
+        if not table_data:
+            continue
+        unit_price_col_idx = -1
+        header_row_idx = -1
+        for row_idx, row in enumerate(table_data):
+            for col_idx, cell in enumerate(row):
+                if not cell:
+                    continue
+                norm_cell = normalize_for_match(cell, doubled)
+                if "unitprice" in norm_cell or ("price" in norm_cell and "total" not in norm_cell):
+                    unit_price_col_idx = col_idx
+                    header_row_idx = row_idx
+                    break
+            if unit_price_col_idx != -1:
+                break
+        if unit_price_col_idx != -1 and header_row_idx != -1:
+            for row_idx in range(header_row_idx + 1, len(table_data)):
+                row = table_data[row_idx]
+                if unit_price_col_idx < len(row):
+                    price_cell = row[unit_price_col_idx].strip()
+                    if price_cell and PRICE_CELL_RE.match(price_cell):
+                        try:
+                            price_num = float(price_cell.replace(',', ''))
+                            if price_num > 0:
+                                return price_cell
+                        except ValueError:
+                            continue
+    return None
+
+
+def legacy_seller_info(data, source_name=""):
+    text_content = data.get('text_content', '')
+    tables = data.get('tables', [])
+    doubled = not data.get('char_dedupe', False)
+    result = {
+        "bid_no": extract_contract_number(text_content, doubled) or "",
+        "seller_id": extract_seller_id(text_content, doubled) or "",
+        "seller_name": extract_seller_name(text_content, doubled) or "",
+        "seller_email": extract_email(text_content, doubled) or "",
+        "unit_price": legacy_unit_price_from_tables(tables, doubled) or ""
+    }
+    if not result['bid_no'] and source_name.startswith('GEMC-'):
+        result['bid_no'] = source_name
+    return result
+
+
+def load_zip(zip_path):
+    with zipfile.ZipFile(zip_path) as zf:
+        return [(Path(name).stem, json.loads(zf.read(name)))
+                for name in zf.namelist() if name.endswith(".json")]
+
+
+def timed(fn, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, data in docs:
+            fn(data, name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label, docs, repeat):
+    mismatches = []
+    for name, data in docs:
+        old, new = legacy_seller_info(data, name), extract_seller_info_from_data(data, name)
+        mismatches.extend(f"{name}.{field}: {old[field]!r} != {new[field]!r}"
+                          for field in CSV_HEADERS if old[field] != new[field])
+    t_old = timed(legacy_seller_info, docs, repeat)
+    t_new = timed(extract_seller_info_from_data, docs, repeat)
+    print(f"{label:<34}{len(docs):>6}{t_old * 1000:>12.2f}ms{t_new * 1000:>10.2f}ms"
+          f"{t_old / t_new:>9.1f}x{len(mismatches):>12}")
+    for line in mismatches[:10]:
+        print(f"   ✗ {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark seller field extraction")
+    parser.add_argument("--zip", default=CORPUS_ZIP, help="ZIP of extracted JSON files")
+    parser.add_argument("--json", default=None, help="also a directory of extraction output (JSON/JSONL)")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per timing (best is kept)")
+    args = parser.parse_args()
+
+    print("=" * 84)
+    print(f"{'corpus':<34}{'docs':>6}{'original':>14}{'new':>12}{'speedup':>10}{'mismatches':>12}")
+    print("-" * 84)
+    report(args.zip, load_zip(args.zip), args.repeat)
+    if args.json:
+        report(args.json, list(iter_extracted(args.json)), args.repeat)
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
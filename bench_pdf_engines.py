@@ -0,0 +1,137 @@
+"""
+Phase 3: PDF Engine Benchmark
+Runs every installed extraction engine (service/pdf_engines.py) over the
+bundled data/ContractPDF.zip corpus and reports, per engine:
+  - pages/sec and docs/sec
+  - peak memory of the process that ran it (one fresh process per engine)
+  - field-extraction agreement with pdfplumber (the fields written to
+    seller_info.csv by run_phase3_json_to_csv.py)
+
+Usage:
+    python bench_pdf_engines.py [--zip data/ContractPDF.zip] [--engines pymupdf pdfminer]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from pathlib import Path
+
+from service.pdf_engines import ENGINES, available_engines
+from service.pdf_sources import list_sources, open_source, source_name
+from run_phase3_json_to_csv import CSV_HEADERS, extract_seller_info_from_data
+
+CORPUS_ZIP = "data/ContractPDF.zip"
+REFERENCE_ENGINE = "pdfplumber"
+
+
+def peak_memory_mb():
+    """Peak RSS of the current process in MB (None if unavailable)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except (ImportError, AttributeError):
+            return None
+
+
+def run_engine(name, pdf_paths, conn):
+    """Child process: extract every PDF and send timings + fields back."""
+    engine = ENGINES[name]
+    fields = {}
+    pages = 0
+    start = time.perf_counter()
+    for pdf_path in pdf_paths:
+        # Read straight from the archive, as run_phase3_extract_pdf_v2.py --input does
+        with open_source(pdf_path) as pdf:
+            data = engine.extract(pdf)
+        pages += data["total_pages"]
+        stem = Path(source_name(pdf_path)).stem
+        fields[stem] = extract_seller_info_from_data(data, stem)
+    elapsed = time.perf_counter() - start
+    conn.send({"seconds": elapsed, "pages": pages, "docs": len(pdf_paths),
+               "peak_mb": peak_memory_mb(), "fields": fields})
+    conn.close()
+
+
+def benchmark(engine_name, pdf_paths):
+    # A fresh process per engine keeps peak memory figures separate
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=run_engine, args=(engine_name, pdf_paths, child))
+    proc.start()
+    child.close()
+    result = parent.recv()
+    proc.join()
+    return result
+
+
+def agreement(fields, reference):
+    """Share of documents where each field equals the reference engine's value."""
+    scores = {}
+    for field in CSV_HEADERS:
+        same = sum(1 for doc, ref in reference.items()
+                   if fields.get(doc, {}).get(field, "") == ref[field])
+        scores[field] = same / len(reference) if reference else 0.0
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction engines")
+    parser.add_argument("--zip", default=CORPUS_ZIP, help="ZIP of contract PDFs")
+    parser.add_argument("--engines", nargs="*", default=None,
+                        help="engines to run (default: all installed)")
+    parser.add_argument("--report", default=None, help="also write results as JSON here")
+    args = parser.parse_args()
+
+    engines = args.engines or available_engines()
+    missing = [e for e in engines if e not in ENGINES or not ENGINES[e].available]
+    if missing:
+        print(f"✗ Not installed / unknown: {', '.join(missing)}")
+        engines = [e for e in engines if e not in missing]
+    if REFERENCE_ENGINE not in engines and ENGINES[REFERENCE_ENGINE].available:
+        engines.insert(0, REFERENCE_ENGINE)
+    if not engines:
+        print("✗ No PDF engines installed")
+        return
+
+    pdf_paths = sorted(list_sources([args.zip]))
+    print(f"📚 Corpus: {args.zip} ({len(pdf_paths)} PDFs)")
+    print("=" * 96)
+
+    results = {}
+    for name in engines:
+        print(f"  ⏱️  {name} ...", flush=True)
+        results[name] = benchmark(name, pdf_paths)
+
+    reference = results.get(REFERENCE_ENGINE, {}).get("fields")
+    print("\n" + "=" * 96)
+    header = f"{'engine':<20}{'pages/s':>9}{'docs/s':>9}{'peak MB':>9}  " + \
+             "  ".join(f"{h[:11]:>11}" for h in CSV_HEADERS)
+    print(header)
+    print("-" * len(header))
+    report = {}
+    for name, res in results.items():
+        scores = agreement(res["fields"], reference) if reference else {}
+        peak = f"{res['peak_mb']:.0f}" if res["peak_mb"] is not None else "n/a"
+        print(f"{name:<20}{res['pages'] / res['seconds']:>9.1f}{res['docs'] / res['seconds']:>9.1f}"
+              f"{peak:>9}  " + "  ".join(f"{scores.get(h, 0) * 100:>10.0f}%" for h in CSV_HEADERS))
+        report[name] = {k: v for k, v in res.items() if k != "fields"}
+        report[name]["agreement"] = scores
+    print("=" * 96)
+    print(f"Agreement = % of documents whose field equals {REFERENCE_ENGINE}'s value")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Phase 3: Text Normalization Benchmark
+Times service/text_normalize.py against the original per-character
+implementation over every text line and table cell in the bundled
+data/ContractJSON.zip corpus, and checks both give the same answers.
+
+Usage:
+    python bench_text_normalize.py [--zip data/ContractJSON.zip] [--repeat 5]
+"""
+
+import argparse
+import json
+import re
+import time
+import zipfile
+
+from service.text_normalize import clean_english_text, is_english_text, strip_cid
+
+CORPUS_ZIP = "data/ContractJSON.zip"
+
+
+# --------------------------------------------------
+# ORIGINAL IMPLEMENTATION (before service/text_normalize.py)
+# --------------------------------------------------
+def legacy_is_english_text(text: str) -> bool:
+    if not text or not text.strip():
+        return False
+    cleaned_text = re.sub(r'[^\w\s]', '', text)
+    if not cleaned_text:
+        return False
+    english_chars = sum(1 for c in cleaned_text if ord(c) < 128 and (c.isalnum() or c.isspace()))
+    total_chars = len(cleaned_text)
+    if total_chars > 0:
+        return (english_chars / total_chars) > 0.7
+    return False
+
+
+def legacy_clean_english_text(text: str) -> str:
+    if not text:
+        return ""
+    lines = text.split('\n')
+    english_lines = []
+    for line in lines:
+        line = line.strip()
+        if line and legacy_is_english_text(line):
+            clean_line = ''.join(char if ord(char) < 128 else ' ' for char in line)
+            clean_line = ' '.join(clean_line.split())
+            if clean_line:
+                english_lines.append(clean_line)
+    return '\n'.join(english_lines)
+
+
+def load_corpus(zip_path):
+    """Text blocks (documents and table cells) from the JSON corpus."""
+    blocks = []
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in zf.namelist():
+            if not name.endswith(".json"):
+                continue
+            data = json.loads(zf.read(name))
+            blocks.append(data.get("text_content", ""))
+            for table in data.get("tables", []):
+                blocks.extend(cell for row in table["data"] for cell in row if cell)
+    return blocks
+
+
+def timed(fn, blocks, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in blocks:
+            fn(block)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text normalization")
+    parser.add_argument("--zip", default=CORPUS_ZIP, help="ZIP of extracted JSON files")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing (best is kept)")
+    args = parser.parse_args()
+
+    blocks = load_corpus(args.zip)
+    lines = [line for block in blocks for line in block.split("\n")]
+    chars = sum(len(block) for block in blocks)
+    print(f"📚 Corpus: {args.zip} ({len(blocks)} blocks, {len(lines)} lines, {chars:,} chars)")
+
+    # Same answers: is_english_text is a drop-in; clean_english_text also
+    # strips CID tokens, so compare against the original on stripped input
+    mismatches = sum(1 for line in lines if is_english_text(line) != legacy_is_english_text(line))
+    mismatches += sum(1 for block in blocks
+                      if clean_english_text(block) != legacy_clean_english_text(strip_cid(block)))
+    print(f"   Mismatches vs original: {mismatches}")
+
+    print("=" * 70)
+    print(f"{'function':<22}{'original':>12}{'new':>12}{'speedup':>10}")
+    print("-" * 70)
+    for name, old, new, data in (
+        ("is_english_text", legacy_is_english_text, is_english_text, lines),
+        ("clean_english_text", legacy_clean_english_text, clean_english_text, blocks),
+    ):
+        t_old = timed(old, data, args.repeat)
+        t_new = timed(new, data, args.repeat)
+        print(f"{name:<22}{t_old * 1000:>10.1f}ms{t_new * 1000:>10.1f}ms{t_old / t_new:>9.1f}x")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
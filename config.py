@@ -10,3 +10,17 @@ VIEWPORT = {
     "width": 1280,
     "height": 800
 }
+
+# --------------------------------------------------
+# DATABASE (shared by every phase via service/database.py)
+# --------------------------------------------------
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "tender_automation_with_ai"
+}
+
+DB_POOL_SIZE = 5              # connections per process (mysql.connector max: 32)
+DB_POOL_TIMEOUT = 30          # seconds to wait for a free pooled connection
+DB_SLOW_QUERY_SECONDS = 1.0   # queries slower than this are logged
@@ -0,0 +1,274 @@
+"""
+Phase 1 Worker Mode: Category Leases
+Categories live in the `category_leases` work table as (category, date-window)
+units. Any number of Phase 1 workers (one host or several) lease a unit,
+heartbeat while scraping it and mark it done. A worker that crashes simply
+stops heartbeating; once its lease expires the unit is handed to another
+worker.
+"""
+
+import os
+import socket
+import threading
+import uuid
+from datetime import date, datetime, timedelta
+
+from mysql.connector import Error
+
+from service.database import get_db
+
+
+LEASE_TTL_SECONDS = 180       # lease is lost if not renewed within this time
+HEARTBEAT_INTERVAL = 30       # seconds between lease renewals
+MAX_ATTEMPTS = 6              # same budget as ContractsController.max_retries
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def month_to_date_window(today=None):
+    """Default window used by Phase 1: 1st of the current month → today."""
+    to_date = today or date.today()
+    return to_date.replace(day=1), to_date
+
+
+def split_window(from_date, to_date, window_days=None):
+    """Split [from_date, to_date] into consecutive windows of window_days."""
+    if not window_days:
+        return [(from_date, to_date)]
+
+    windows = []
+    start = from_date
+    while start <= to_date:
+        end = min(start + timedelta(days=window_days - 1), to_date)
+        windows.append((start, end))
+        start = end + timedelta(days=1)
+    return windows
+
+
+class LeaseLost(Exception):
+    """Raised when another worker has taken over our unit."""
+
+
+class CategoryLeaseQueue:
+    def __init__(self, worker_id=None, ttl=LEASE_TTL_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.worker_id = worker_id or default_worker_id()
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+
+        self.db = get_db()
+        self._create_table()
+        print(f"[LEASE] ✅ Ready as worker {self.worker_id}")
+
+    # --------------------------------------------------
+    # DATABASE
+    # --------------------------------------------------
+    def _create_table(self):
+        # InnoDB is required for row locks (FOR UPDATE SKIP LOCKED)
+        self.db.execute("""
+        CREATE TABLE IF NOT EXISTS category_leases (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            category_name VARCHAR(255) NOT NULL,
+            from_date DATE NOT NULL,
+            to_date DATE NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            worker_id VARCHAR(100),
+            lease_expires_at DATETIME,
+            attempts INT NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_category_window (category_name, from_date, to_date),
+            KEY idx_status_expiry (status, lease_expires_at)
+        ) ENGINE=InnoDB
+        """)
+
+    def close(self):
+        # Connections belong to the shared pool; nothing to tear down
+        pass
+
+    # --------------------------------------------------
+    # SEEDING
+    # --------------------------------------------------
+    def seed(self, category_names, from_date=None, to_date=None, window_days=None):
+        """Insert (category, window) units. Existing units are left untouched."""
+        if from_date is None or to_date is None:
+            from_date, to_date = month_to_date_window()
+
+        windows = split_window(from_date, to_date, window_days)
+        rows = [
+            (name.strip(), start, end)
+            for name in category_names if name and name.strip()
+            for start, end in windows
+        ]
+        if not rows:
+            return 0
+
+        added = self.db.executemany("""
+            INSERT IGNORE INTO category_leases (category_name, from_date, to_date)
+            VALUES (%s, %s, %s)
+        """, rows)
+
+        print(f"[LEASE] 🌱 Seeded {added} new unit(s) "
+              f"({len(windows)} window(s) × {len(rows) // len(windows)} categories)")
+        return added
+
+    def add_category(self, name):
+        """Enqueue a category discovered from the select2 suggestions."""
+        return self.seed([name])
+
+    # --------------------------------------------------
+    # LEASING
+    # --------------------------------------------------
+    def lease(self):
+        """
+        Atomically claim the next pending (or expired) unit.
+        Returns a dict with id, category_name, from_date, to_date, attempts
+        or None when there is no work left. Expired leases that have used
+        up their attempts (their worker crashed on the last one) are marked
+        'failed' in the same transaction instead of staying 'leased'.
+        """
+        with self.db.transaction(dictionary=True) as cur:
+            cur.execute("""
+                SELECT id, category_name, from_date, to_date, attempts, worker_id
+                FROM category_leases
+                WHERE status = 'leased' AND lease_expires_at < NOW() AND attempts >= %s
+                FOR UPDATE SKIP LOCKED
+            """, (self.max_attempts,))
+            exhausted = cur.fetchall()
+            for dead in exhausted:
+                cur.execute("""
+                    UPDATE category_leases
+                    SET status = 'failed', worker_id = NULL, lease_expires_at = NULL,
+                        last_error = %s
+                    WHERE id = %s
+                """, (f"lease expired on the last attempt (worker {dead['worker_id']})", dead["id"]))
+                print(f"[LEASE] 🛑 {dead['category_name']} ({format_window(dead)}) failed: "
+                      f"lease expired after {dead['attempts']}/{self.max_attempts} attempts")
+
+            cur.execute("""
+                SELECT id, category_name, from_date, to_date, attempts
+                FROM category_leases
+                WHERE attempts < %s
+                  AND (status = 'pending'
+                       OR (status = 'leased' AND lease_expires_at < NOW()))
+                ORDER BY attempts ASC, id ASC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            """, (self.max_attempts,))
+            unit = cur.fetchone()
+
+            if unit:
+                cur.execute("""
+                    UPDATE category_leases
+                    SET status = 'leased',
+                        worker_id = %s,
+                        lease_expires_at = NOW() + INTERVAL %s SECOND,
+                        attempts = attempts + 1
+                    WHERE id = %s
+                """, (self.worker_id, self.ttl, unit["id"]))
+                unit["attempts"] += 1
+
+        return unit
+
+    def renew(self, unit_id):
+        """Extend our lease. Returns False if the unit is no longer ours."""
+        updated = self.db.execute("""
+            UPDATE category_leases
+            SET lease_expires_at = NOW() + INTERVAL %s SECOND
+            WHERE id = %s AND worker_id = %s AND status = 'leased'
+        """, (self.ttl, unit_id, self.worker_id))
+        return updated > 0
+
+    def complete(self, unit):
+        self.db.execute("""
+            UPDATE category_leases
+            SET status = 'done', lease_expires_at = NULL, last_error = NULL
+            WHERE id = %s AND worker_id = %s
+        """, (unit["id"], self.worker_id))
+
+    def release(self, unit, error=None):
+        """
+        Give a unit back after a failure. It becomes 'pending' again until
+        max_attempts is reached, then 'failed'.
+        """
+        status = "pending" if unit["attempts"] < self.max_attempts else "failed"
+        self.db.execute("""
+            UPDATE category_leases
+            SET status = %s, worker_id = NULL, lease_expires_at = NULL, last_error = %s
+            WHERE id = %s AND worker_id = %s
+        """, (status, str(error)[:2000] if error else None, unit["id"], self.worker_id))
+        return status
+
+    def release_all(self):
+        """Hand back everything this worker still holds (clean shutdown)."""
+        self.db.execute("""
+            UPDATE category_leases
+            SET status = 'pending', worker_id = NULL, lease_expires_at = NULL,
+                attempts = GREATEST(attempts - 1, 0)
+            WHERE worker_id = %s AND status = 'leased'
+        """, (self.worker_id,))
+
+    # --------------------------------------------------
+    # STATUS
+    # --------------------------------------------------
+    def summary(self):
+        rows = self.db.fetchall(
+            "SELECT status, COUNT(*) FROM category_leases GROUP BY status", dictionary=False
+        )
+        return dict(rows)
+
+    def heartbeat(self, unit):
+        return LeaseHeartbeat(self, unit)
+
+
+class LeaseHeartbeat:
+    """
+    Renews a lease from a background thread while the browser thread works.
+    Each renewal checks out its own pooled connection.
+
+        with queue.heartbeat(unit) as hb:
+            ...scrape...
+            hb.check()   # raises LeaseLost if another worker took over
+    """
+
+    def __init__(self, queue, unit, interval=HEARTBEAT_INTERVAL):
+        self.queue = queue
+        self.unit = unit
+        self.interval = min(interval, max(queue.ttl // 3, 1))
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not self.queue.renew(self.unit["id"]):
+                    self.lost = True
+                    print(f"[LEASE] ⚠️ Lease lost → {self.unit['category_name']}")
+                    return
+        except Error as e:
+            # The lease will simply expire and be picked up again
+            print(f"[LEASE] ⚠️ Heartbeat stopped: {e}")
+
+    def check(self):
+        if self.lost:
+            raise LeaseLost(self.unit["category_name"])
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        return False
+
+
+def format_window(unit):
+    """'01-01-2026 → 15-01-2026' (the GeM date filter format)."""
+    def fmt(d):
+        if isinstance(d, datetime):
+            d = d.date()
+        return d.strftime("%d-%m-%Y")
+    return f"{fmt(unit['from_date'])} → {fmt(unit['to_date'])}"
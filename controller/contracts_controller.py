@@ -5,53 +5,88 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from PIL import Image
 
-import mysql.connector
-from mysql.connector import Error
-
+from service.batch_writer import BatchWriter
+from service.database import get_db
+from service.seen_bids import SeenBidIndex
 from solver.captcha_solver import ensemble_solve
 
 
-# --------------------------------------------------
-# DATABASE CONFIG
-# --------------------------------------------------
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",
-    "database": "tender_automation_with_ai"
-}
+CATEGORY_CSV = Path(__file__).resolve().parents[1] / "data" / "Datasets" / "categories.csv"
+
+
+# Idempotent on bid_no (uq_contracts_bid_no): a rerun refreshes the listing
+# columns of contracts it has already seen and never touches download_link
+# or the Phase 3 seller columns, so finished downloads/extractions are kept.
+# (Not with skip_known: bids already stored are then not upserted again.)
+INSERT_CONTRACT_SQL = """
+INSERT INTO contracts (
+    serial_no, category_name, bid_no,
+    product, brand, model,
+    ordered_quantity, price, total_value,
+    buyer_dept_org, organization_name, buyer_designation,
+    state, buyer_department, office_zone, buying_mode,
+    contract_date, order_status, download_link
+) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+ON DUPLICATE KEY UPDATE
+    product = VALUES(product),
+    brand = VALUES(brand),
+    model = VALUES(model),
+    ordered_quantity = VALUES(ordered_quantity),
+    price = VALUES(price),
+    total_value = VALUES(total_value),
+    buyer_dept_org = VALUES(buyer_dept_org),
+    organization_name = VALUES(organization_name),
+    buyer_designation = VALUES(buyer_designation),
+    state = VALUES(state),
+    buyer_department = VALUES(buyer_department),
+    office_zone = VALUES(office_zone),
+    buying_mode = VALUES(buying_mode),
+    contract_date = VALUES(contract_date),
+    order_status = VALUES(order_status)
+"""
+
+
+# A contract listed under several categories: one contract row, many links
+INSERT_CATEGORY_LINK_SQL = """
+INSERT IGNORE INTO contract_categories (bid_no, category_name)
+VALUES (%s,%s)
+"""
 
 
 class ContractsController:
-    def __init__(self, browser):
+    def __init__(self, browser, skip_known=False):
         self.browser = browser
         self.page = browser.page
 
-        base = Path(__file__).resolve().parents[1]
-        self.category_csv = base / "data" / "Datasets" / "categories.csv"
+        self.category_csv = CATEGORY_CSV
 
         self.categories = self._load_categories()
 
         self.retry_counts = {}
         self.max_retries = 6
 
-        self.db = self._connect_db()
+        # Set by run_worker(): discovered categories go to the lease table
+        self.lease_queue = None
+
+        self.db = get_db()
         self._create_table()
 
+        # Bids scraped this run, so overlapping categories don't re-insert them;
+        # skip_known also skips bids stored by earlier runs (no listing refresh)
+        self.seen_bids = SeenBidIndex(self.db, preload=skip_known)
+
+        # Rows are written behind the crawl by a background thread
+        self.writer = BatchWriter({
+            "contract": INSERT_CONTRACT_SQL,
+            "category_link": INSERT_CATEGORY_LINK_SQL,
+        }, name="contracts").start()
+        self._closed = False
+
     # --------------------------------------------------
     # DATABASE
     # --------------------------------------------------
-    def _connect_db(self):
-        try:
-            conn = mysql.connector.connect(**DB_CONFIG)
-            print("[DB] ✅ Connected")
-            return conn
-        except Error as e:
-            raise RuntimeError(e)
-
     def _create_table(self):
-        cur = self.db.cursor()
-        cur.execute("""
+        self.db.execute("""
         CREATE TABLE IF NOT EXISTS contracts (
             id INT AUTO_INCREMENT PRIMARY KEY,
             serial_no INT,
@@ -72,21 +107,86 @@ class ContractsController:
             buying_mode VARCHAR(100),
             contract_date VARCHAR(100),
             order_status VARCHAR(100),
-            download_link TEXT
-        )
+            download_link TEXT,
+            UNIQUE KEY uq_contracts_bid_no (bid_no)
+        ) ENGINE=InnoDB
+        """)
+        self._migrate_table()
+
+        self.db.execute("""
+        CREATE TABLE IF NOT EXISTS contract_categories (
+            bid_no VARCHAR(100) NOT NULL,
+            category_name VARCHAR(255) NOT NULL,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (bid_no, category_name)
+        ) ENGINE=InnoDB
+        """)
+        if not self.db.fetchone("SELECT 1 FROM contract_categories LIMIT 1", dictionary=False):
+            # First run with the link table: backfill from existing contracts
+            self.db.execute("""
+                INSERT IGNORE INTO contract_categories (bid_no, category_name)
+                SELECT bid_no, category_name FROM contracts
+                WHERE bid_no IS NOT NULL AND category_name IS NOT NULL
+            """)
+
+    def _migrate_table(self):
+        """
+        Bring tables created before the upsert change up to date
+        (same steps as SQL/migrations/001_contracts_unique_bid_no.sql).
+        """
+        info = self.db.fetchone("""
+            SELECT t.ENGINE AS engine,
+                   (SELECT COUNT(*) FROM information_schema.STATISTICS s
+                    WHERE s.TABLE_SCHEMA = t.TABLE_SCHEMA AND s.TABLE_NAME = t.TABLE_NAME
+                      AND s.INDEX_NAME = 'uq_contracts_bid_no') AS has_key
+            FROM information_schema.TABLES t
+            WHERE t.TABLE_SCHEMA = DATABASE() AND t.TABLE_NAME = 'contracts'
         """)
-        self.db.commit()
-        cur.close()
+        if not info or (info["engine"] == "InnoDB" and info["has_key"]):
+            return
+
+        if not info["has_key"]:
+            removed = self.db.execute("""
+                DELETE c
+                FROM contracts c
+                JOIN contracts k
+                  ON k.bid_no = c.bid_no
+                 AND (
+                      (k.download_link IS NOT NULL) > (c.download_link IS NOT NULL)
+                   OR ((k.download_link IS NOT NULL) = (c.download_link IS NOT NULL) AND k.id < c.id)
+                 )
+            """)
+            print(f"[DB] 🧹 Removed {removed} duplicate bid_no row(s)")
+
+        if info["engine"] != "InnoDB":
+            print(f"[DB] 🔧 Converting contracts from {info['engine']} to InnoDB")
+            self.db.execute("ALTER TABLE contracts ENGINE=InnoDB")
+
+        if not info["has_key"]:
+            print("[DB] 🔑 Adding unique index on bid_no")
+            self.db.execute("ALTER TABLE contracts ADD UNIQUE KEY uq_contracts_bid_no (bid_no)")
+
+    def close(self):
+        """Drain the write-behind queue (safe to call more than once)."""
+        if self._closed:
+            return
+        self._closed = True
+        self.writer.close()
+        self.db.timing_report()
 
     # --------------------------------------------------
     # CATEGORY CSV (CLEAN + SAFE APPEND)
     # --------------------------------------------------
     def _load_categories(self):
-        if not self.category_csv.exists():
+        return self._load_categories_from_csv(self.category_csv)
+
+    @staticmethod
+    def _load_categories_from_csv(category_csv=CATEGORY_CSV):
+        if not category_csv.exists():
             return []
 
         clean_rows = []
-        with open(self.category_csv, newline="", encoding="utf-8") as f:
+        with open(category_csv, newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 if row.get("category_name", "").strip():
@@ -126,6 +226,9 @@ class ContractsController:
             })
             print(f"[CSV] ➕ Appended new category → {name}")
 
+            if self.lease_queue is not None:
+                self.lease_queue.add_category(name)
+
         elif force:
             # If it's a retry (force=True), we add it to the memory list for processing
             # but we DON'T write to CSV because it's already there
@@ -153,10 +256,10 @@ class ContractsController:
     # --------------------------------------------------
     # DATE FILTER
     # --------------------------------------------------
-    def set_date_filter(self):
-        to_date = datetime.today()
-        # Set from_date to the 1st day of the current month
-        from_date = to_date.replace(day=1)
+    def set_date_filter(self, from_date=None, to_date=None):
+        to_date = to_date or datetime.today()
+        # Default from_date is the 1st day of the current month
+        from_date = from_date or to_date.replace(day=1)
 
         self.page.evaluate("""
         (d)=>{
@@ -251,11 +354,18 @@ class ContractsController:
         dates = self.page.locator("span.ajxtag_contract_date")
         status = self.page.locator("span.ajxtag_order_status")
 
-        cur = self.db.cursor()
-
+        duplicates = 0
         for i in range(bids.count()):
-            row = (
-                i + 1, category, bids.nth(i).inner_text().strip(),
+            bid_no = bids.nth(i).inner_text().strip()
+            self.writer.put("category_link", (bid_no, category))
+
+            if not self.seen_bids.add(bid_no):
+                # Already stored under another category: the link is enough
+                duplicates += 1
+                continue
+
+            self.writer.put("contract", (
+                i + 1, category, bid_no,
                 items.nth(i*3).inner_text().strip(),
                 items.nth(i*3+1).inner_text().strip(),
                 items.nth(i*3+2).inner_text().strip(),
@@ -272,27 +382,21 @@ class ContractsController:
                 dates.nth(i).inner_text().strip(),
                 status.nth(i).inner_text().strip(),
                 None
-            )
-
-            cur.execute("""
-            INSERT INTO contracts (
-                serial_no, category_name, bid_no,
-                product, brand, model,
-                ordered_quantity, price, total_value,
-                buyer_dept_org, organization_name, buyer_designation,
-                state, buyer_department, office_zone, buying_mode,
-                contract_date, order_status, download_link
-            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """, row)
-
-        self.db.commit()
-        cur.close()
+            ))
+
+        if duplicates:
+            print(f"[DEDUP] {duplicates} bid(s) already known, linked to {category}")
         print(f"[PHASE-1] Completed → {category}")
 
     # --------------------------------------------------
     # MAIN LOOP (PHASE-1)
     # --------------------------------------------------
-    def run(self):
+    def run(self, run_state=None):
+        """
+        Scrape every category. With a run_state (service.run_state.RunState),
+        categories finished earlier in the same run are skipped, so a
+        restarted run resumes where it stopped.
+        """
         print("🚀 PHASE-1 START")
         
         # Use simple index to allow self.categories to grow dynamically
@@ -300,6 +404,12 @@ class ContractsController:
         while i < len(self.categories):
             row = self.categories[i]
             category = row["category_name"]
+
+            if run_state and run_state.is_done("category", category, "scraped"):
+                print(f"\n[{i+1}/{len(self.categories)}] Already scraped in this run → {category}")
+                i += 1
+                continue
+
             print(f"\n[{i+1}/{len(self.categories)}] Processing → {category}")
 
             try:
@@ -318,8 +428,14 @@ class ContractsController:
                         self._append_category(category, force=True)
                     else:
                         print(f"[LIMIT] 🛑 Max retries ({self.max_retries}) reached for {category}. Moving on.")
+                        if run_state:
+                            run_state.mark("category", category, "scraped", "failed", "CAPTCHA failed")
                 else:
                     self.phase1_scrape_rows(category)
+                    if run_state:
+                        # Rows must be in MySQL (or the local spool) before the category is done
+                        self.writer.flush()
+                        run_state.mark("category", category, "scraped")
                     
             except Exception as e:
                 print(f"[ERROR] Failed category {category}: {e}")
@@ -333,7 +449,73 @@ class ContractsController:
                     self._append_category(category, force=True)
                 else:
                     print(f"[LIMIT] 🛑 Max retries ({self.max_retries}) reached for {category}. Moving on.")
+                    if run_state:
+                        run_state.mark("category", category, "scraped", "failed", e)
 
             i += 1
 
+        self.close()
         print("🎉 PHASE-1 COMPLETED SUCCESSFULLY")
+
+    # --------------------------------------------------
+    # WORKER LOOP (PHASE-1, LEASED CATEGORIES)
+    # --------------------------------------------------
+    def run_worker(self, lease_queue):
+        """
+        Multi-node Phase 1: lease (category, date-window) units from the
+        category_leases table until none are left. Retries are handled by the
+        table (attempts / max_attempts) instead of re-appending to
+        self.categories, so any number of workers can share the backlog.
+        """
+        from controller.category_leases import LeaseLost, format_window
+
+        self.lease_queue = lease_queue
+        print(f"🚀 PHASE-1 WORKER START → {lease_queue.worker_id}")
+
+        processed = 0
+        try:
+            while True:
+                unit = lease_queue.lease()
+                if unit is None:
+                    break
+
+                category = unit["category_name"]
+                processed += 1
+                print(f"\n[LEASE #{unit['id']}] Processing → {category} "
+                      f"({format_window(unit)}, attempt {unit['attempts']}/{lease_queue.max_attempts})")
+
+                try:
+                    with lease_queue.heartbeat(unit) as hb:
+                        self.reset_to_home()
+                        self.go_to_gem_contracts()
+                        self.process_category(category)
+                        self.set_date_filter(unit["from_date"], unit["to_date"])
+
+                        if not self.solve_main_captcha_and_search():
+                            status = lease_queue.release(unit, "CAPTCHA failed")
+                            print(f"[FAIL] CAPTCHA failed for {category}. Unit back to '{status}'.")
+                            continue
+
+                        hb.check()
+                        self.phase1_scrape_rows(category)
+                        # Rows must be in MySQL (or the local spool) before the unit is done
+                        self.writer.flush()
+                        hb.check()
+
+                    lease_queue.complete(unit)
+
+                except LeaseLost:
+                    print(f"[LEASE] 🛑 {category} was taken over by another worker. Skipping.")
+
+                except Exception as e:
+                    print(f"[ERROR] Failed category {category}: {e}")
+                    status = lease_queue.release(unit, e)
+                    if status == "failed":
+                        print(f"[LIMIT] 🛑 Max attempts ({lease_queue.max_attempts}) reached for {category}.")
+
+        finally:
+            lease_queue.release_all()
+            self.lease_queue = None
+
+        self.close()
+        print(f"🎉 PHASE-1 WORKER DONE → {processed} unit(s) processed. Queue: {lease_queue.summary()}")
@@ -3,24 +3,19 @@ import io
 from pathlib import Path
 from PIL import Image
 
-import mysql.connector
-from mysql.connector import Error
-
+from service.database import get_db
 from solver.captcha_solver import ensemble_solve
 
 
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",
-    "database": "tender_automation_with_ai"
-}
-
-
 class PDFDownloader:
-    def __init__(self, browser):
+    def __init__(self, browser, on_download=None, run_state=None):
         self.browser = browser
         self.page = browser.page
+        # Called with the PDF path after each successful download (e.g. to queue it for Phase 3)
+        self.on_download = on_download
+        # Optional service.run_state.RunState: records each downloaded bid of the run
+        # (pending bids themselves come from the NULL download_link rows)
+        self.run_state = run_state
 
         base = Path(__file__).resolve().parents[1]
 
@@ -29,18 +24,7 @@ class PDFDownloader:
 
         self.rowwise_file = base / "data" / "rowwise.txt"
 
-        self.db = self._connect_db()
-
-    # --------------------------------------------------
-    # DATABASE
-    # --------------------------------------------------
-    def _connect_db(self):
-        try:
-            conn = mysql.connector.connect(**DB_CONFIG)
-            print("[DB] ✅ Connected")
-            return conn
-        except Error as e:
-            raise RuntimeError(e)
+        self.db = get_db()
 
     # --------------------------------------------------
     # NAVIGATION
@@ -53,16 +37,12 @@ class PDFDownloader:
     # FETCH PENDING BIDS
     # --------------------------------------------------
     def fetch_pending_bids(self):
-        cur = self.db.cursor(dictionary=True)
-        cur.execute("""
+        return self.db.fetchall("""
             SELECT id, bid_no
             FROM contracts
             WHERE download_link IS NULL
             ORDER BY id ASC
         """)
-        rows = cur.fetchall()
-        cur.close()
-        return rows
 
     # --------------------------------------------------
     # SEARCH BID + CAPTCHA + SEARCH CLICK
@@ -153,18 +133,47 @@ class PDFDownloader:
     # --------------------------------------------------
     # MAIN PHASE-2 LOGIC
     # --------------------------------------------------
-    def run(self):
-        print("\n🚀 PHASE-2 START (Persistent Mode)\n")
+    def run(self, max_passes=None, max_attempts=None):
+        """
+        Download every bid with a NULL download_link, pass after pass until
+        none is left. max_passes / max_attempts (per bid) bound the run for
+        callers that must get control back (run_daemon.py): bids given up
+        on stay NULL and are tried again by the next run.
+        """
+        mode = "Persistent Mode" if max_passes is None and max_attempts is None else "Bounded Mode"
+        print(f"\n🚀 PHASE-2 START ({mode})\n")
+
+        attempts = {}
+        given_up = set()
+        passes = 0
+
+        def requeue(row, queue):
+            # Failed attempt: back to the end of the queue unless the bid is out of attempts
+            bid = row["bid_no"]
+            attempts[bid] = attempts.get(bid, 0) + 1
+            if max_attempts is not None and attempts[bid] >= max_attempts:
+                print(f"[LIMIT] 🛑 {bid} failed {attempts[bid]} time(s). Leaving it for the next run.")
+                given_up.add(bid)
+            else:
+                queue.append(row)
 
         while True:
+            if max_passes is not None and passes >= max_passes:
+                print(f"\n[PHASE-2] Stopping after {passes} pass(es); remaining bids are left for the next run.")
+                break
+
             # Re-fetch only rows that are STILL null
-            pending = self.fetch_pending_bids()
+            pending = [row for row in self.fetch_pending_bids() if row["bid_no"] not in given_up]
             
             if not pending:
                 print("\n" + "="*50)
-                print("🎉 ALL DOWNLOADS COMPLETE! No NULL links left.")
+                if given_up:
+                    print(f"🎉 DOWNLOADS DONE! {len(given_up)} bid(s) given up on for this run.")
+                else:
+                    print("🎉 ALL DOWNLOADS COMPLETE! No NULL links left.")
                 print("="*50)
                 break
+            passes += 1
 
             print(f"\n[PHASE-2] {len(pending)} rows remaining with NULL links. Starting processing pass...")
 
@@ -184,35 +193,36 @@ class PDFDownloader:
                     # Step 1: Search Bid
                     if not self.search_bid(bid_no):
                         print(f"[RETRY] 🔄 CAPTCHA failed on Search. Moving {bid_no} to end of queue.")
-                        current_queue.append(row)
+                        requeue(row, current_queue)
                     else:
                         # Step 2: Download PDF
                         download_status = self.download_pdf(bid_no)
                         
                         if download_status == "RETRY":
                             print(f"[RETRY] 🔄 CAPTCHA failed on Popup. Moving {bid_no} to end of queue.")
-                            current_queue.append(row)
+                            requeue(row, current_queue)
                             try: self.page.click("button[data-dismiss='modal']", timeout=2000)
                             except: pass
                         else:
                             pdf_path = download_status
                             # UPDATE DATABASE
-                            cur = self.db.cursor()
-                            cur.execute(
+                            self.db.execute(
                                 "UPDATE contracts SET download_link=%s WHERE id=%s",
                                 (pdf_path, db_id)
                             )
-                            self.db.commit()
-                            cur.close()
 
                             print(f"[PDF] ✅ SUCCESS! Link updated in DB → {bid_no}")
+                            if self.run_state:
+                                self.run_state.mark("bid", bid_no, "downloaded", detail=pdf_path)
+                            if self.on_download:
+                                self.on_download(pdf_path)
                             
                             try: self.page.click("button[data-dismiss='modal']", timeout=2000)
                             except: pass
 
                 except Exception as e:
                     print(f"[ERROR] ❌ Exception for {bid_no}: {e}")
-                    current_queue.append(row)
+                    requeue(row, current_queue)
                 
                 i += 1
                 # Small delay to prevent too many DB queries in a tight loop
@@ -220,4 +230,5 @@ class PDFDownloader:
                     print("\n[PASS] Current pass finished. Scanning database for remaining NULLs...")
                     self.page.wait_for_timeout(2000)
 
+        self.db.timing_report()
         print("\n🎉 PHASE-2 COMPLETED SUCCESSFULLY")
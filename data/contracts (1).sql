@@ -54,8 +54,9 @@ CREATE TABLE IF NOT EXISTS `contracts` (
   `seller_name` text,
   `seller_email` varchar(255) DEFAULT NULL,
   `unit_price` varchar(50) DEFAULT NULL,
-  PRIMARY KEY (`id`)
-) ENGINE=MyISAM AUTO_INCREMENT=43 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_contracts_bid_no` (`bid_no`)
+) ENGINE=InnoDB AUTO_INCREMENT=43 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 --
 -- Dumping data for table `contracts`
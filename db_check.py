@@ -1,21 +1,14 @@
-import mysql.connector
 from mysql.connector import Error
 
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",
-    "database": "tender_automation_with_ai"
-}
+from service.database import get_db
 
 try:
-    conn = mysql.connector.connect(**DB_CONFIG)
-    if conn.is_connected():
+    db = get_db()
+    if db.ping():
         print("Successfully connected to the database")
-        cursor = conn.cursor()
-        cursor.execute("SELECT DATABASE()")
-        db_name = cursor.fetchone()
+        db_name = db.fetchone("SELECT DATABASE()", dictionary=False)
         print(f"Connected to database: {db_name}")
-        conn.close()
+        print(f"Pool size: {db.pool_size}")
+        db.timing_report()
 except Error as e:
     print(f"Error: {e}")
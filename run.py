@@ -1,24 +1,70 @@
+import time
+# Startup is timed from here (reported as [STARTUP], compare with run_main.py)
+_IMPORT_START = time.perf_counter()
+
+import argparse
+
 from playwright_manager import PlaywrightManager
 from controller.contracts_controller import ContractsController
+from service.run_state import RunState, phase1_window
 
 
-def main():
-    print("=" * 70)
-    print("🚀 GeM Contracts Automation System (PHASE-1)")
-    print("=" * 70)
+def parse_args():
+    parser = argparse.ArgumentParser(description="GeM Contracts Automation System (PHASE-1)")
+    parser.add_argument("--worker", action="store_true",
+                        help="lease categories from the category_leases table (multi-node mode)")
+    parser.add_argument("--seed", action="store_true",
+                        help="load categories.csv into the category_leases table and exit")
+    parser.add_argument("--window-days", type=int, default=None,
+                        help="with --seed: split the month into windows of N days")
+    parser.add_argument("--worker-id", default=None,
+                        help="worker name stored on leases (default: host-pid-random)")
+    parser.add_argument("--skip-known", action="store_true",
+                        help="don't re-read contracts stored by earlier runs (faster, "
+                             "but their order status etc. is not refreshed)")
+    parser.add_argument("--run-id", default=None,
+                        help="record progress under this pipeline run (set by run_main.py)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="start a new run instead of resuming the last unfinished one")
+    return parser.parse_args()
+
+
+def seed_leases(window_days=None):
+    from controller.category_leases import CategoryLeaseQueue
+
+    # Categories are read straight from the CSV; no browser needed
+    names = [row["category_name"] for row in ContractsController._load_categories_from_csv()]
+    queue = CategoryLeaseQueue()
+    try:
+        queue.seed(names, window_days=window_days)
+        print(f"[LEASE] Queue: {queue.summary()}")
+    finally:
+        queue.close()
 
-    print("\n[INIT] Launching browser...")
-    browser = PlaywrightManager(headless=False)
-    browser.start()
 
+def run_phase1(browser, worker=False, worker_id=None, run_state=None, skip_known=False):
+    """
+    Phase 1 on an already started browser (also used by run_main.py, which
+    shares one browser across phases). With a run_state, categories already
+    scraped in that run are skipped. Returns True if it completed.
+    """
+    contracts = None
+    lease_queue = None
     try:
-        contracts = ContractsController(browser)
+        contracts = ContractsController(browser, skip_known=skip_known)
         contracts.go_to_gem_contracts()
-        contracts.run()
+
+        if worker:
+            from controller.category_leases import CategoryLeaseQueue
+            lease_queue = CategoryLeaseQueue(worker_id=worker_id)
+            contracts.run_worker(lease_queue)
+        else:
+            contracts.run(run_state=run_state)
 
         print("\n" + "=" * 70)
         print("🎉 PHASE-1 COMPLETED SUCCESSFULLY")
         print("=" * 70)
+        return True
 
     except KeyboardInterrupt:
         print("\n⚠️ Process interrupted by user")
@@ -28,8 +74,48 @@ def main():
         import traceback
         traceback.print_exc()
 
+    finally:
+        if contracts:
+            contracts.close()   # flush rows still queued for the DB
+        if lease_queue:
+            lease_queue.close()
+    return False
+
+
+def main():
+    args = parse_args()
+
+    if args.seed:
+        seed_leases(args.window_days)
+        return
+
+    print("=" * 70)
+    print("🚀 GeM Contracts Automation System (PHASE-1)")
+    print("=" * 70)
+
+    # Worker mode resumes through its leases instead
+    run_state = None
+    if not args.worker:
+        run_state = RunState()
+        run_state.open_run("phase1", run_id=args.run_id, resume=not args.fresh, scope=phase1_window())
+
+    print("\n[INIT] Launching browser...")
+    launch_start = time.perf_counter()
+    browser = PlaywrightManager(headless=False)
+    browser.start()
+    print(f"[STARTUP] ⏱️ imports {launch_start - _IMPORT_START:.1f}s + browser & gem.gov.in "
+          f"{time.perf_counter() - launch_start:.1f}s (measured, this phase)")
+
+    try:
+        completed = run_phase1(browser, worker=args.worker, worker_id=args.worker_id,
+                               run_state=run_state, skip_known=args.skip_known)
+        # A run handed over by run_main.py is finished by run_main.py
+        if completed and run_state and not args.run_id:
+            run_state.finish()
     finally:
         browser.stop()   # ✅ CLOSE & EXIT
+        if run_state:
+            run_state.close()
 
 
 if __name__ == "__main__":
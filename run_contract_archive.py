@@ -0,0 +1,227 @@
+"""
+Phase 3: Contract Archive CLI
+Packs extracted contract JSON (and optionally the PDFs) into one
+dictionary-compressed archive with random access by bid_no
+(service/contract_archive.py), unpacks it, and benchmarks it against the
+bundled per-file ZIP.
+
+Usage:
+    python run_contract_archive.py pack [--json data/JSON] [--pdf data/scrapped] [-o data/contracts.gca]
+    python run_contract_archive.py unpack data/contracts.gca [-o DIR] [--bid GEMC-...] [--kind json pdf]
+    python run_contract_archive.py bench [--zip data/ContractJSON.zip] [--pdf-zip data/ContractPDF.zip]
+
+Requires the optional zstandard package (pip install zstandard).
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from service.contract_archive import (ARCHIVE_PATH, COMPRESSION_LEVEL, DICT_SIZE, KINDS,
+                                      ContractArchive, pack, require_zstd, train_dictionary)
+from service.pdf_sources import iter_sources, read_chunks, source_name
+from run_phase3_json_to_csv import JSON_DIR, iter_extracted
+
+CORPUS_ZIP = "data/ContractJSON.zip"
+EXTENSIONS = {"json": ".json", "pdf": ".pdf"}
+
+
+# --------------------------------------------------
+# INPUTS
+# --------------------------------------------------
+def iter_json_documents(inputs: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    (bid_no, JSON bytes) from extraction output directories (JSON files and
+    JSONL shards, written back as the extractor's JSON file), ZIPs of JSON
+    files and single JSON files (stored as is).
+    """
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for stem, data in iter_extracted(str(path)):
+                yield stem, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        elif path.suffix.lower() == ".zip" and path.is_file():
+            with zipfile.ZipFile(path) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir() and info.filename.lower().endswith(".json"):
+                        yield Path(info.filename).stem, zf.read(info)
+        elif path.suffix.lower() == ".json" and path.is_file():
+            yield path.stem, path.read_bytes()
+        else:
+            print(f"[ARCHIVE] ⚠️ Skipping {item}: not a directory, JSON file or ZIP archive")
+
+
+def iter_pdf_documents(inputs: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """(bid_no, PDF bytes) from directories, PDFs and ZIP archives."""
+    for ref in iter_sources(inputs):
+        yield Path(source_name(ref)).stem, b"".join(read_chunks(ref))
+
+
+# --------------------------------------------------
+# COMMANDS
+# --------------------------------------------------
+def cmd_pack(args):
+    documents = {"json": iter_json_documents(args.json)}
+    if args.pdf:
+        documents["pdf"] = iter_pdf_documents(args.pdf)
+
+    print(f"\n📦 Packing contract archive: {args.output}")
+    print("=" * 70)
+    start = time.perf_counter()
+    stats = pack(args.output, documents, level=args.level, dict_size=args.dict_size)
+    elapsed = time.perf_counter() - start
+    for kind, kind_stats in stats.items():
+        ratio = kind_stats["raw"] / max(1, kind_stats["stored"] + kind_stats["dict"])
+        print(f"   {kind:<5} {kind_stats['count']:>7} docs  {kind_stats['raw'] / 1024:>10,.0f} KB → "
+              f"{(kind_stats['stored'] + kind_stats['dict']) / 1024:>8,.0f} KB "
+              f"(dict {kind_stats['dict'] / 1024:.0f} KB, {ratio:.1f}x)")
+    print(f"   ✓ {os.path.getsize(args.output) / 1024:,.0f} KB in {elapsed:.1f}s")
+    print("=" * 70)
+
+
+def cmd_unpack(args):
+    with ContractArchive(args.archive) as archive:
+        written = 0
+        for kind in args.kind:
+            bids = args.bid or archive.keys(kind)
+            if bids:
+                Path(args.output).mkdir(parents=True, exist_ok=True)
+            for bid_no in bids:
+                try:
+                    data = archive.get(bid_no, kind)
+                except KeyError:
+                    print(f"   ✗ {bid_no}: no {kind} in {args.archive}")
+                    continue
+                with open(Path(args.output) / f"{bid_no}{EXTENSIONS[kind]}", "wb") as f:
+                    f.write(data)
+                written += 1
+        print(f"✓ Unpacked {written} file(s) to {args.output}")
+
+
+def _read_zip_member(zip_path: str, name: str) -> bytes:
+    # What a per-file ZIP costs for one lookup: open, read directory, inflate
+    with zipfile.ZipFile(zip_path) as zf:
+        return zf.read(name)
+
+
+def _bench_kind(kind: str, zip_path: str, level: int, dict_size: int, repeat: int):
+    import zstandard as zstd
+
+    with zipfile.ZipFile(zip_path) as zf:
+        members = [info for info in zf.infolist()
+                   if not info.is_dir() and info.filename.lower().endswith(EXTENSIONS[kind])]
+        docs = [(Path(info.filename).stem, zf.read(info)) for info in members]
+        zip_stored = sum(info.compress_size for info in members)
+    raw = sum(len(data) for _, data in docs)
+    samples = [data for _, data in docs]
+
+    plain = zstd.ZstdCompressor(level=level)
+    per_file = sum(len(plain.compress(data)) for data in samples)
+    solid = len(plain.compress(b"".join(samples)))
+
+    # Held out: dictionary trained on half the corpus, measured on the other half
+    train, test = samples[::2], samples[1::2]
+    held_dict = train_dictionary(train, dict_size, level)
+    held_cctx = zstd.ZstdCompressor(level=level, dict_data=zstd.ZstdCompressionDict(held_dict)) \
+        if held_dict else plain
+    held = sum(len(held_cctx.compress(data)) for data in test)
+    held_plain = sum(len(plain.compress(data)) for data in test)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_path = os.path.join(tmp, "bench.gca")
+        start = time.perf_counter()
+        stats = pack(archive_path, {kind: docs}, level=level, dict_size=dict_size)[kind]
+        pack_seconds = time.perf_counter() - start
+
+        by_name = {Path(info.filename).stem: info.filename for info in members}
+        lookups = [bid for bid, _ in docs] * repeat
+        random.Random(0).shuffle(lookups)
+        start = time.perf_counter()
+        for bid in lookups:
+            _read_zip_member(zip_path, by_name[bid])
+        zip_ms = (time.perf_counter() - start) * 1000 / len(lookups)
+
+        with ContractArchive(archive_path) as archive:
+            mismatches = sum(1 for bid, data in docs if archive.get(bid, kind) != data)
+            start = time.perf_counter()
+            for bid in lookups:
+                archive.get(bid, kind)
+            archive_ms = (time.perf_counter() - start) * 1000 / len(lookups)
+        archive_size = os.path.getsize(archive_path)
+
+    print(f"\n📚 {kind.upper()}: {zip_path} ({len(docs)} docs, {raw / 1024:,.0f} KB raw)")
+    print("=" * 78)
+    print(f"{'method':<38}{'KB':>10}{'ratio':>9}{'lookup':>12}{'random':>9}")
+    print("-" * 78)
+    rows = [
+        ("ZIP, per file (as shipped)", zip_stored, f"{zip_ms:.3f}ms", "yes"),
+        (f"zstd-{level}, per file", per_file, "", "yes"),
+        (f"zstd-{level}, whole corpus (solid)", solid, "", "no"),
+        (f"zstd-{level} + dict, archive (incl. index)", archive_size, f"{archive_ms:.3f}ms", "yes"),
+    ]
+    for name, size, lookup, random_access in rows:
+        print(f"{name:<38}{size / 1024:>10,.0f}{raw / max(1, size):>8.1f}x{lookup:>12}{random_access:>9}")
+    print("-" * 78)
+    print(f"   Dictionary: {stats['dict'] / 1024:.0f} KB | pack {pack_seconds:.2f}s | "
+          f"round-trip mismatches: {mismatches}")
+    if held_dict:
+        print(f"   Held-out half (dict trained on the other half): "
+              f"{held_plain / 1024:,.0f} KB → {held / 1024:,.0f} KB "
+              f"({held_plain / max(1, held):.1f}x smaller than per-file zstd)")
+    print("=" * 78)
+
+
+def cmd_bench(args):
+    _bench_kind("json", args.zip, args.level, args.dict_size, args.repeat)
+    if args.pdf_zip:
+        _bench_kind("pdf", args.pdf_zip, args.level, args.dict_size, args.repeat)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 3: dictionary-compressed contract archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pack", help="pack extracted JSON (and PDFs) into an archive")
+    p.add_argument("--json", nargs="+", default=[JSON_DIR], metavar="PATH",
+                   help=f"extraction output directories, JSON files or ZIPs of them (default: {JSON_DIR})")
+    p.add_argument("--pdf", nargs="+", default=None, metavar="PATH",
+                   help="also pack PDFs from these directories, PDFs or ZIP archives")
+    p.add_argument("-o", "--output", default=ARCHIVE_PATH, help=f"archive path (default: {ARCHIVE_PATH})")
+    p.add_argument("--level", type=int, default=COMPRESSION_LEVEL,
+                   help=f"zstd level (default: {COMPRESSION_LEVEL})")
+    p.add_argument("--dict-size", type=int, default=DICT_SIZE,
+                   help=f"dictionary size in bytes (default: {DICT_SIZE})")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("unpack", help="write documents back out as files")
+    p.add_argument("archive", nargs="?", default=ARCHIVE_PATH)
+    p.add_argument("-o", "--output", default="data/unpacked", help="output directory (default: data/unpacked)")
+    p.add_argument("--bid", nargs="+", default=None, metavar="BID_NO", help="only these contracts")
+    p.add_argument("--kind", nargs="+", choices=KINDS, default=list(KINDS),
+                   help="document kinds to unpack (default: all)")
+    p.set_defaults(func=cmd_unpack)
+
+    p = sub.add_parser("bench", help="compare with per-file ZIP compression")
+    p.add_argument("--zip", default=CORPUS_ZIP, help=f"ZIP of JSON files (default: {CORPUS_ZIP})")
+    p.add_argument("--pdf-zip", default=None, help="also benchmark a ZIP of PDFs")
+    p.add_argument("--level", type=int, default=COMPRESSION_LEVEL)
+    p.add_argument("--dict-size", type=int, default=DICT_SIZE)
+    p.add_argument("--repeat", type=int, default=5, help="lookups per document (default: 5)")
+    p.set_defaults(func=cmd_bench)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        require_zstd()
+    except ImportError as e:
+        print(f"✗ {e}")
+        raise SystemExit(1)
+    args.func(args)
@@ -0,0 +1,193 @@
+"""
+GeM Contracts Extraction System - Continuous Mode (run_daemon.py)
+-----------------------------------------------------------------
+Runs the pipeline as a long-lived process instead of a daily batch. One
+browser session and one loaded CAPTCHA solver stay up, and every category
+is polled again once its interval has passed:
+
+1. Phase 1 asks only for contracts from the category's contract_date
+   watermark on (data/run_state.sqlite), instead of the whole month
+2. Phase 2 downloads the PDFs of the contracts that are new
+3. Phase 3 extracts each downloaded PDF right away and updates its contracts
+   row (run_phase3_stream.py, JSON side output in data/JSON)
+
+The watermark of a category only moves after its rows are in MySQL (or the
+writer spool), so a stopped daemon picks up where it left off. A category
+never polled before starts at the 1st of the month, like run.py.
+
+Usage:
+    python run_daemon.py [--interval 30] [--overlap-days 1]
+    python run_daemon.py --once        # one pass over the due categories, then exit
+"""
+
+import argparse
+import signal
+import time
+from datetime import datetime, timedelta
+
+from service.run_state import RunState
+
+# Minutes between two polls of the same category
+POLL_INTERVAL_MINUTES = 30
+# Days before the watermark asked for again (contracts listed late)
+WATERMARK_OVERLAP_DAYS = 1
+# Longest sleep between checks for due categories
+IDLE_SLEEP_SECONDS = 60
+# Download attempts per bid and cycle; a bid that keeps failing (dead link,
+# removed document) is left NULL and tried again next cycle
+DOWNLOAD_ATTEMPTS = 3
+
+
+def due_categories(contracts, state, interval):
+    """Categories never polled or last polled `interval` ago, least recently polled first."""
+    watermarks = state.watermarks()
+    now = datetime.now()
+    due = []
+    seen = set()
+    for row in contracts.categories:
+        category = row["category_name"]
+        if category in seen:
+            continue
+        seen.add(category)
+        polled_at = watermarks[category][1] if category in watermarks else None
+        if polled_at is None or now - polled_at >= interval:
+            due.append((polled_at or datetime.min, category))
+    return [category for _, category in sorted(due, key=lambda item: item[0])]
+
+
+def seconds_until_due(contracts, state, interval):
+    watermarks = state.watermarks()
+    now = datetime.now()
+    waits = [0.0 if row["category_name"] not in watermarks
+             else (watermarks[row["category_name"]][1] + interval - now).total_seconds()
+             for row in contracts.categories]
+    return max(0.0, min(waits, default=IDLE_SLEEP_SECONDS))
+
+
+def poll_category(contracts, state, category, overlap_days):
+    """
+    Scrape the contracts of category dated from its watermark on. Returns
+    True if the search ran (the watermark then moves to today).
+    """
+    watermark, _ = state.watermarks().get(category, (None, None))
+    to_date = datetime.today()
+    from_date = None
+    if watermark is not None:
+        from_date = min(to_date, datetime.combine(watermark, datetime.min.time())
+                        - timedelta(days=overlap_days))
+
+    window = f"{from_date:%d-%m-%Y}" if from_date else "month start"
+    print(f"\n[POLL] {category} (from {window})")
+
+    contracts.reset_to_home()
+    contracts.go_to_gem_contracts()
+    contracts.process_category(category)
+    contracts.set_date_filter(from_date, to_date)
+
+    if not contracts.solve_main_captcha_and_search():
+        print(f"[FAIL] CAPTCHA failed for {category}. Retrying next interval.")
+        state.record_poll(category)
+        return False
+
+    contracts.phase1_scrape_rows(category)
+    # Rows must be in MySQL (or the local spool) before the watermark moves
+    contracts.writer.flush()
+    state.record_poll(category, to_date.date())
+    return True
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="GeM contracts continuous mode")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_MINUTES,
+                        help=f"minutes between polls of a category (default: {POLL_INTERVAL_MINUTES})")
+    parser.add_argument("--overlap-days", type=int, default=WATERMARK_OVERLAP_DAYS,
+                        help=f"days before the watermark searched again (default: {WATERMARK_OVERLAP_DAYS})")
+    parser.add_argument("--once", action="store_true",
+                        help="poll the due categories once, download and extract, then exit")
+    parser.add_argument("--no-extract", action="store_true",
+                        help="leave extraction to run_phase3.py (download only)")
+    return parser.parse_args()
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    args = parse_args()
+    interval = timedelta(minutes=args.interval)
+
+    print("\n" + "#" * 80)
+    print("🚀 GeM CONTRACTS CONTINUOUS MODE")
+    print(f"   Poll every {args.interval:g} min per category | "
+          f"Extraction: {'off' if args.no_extract else 'streaming'}")
+    print("#" * 80)
+
+    # systemd / docker stop: shut down like Ctrl+C
+    signal.signal(signal.SIGTERM, _stop)
+
+    from controller.contracts_controller import ContractsController
+    from controller.pdfdownload import PDFDownloader
+    from run_main import start_browser
+    from run_phase3_stream import start_stream_consumer
+
+    state = RunState()
+    browser = None
+    contracts = None
+    feed = consumer = None
+    try:
+        browser, seconds = start_browser()
+        print(f"[STARTUP] ⏱️ Browser & gem.gov.in ready in {seconds:.1f}s (kept warm)")
+
+        contracts = ContractsController(browser)
+        if not args.no_extract:
+            feed, consumer, _ = start_stream_consumer()
+        downloader = PDFDownloader(browser, on_download=feed.put if feed else None)
+
+        cycle = 0
+        while True:
+            due = due_categories(contracts, state, interval)
+            if due:
+                cycle += 1
+                start = time.time()
+                print(f"\n[DAEMON] Cycle {cycle}: {len(due)} category(ies) due")
+                polled = 0
+                # Dedupe across this cycle's categories only, so listings are refreshed
+                contracts.seen_bids.reset()
+                for category in due:
+                    try:
+                        polled += poll_category(contracts, state, category, args.overlap_days)
+                    except Exception as e:
+                        print(f"[ERROR] Failed category {category}: {e}. Retrying next interval.")
+                        state.record_poll(category)
+
+                # New contracts have NULL download links; one bounded pass so
+                # undownloadable bids cannot keep the daemon from polling
+                downloader.run(max_passes=1, max_attempts=DOWNLOAD_ATTEMPTS)
+                print(f"[DAEMON] ✅ Cycle {cycle} done in {time.time() - start:.1f}s "
+                      f"({polled}/{len(due)} polled)")
+
+            if args.once:
+                break
+
+            wait = min(IDLE_SLEEP_SECONDS, seconds_until_due(contracts, state, interval))
+            if wait > 0:
+                time.sleep(wait)
+
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping continuous mode...")
+
+    finally:
+        if browser is not None:
+            browser.stop()
+        if contracts is not None:
+            contracts.close()   # flush rows still queued for the DB
+        if feed is not None:
+            feed.close()
+            print("[DAEMON] Waiting for extraction to drain...")
+            consumer.join()
+        state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,33 @@ This script runs all three phases sequentially:
 1. Phase 1: Search & Row Scraping (run.py)
 2. Phase 2: PDF Downloading (run_phase2.py)
 3. Phase 3: Data Extraction & DB Sync (run_phase3.py)
+
+Phases 1 and 2 run in this process on one browser session: Chromium, the
+gem.gov.in landing page and the CAPTCHA solver (cv2, tesseract) are started
+once instead of once per phase. --isolated runs every phase as its own
+interpreter instead, as before.
+
+With --overlap, Phases 2 and 3 run together: every PDF is queued for
+extraction (run_phase3_stream.py) as soon as it is downloaded, so CPU-bound
+extraction overlaps network-bound downloading.
+
+Progress is recorded per run in data/run_state.sqlite (service/run_state.py):
+a pipeline that crashed or was interrupted resumes its run on the next start
+(same day, so the same Phase 1 date window), skipping finished phases and
+the categories Phase 1 already scraped.
+--fresh starts a new run instead; --status lists recent runs.
 """
 
+import argparse
 import subprocess
 import sys
 import os
 import time
 from pathlib import Path
 
-def run_phase(phase_name: str, script_name: str) -> bool:
+from service.run_state import RunState, phase1_window
+
+def run_phase(phase_name: str, script_name: str, args=()) -> bool:
     """
     Executes a phase and returns True if successful.
     """
@@ -26,7 +44,7 @@ def run_phase(phase_name: str, script_name: str) -> bool:
     try:
         # Run the script as a separate process to clean up resources between phases
         result = subprocess.run(
-            [sys.executable, script_name],
+            [sys.executable, script_name, *args],
             cwd=os.getcwd(),
             capture_output=False,
             text=True
@@ -45,7 +63,187 @@ def run_phase(phase_name: str, script_name: str) -> bool:
         print(f"\n❌ CRITICAL ERROR during {phase_name}: {e}")
         return False
 
+def run_in_process(phase_name: str, fn, *args, **kwargs) -> bool:
+    """
+    Runs a phase function in this process (shared browser) and returns
+    True if it reports success.
+    """
+    print("\n" + "=" * 80)
+    print(f"🔥 STARTING {phase_name} (in-process, shared browser)")
+    print("=" * 80)
+
+    start_time = time.time()
+    try:
+        ok = fn(*args, **kwargs)
+    except Exception as e:
+        print(f"\n❌ CRITICAL ERROR during {phase_name}: {e}")
+        return False
+
+    duration = time.time() - start_time
+    if ok:
+        print(f"\n✅ {phase_name} COMPLETED SUCCESSFULLY in {duration:.2f}s")
+    else:
+        print(f"\n❌ {phase_name} FAILED")
+    return bool(ok)
+
+def run_step(state: RunState, key: str, runner) -> bool:
+    """
+    runner() unless phase `key` already completed in this run; records it
+    as done when runner() succeeds.
+    """
+    if state.is_done("phase", key, "done"):
+        print(f"\n[RUN] ⏭️ {key} already completed in run {state.run_id}, skipping")
+        return True
+    ok = runner()
+    if ok:
+        state.mark("phase", key, "done")
+    return ok
+
+def start_browser():
+    """Launches the browser shared by the in-process phases; returns (browser, seconds)."""
+    from playwright_manager import PlaywrightManager
+
+    start_time = time.perf_counter()
+    print("\n[INIT] Launching shared browser...")
+    browser = PlaywrightManager(headless=False)
+    browser.start()
+    return browser, time.perf_counter() - start_time
+
+def run_overlapped_phases(browser=None, run_state=None) -> bool:
+    """
+    Phase 2 in this process, feeding each downloaded PDF to a Phase 3
+    streaming consumer thread (extraction workers + batched DB updates).
+    PDFs already in data/scrapped are extracted first if new or changed.
+    browser: the shared browser (default: launch one for this phase).
+    run_state: records downloaded bids (see PDFDownloader). Returns True if both phases completed.
+    """
+    from run_phase2 import run_phase2
+    from run_phase3_stream import start_stream_consumer
+
+    print("\n" + "=" * 80)
+    print("🔥 STARTING PHASES 2 + 3: PDF DOWNLOADING WITH OVERLAPPED EXTRACTION")
+    print("=" * 80)
+    start_time = time.time()
+
+    feed, consumer, outcome = start_stream_consumer()
+
+    own_browser = browser is None
+    try:
+        if own_browser:
+            browser, _ = start_browser()
+        outcome["phase2"] = run_phase2(browser, on_download=feed.put, run_state=run_state)
+    except Exception as e:
+        print(f"\n❌ Phase 2 failed: {e}")
+        outcome["phase2"] = False
+    finally:
+        if own_browser and browser is not None:
+            browser.stop()
+        feed.close()
+        print("\n[OVERLAP] Downloads finished, waiting for extraction to drain...")
+        consumer.join()
+
+    duration = time.time() - start_time
+    ok = outcome.get("phase2") and outcome.get("phase3")
+    if ok:
+        print(f"\n✅ PHASES 2 + 3 COMPLETED SUCCESSFULLY in {duration:.2f}s")
+    else:
+        print(f"\n❌ PHASES 2 + 3 FAILED (download: {outcome.get('phase2')}, "
+              f"extraction: {outcome.get('phase3')})")
+    return bool(ok)
+
+def run_isolated_phases(overlap: bool, state: RunState) -> bool:
+    """Phases 1 and 2 (2 + 3 with overlap), each phase in its own interpreter and browser."""
+    run_args = ["--run-id", state.run_id]
+
+    # PHASE 1: Scrape rows into DB
+    if not run_step(state, "phase1", lambda: run_phase("PHASE 1: ROW SCRAPING", "run.py", run_args)):
+        print("\n🛑 Pipeline halted after Phase 1 failure.")
+        return False
+
+    if overlap:
+        # PHASES 2 + 3: download and extract concurrently
+        if not run_step(state, "phase2+3", lambda: run_overlapped_phases(run_state=state)):
+            print("\n🛑 Pipeline halted after Phase 2/3 failure.")
+            return False
+        return True
+
+    # PHASE 2: Download PDFs for the newly scraped rows
+    if not run_step(state, "phase2",
+                    lambda: run_phase("PHASE 2: PDF DOWNLOADING", "run_phase2.py", run_args)):
+        print("\n🛑 Pipeline halted after Phase 2 failure.")
+        return False
+    return True
+
+def run_shared_phases(overlap: bool, state: RunState) -> bool:
+    """
+    Phases 1 and 2 (2 + 3 with overlap) in this process on one browser
+    session and one loaded solver. Reports the startup cost paid once here,
+    which --isolated pays again for every phase.
+    """
+    start_time = time.perf_counter()
+    # Controllers pull in playwright, cv2, tesseract bindings and the DB pool
+    from run import run_phase1
+    from run_phase2 import run_phase2
+    import_seconds = time.perf_counter() - start_time
+
+    phases = ["phase1", "phase2+3" if overlap else "phase2"]
+    if all(state.is_done("phase", key, "done") for key in phases):
+        print(f"\n[RUN] ⏭️ Phases 1 and 2 already completed in run {state.run_id}, skipping")
+        return True
+
+    browser = None
+    try:
+        browser, browser_seconds = start_browser()
+        startup = import_seconds + browser_seconds
+        print(f"[STARTUP] ⏱️ imports {import_seconds:.1f}s + browser & gem.gov.in {browser_seconds:.1f}s "
+              f"= {startup:.1f}s measured, paid once")
+        print(f"[STARTUP]    estimate: ~{startup:.1f}s saved per extra phase vs --isolated, which "
+              f"starts again in each phase (its measured times are printed by each phase)")
+
+        # PHASE 1: Scrape rows into DB
+        if not run_step(state, "phase1", lambda: run_in_process(
+                "PHASE 1: ROW SCRAPING", run_phase1, browser, run_state=state)):
+            print("\n🛑 Pipeline halted after Phase 1 failure.")
+            return False
+
+        if overlap:
+            # PHASES 2 + 3: download and extract concurrently
+            if not run_step(state, "phase2+3", lambda: run_overlapped_phases(browser, run_state=state)):
+                print("\n🛑 Pipeline halted after Phase 2/3 failure.")
+                return False
+            return True
+
+        # PHASE 2: Download PDFs for the newly scraped rows
+        if not run_step(state, "phase2", lambda: run_in_process(
+                "PHASE 2: PDF DOWNLOADING", run_phase2, browser, run_state=state)):
+            print("\n🛑 Pipeline halted after Phase 2 failure.")
+            return False
+        return True
+    except Exception as e:
+        print(f"\n❌ CRITICAL ERROR starting the shared browser: {e}")
+        return False
+    finally:
+        if browser is not None:
+            browser.stop()
+
 def main():
+    parser = argparse.ArgumentParser(description="GeM contracts master pipeline")
+    parser.add_argument("--overlap", action="store_true",
+                        help="extract each PDF as soon as it is downloaded (Phases 2 + 3 together)")
+    parser.add_argument("--isolated", action="store_true",
+                        help="run Phases 1 and 2 as separate interpreters, each with its own browser")
+    parser.add_argument("--fresh", action="store_true",
+                        help="start a new run instead of resuming the last unfinished one")
+    parser.add_argument("--status", action="store_true",
+                        help="list recent runs and their progress, then exit")
+    args = parser.parse_args()
+
+    state = RunState()
+    if args.status:
+        state.print_status()
+        state.close()
+        return
+
     print("\n" + "#" * 80)
     print("🚀 GeM CONTRACTS EXTRACTION MASTER PIPELINE")
     print("#" * 80)
@@ -54,21 +252,46 @@ def main():
     if not hasattr(sys, 'real_prefix') and not (sys.base_prefix != sys.prefix):
         print("⚠️ Warning: It is recommended to run this script inside a virtual environment (venv).")
 
-    # PHASE 1: Scrape rows into DB
-    if not run_phase("PHASE 1: ROW SCRAPING", "run.py"):
-        print("\n🛑 Pipeline halted after Phase 1 failure.")
-        return
+    # An unfinished run stays 'running' and is resumed by the next start
+    state.open_run("main", resume=not args.fresh, scope=phase1_window())
+    try:
+        if run_pipeline(args, state):
+            state.finish()
+            print_summary()
+    finally:
+        state.close()
 
-    # PHASE 2: Download PDFs for the newly scraped rows
-    if not run_phase("PHASE 2: PDF DOWNLOADING", "run_phase2.py"):
-        print("\n🛑 Pipeline halted after Phase 2 failure.")
-        return
+def run_pipeline(args, state: RunState) -> bool:
+    if args.isolated:
+        ok = run_isolated_phases(args.overlap, state)
+    else:
+        ok = run_shared_phases(args.overlap, state)
+    if not ok:
+        return False
 
-    # PHASE 3: Extract data from PDFs and update DB
-    if not run_phase("PHASE 3: DATA EXTRACTION & ANALYSIS", "run_phase3.py"):
+    if args.overlap:
+        # Phase 3 already ran alongside the downloads: only the CSV is left
+        if not run_step(state, "csv_export",
+                        lambda: run_phase("PHASE 3: CSV EXPORT", "run_phase3_json_to_csv.py")):
+            print("\n🛑 Pipeline halted after CSV export failure.")
+            return False
+        # Consume the export's delta (rows changed since the last export) so it
+        # does not pile up; mostly rows the stream already wrote
+        if not run_step(state, "delta_sync",
+                        lambda: run_phase("PHASE 3: DB SYNC (changed rows)",
+                                          "save_seller_info_to_db.py", ["--delta"])):
+            print("\n🛑 Pipeline halted after database sync failure.")
+            return False
+        return True
+
+    # PHASE 3: Extract data from PDFs and update DB (per-PDF progress: extraction manifest)
+    if not run_step(state, "phase3",
+                    lambda: run_phase("PHASE 3: DATA EXTRACTION & ANALYSIS", "run_phase3.py")):
         print("\n🛑 Pipeline halted after Phase 3 failure.")
-        return
+        return False
+    return True
 
+def print_summary():
     print("\n" + "!" * 80)
     print("🎉 ALL PHASES COMPLETED SUCCESSFULLY!")
     print("!" * 80)
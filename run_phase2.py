@@ -1,31 +1,69 @@
+import time
+# Startup is timed from here (reported as [STARTUP], compare with run_main.py)
+_IMPORT_START = time.perf_counter()
+
+import argparse
+
 from playwright_manager import PlaywrightManager
 from controller.pdfdownload import PDFDownloader
+from service.run_state import RunState
 
 
-def main():
-    print("=" * 70)
-    print("📥 GeM Contracts PDF Download System (PHASE-2)")
-    print("=" * 70)
+def parse_args():
+    parser = argparse.ArgumentParser(description="GeM Contracts PDF Download System (PHASE-2)")
+    parser.add_argument("--run-id", default=None,
+                        help="record progress under this pipeline run (set by run_main.py)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="start a new run instead of resuming the last unfinished one")
+    return parser.parse_args()
 
-    print("\n[INIT] Launching browser...")
-    browser = PlaywrightManager(headless=False)
-    browser.start()
 
+def run_phase2(browser, on_download=None, run_state=None):
+    """
+    Phase 2 on an already started browser (also used by run_main.py, which
+    shares one browser across phases). on_download, run_state: see
+    PDFDownloader. Returns True if it completed.
+    """
     try:
-        downloader = PDFDownloader(browser)
+        downloader = PDFDownloader(browser, on_download=on_download, run_state=run_state)
         downloader.run()   # ✅ CORRECT METHOD
 
         print("\n" + "=" * 70)
         print("🎉 PHASE-2 COMPLETED")
         print("=" * 70)
+        return True
 
     except Exception as e:
         print(f"\n❌ Critical error: {e}")
         import traceback
         traceback.print_exc()
+        return False
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 70)
+    print("📥 GeM Contracts PDF Download System (PHASE-2)")
+    print("=" * 70)
+
+    run_state = RunState()
+    run_state.open_run("phase2", run_id=args.run_id, resume=not args.fresh)
 
+    print("\n[INIT] Launching browser...")
+    launch_start = time.perf_counter()
+    browser = PlaywrightManager(headless=False)
+    browser.start()
+    print(f"[STARTUP] ⏱️ imports {launch_start - _IMPORT_START:.1f}s + browser & gem.gov.in "
+          f"{time.perf_counter() - launch_start:.1f}s (measured, this phase)")
+
+    try:
+        # A run handed over by run_main.py is finished by run_main.py
+        if run_phase2(browser, run_state=run_state) and not args.run_id:
+            run_state.finish()
     finally:
         browser.stop()
+        run_state.close()
 
 
 if __name__ == "__main__":
@@ -7,12 +7,15 @@ Master script that runs both extraction steps:
 Run this to execute the complete Phase 3 pipeline.
 """
 
+import argparse
 import subprocess
 import sys
 import os
 from pathlib import Path
 
-def run_step(step_name: str, script_path: str) -> bool:
+from service.pdf_engines import available_engines
+
+def run_step(step_name: str, script_path: str, extra_args: list = None) -> bool:
     """
     Run a Python script and return True if successful.
     """
@@ -23,7 +26,7 @@ def run_step(step_name: str, script_path: str) -> bool:
     try:
         # Run the script
         result = subprocess.run(
-            [sys.executable, script_path],
+            [sys.executable, script_path] + (extra_args or []),
             cwd=os.getcwd(),
             capture_output=False,
             text=True
@@ -49,19 +52,12 @@ def check_dependencies():
     
     missing_deps = []
     
-    # Check for PDF libraries
-    pdf_lib_found = False
-    try:
-        import pdfplumber
-        print("  ✓ pdfplumber found")
-        pdf_lib_found = True
-    except ImportError:
-        try:
-            import PyPDF2
-            print("  ✓ PyPDF2 found")
-            pdf_lib_found = True
-        except ImportError:
-            missing_deps.append("pdfplumber or PyPDF2")
+    # Check for PDF extraction engines (service/pdf_engines.py)
+    engines = available_engines()
+    if engines:
+        print(f"  ✓ PDF engines found: {', '.join(engines)}")
+    else:
+        missing_deps.append("pdfplumber or PyPDF2")
     
     if missing_deps:
         print("\n✗ Missing dependencies:")
@@ -101,6 +97,14 @@ def main():
     """
     Main execution function for Phase 3 pipeline.
     """
+    parser = argparse.ArgumentParser(description="Phase 3: PDF to JSON to CSV pipeline")
+    parser.add_argument("--force", action="store_true",
+                        help="re-extract every PDF (default: only new/changed PDFs)")
+    parser.add_argument("--stream", action="store_true",
+                        help="one streaming pass PDF → fields → database (run_phase3_stream.py) "
+                             "instead of the JSON and CSV steps")
+    args = parser.parse_args()
+
     print("=" * 80)
     print("PHASE 3: PDF TO JSON TO CSV PIPELINE")
     print("=" * 80)
@@ -119,10 +123,20 @@ def main():
         print("\n✗ Input file check failed. Please ensure PDFs are in data/scrapped/")
         return
     
+    if args.stream:
+        if run_step(
+            "Streaming: PDFs to Seller Info to Database",
+            "run_phase3_stream.py",
+            ["--force"] if args.force else None
+        ):
+            print("\n✓ Streaming pipeline complete (JSON/CSV side outputs: see run_phase3_stream.py --help)")
+        return
+
     # Run Step 1: PDF to JSON extraction
     step1_success = run_step(
         "Step 1: Extract PDFs to JSON",
-        "run_phase3_extract_pdf_v2.py"
+        "run_phase3_extract_pdf_v2.py",
+        ["--force"] if args.force else None
     )
     
     if not step1_success:
@@ -142,7 +156,9 @@ def main():
     # Run Step 3: Save to Database
     step3_success = run_step(
         "Step 3: Save Seller Info to Database",
-        "save_seller_info_to_db.py"
+        "save_seller_info_to_db.py",
+        # Step 2 lists the rows that changed since the last sync
+        ["--delta"]
     )
     
     if not step3_success:
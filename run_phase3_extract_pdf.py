@@ -6,11 +6,13 @@ Filters out Hindi/non-English content and keeps only English text
 
 import os
 import json
-import re
+import argparse
 from pathlib import Path
-from typing import Dict, List, Any
-import pdfplumber
 from datetime import datetime
+from typing import Optional
+
+from service.extract_manifest import ExtractManifest, FailureLog
+from service.pdf_extractor import extract_with_pdfplumber
 
 # Directories
 SCRAPPED_PDF_DIR = "data/scrapped"
@@ -20,186 +22,54 @@ JSON_OUTPUT_DIR = "data/JSON"
 Path(JSON_OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
 
 
-def is_english_text(text: str) -> bool:
-    """
-    Check if text contains primarily English characters.
-    Returns True if the text is predominantly English.
-    """
-    if not text or not text.strip():
-        return False
-    
-    # Remove whitespace and special characters for analysis
-    cleaned_text = re.sub(r'[^\w\s]', '', text)
-    if not cleaned_text:
-        return False
-    
-    # Count English characters (ASCII letters and numbers)
-    english_chars = sum(1 for c in cleaned_text if ord(c) < 128 and (c.isalnum() or c.isspace()))
-    total_chars = len(cleaned_text)
-    
-    # If more than 70% are English characters, consider it English
-    if total_chars > 0:
-        return (english_chars / total_chars) > 0.7
-    return False
-
-
-def clean_english_text(text: str) -> str:
-    """
-    Clean text by removing Hindi and non-English content.
-    Keeps only English letters, numbers, and common punctuation.
-    """
-    if not text:
-        return ""
-    
-    # Split into lines and filter
-    lines = text.split('\n')
-    english_lines = []
-    
-    for line in lines:
-        line = line.strip()
-        if line and is_english_text(line):
-            # Remove any remaining non-ASCII characters
-            clean_line = ''.join(char if ord(char) < 128 else ' ' for char in line)
-            clean_line = ' '.join(clean_line.split())  # Normalize whitespace
-            if clean_line:
-                english_lines.append(clean_line)
-    
-    return '\n'.join(english_lines)
-
-
-def extract_tables_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
-    """
-    Extract tables from PDF and return as list of dictionaries.
-    Only includes tables with English content.
-    """
-    tables_data = []
-    
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                tables = page.extract_tables()
-                
-                if tables:
-                    for table_num, table in enumerate(tables, start=1):
-                        # Convert table to clean format
-                        clean_table = []
-                        for row in table:
-                            clean_row = []
-                            for cell in row:
-                                if cell:
-                                    cell_text = str(cell).strip()
-                                    if is_english_text(cell_text):
-                                        clean_cell = clean_english_text(cell_text)
-                                        clean_row.append(clean_cell)
-                                    else:
-                                        clean_row.append("")
-                                else:
-                                    clean_row.append("")
-                            
-                            # Only add row if it has some content
-                            if any(clean_row):
-                                clean_table.append(clean_row)
-                        
-                        if clean_table:
-                            tables_data.append({
-                                "page": page_num,
-                                "table_number": table_num,
-                                "data": clean_table
-                            })
-    except Exception as e:
-        print(f"Error extracting tables: {e}")
-    
-    return tables_data
-
-
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """
-    Extract text content from PDF.
-    Returns only English text content.
-    """
-    full_text = ""
-    
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    clean_text = clean_english_text(text)
-                    if clean_text:
-                        full_text += clean_text + "\n"
-    except Exception as e:
-        print(f"Error extracting text: {e}")
-    
-    return full_text.strip()
-
-
-def extract_metadata_from_pdf(pdf_path: str) -> Dict[str, Any]:
-    """
-    Extract metadata from PDF file.
-    """
-    metadata = {}
-    
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if pdf.metadata:
-                # Only include metadata that has English content
-                for key, value in pdf.metadata.items():
-                    if value:
-                        str_value = str(value)
-                        if is_english_text(str_value):
-                            metadata[key] = clean_english_text(str_value)
-    except Exception as e:
-        print(f"Error extracting metadata: {e}")
-    
-    return metadata
-
-
-def extract_pdf_to_json(pdf_path: str, output_path: str) -> bool:
+def extract_pdf_to_json(pdf_path: str, output_path: str) -> Optional[str]:
     """
     Extract PDF content and save as JSON file.
-    Returns True if successful, False otherwise.
+    Returns None if successful, otherwise why the PDF failed. A JSON file
+    with whatever was extracted is still written when pdfplumber reports
+    an error part-way.
     """
     try:
         print(f"Processing: {os.path.basename(pdf_path)}...")
         
-        # Extract different components
-        text_content = extract_text_from_pdf(pdf_path)
-        tables = extract_tables_from_pdf(pdf_path)
-        metadata = extract_metadata_from_pdf(pdf_path)
+        # Text, tables, metadata and page count from a single open
+        extracted = extract_with_pdfplumber(pdf_path)
         
         # Build JSON structure
         json_data = {
             "source_file": os.path.basename(pdf_path),
             "extraction_date": datetime.now().isoformat(),
-            "metadata": metadata,
-            "text_content": text_content,
-            "tables": tables,
-            "table_count": len(tables),
-            "total_pages": 0
+            "metadata": extracted["metadata"],
+            "text_content": extracted["text_content"],
+            "tables": extracted["tables"],
+            "table_count": len(extracted["tables"]),
+            "total_pages": extracted["total_pages"],
+            "char_dedupe": extracted["char_dedupe"]
         }
         
-        # Get page count
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                json_data["total_pages"] = len(pdf.pages)
-        except:
-            pass
-        
         # Save to JSON file
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(json_data, f, indent=2, ensure_ascii=False)
         
+        if extracted.get("error"):
+            print(f"✗ Partial: {os.path.basename(output_path)} ({extracted['error']})")
+            return f"partial: {extracted['error']}"
+
         print(f"✓ Saved: {os.path.basename(output_path)}")
-        return True
+        return None
         
     except Exception as e:
         print(f"✗ Error processing {os.path.basename(pdf_path)}: {e}")
-        return False
+        return f"{type(e).__name__}: {e}"
 
 
-def process_all_pdfs():
+def process_all_pdfs(force: bool = False, only_changed: bool = False):
     """
     Process all PDFs in the scrapped directory and convert to JSON.
+    PDFs whose JSON is already up to date are skipped unless force is set.
+    only_changed: ignore extractor changes, extract only new/changed PDFs.
+    Failed PDFs are not marked up to date (retried on the next run) and are
+    listed with the reason in data/JSON/.failures.json.
     """
     # Get all PDF files
     pdf_files = list(Path(SCRAPPED_PDF_DIR).glob("*.pdf"))
@@ -213,22 +83,39 @@ def process_all_pdfs():
     
     success_count = 0
     failed_count = 0
+    skipped_count = 0
+    manifest = ExtractManifest(JSON_OUTPUT_DIR)
+    failures = FailureLog(JSON_OUTPUT_DIR)
     
-    for pdf_file in pdf_files:
-        # Generate output filename (GEMC-XXXX.pdf -> GEMC-XXXX.json)
-        json_filename = pdf_file.stem + ".json"
-        json_path = os.path.join(JSON_OUTPUT_DIR, json_filename)
-        
-        # Extract and save
-        if extract_pdf_to_json(str(pdf_file), json_path):
-            success_count += 1
-        else:
-            failed_count += 1
+    try:
+        for pdf_file in pdf_files:
+            # Generate output filename (GEMC-XXXX.pdf -> GEMC-XXXX.json)
+            json_filename = pdf_file.stem + ".json"
+            json_path = os.path.join(JSON_OUTPUT_DIR, json_filename)
+            
+            reason, fingerprint = manifest.check(str(pdf_file), "pdfplumber", ignore_version=only_changed)
+            if reason is None and not force:
+                skipped_count += 1
+                continue
+            
+            # Extract and save
+            error = extract_pdf_to_json(str(pdf_file), json_path)
+            if error is None:
+                success_count += 1
+                manifest.record(str(pdf_file), fingerprint, "pdfplumber", json_path)
+                failures.clear(str(pdf_file))
+            else:
+                failed_count += 1
+                failures.record(str(pdf_file), error)
+    finally:
+        manifest.save()
+        failures.save()
     
     print("=" * 60)
     print(f"Processing complete!")
     print(f"✓ Success: {success_count}")
-    print(f"✗ Failed: {failed_count}")
+    print(f"✗ Failed: {failed_count}" + (f" → {failures.path}" if failed_count else ""))
+    print(f"⏭️  Up to date (skipped): {skipped_count}")
     print(f"JSON files saved in: {JSON_OUTPUT_DIR}")
 
 
@@ -239,4 +126,11 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
-    process_all_pdfs()
+    parser = argparse.ArgumentParser(description="Phase 3: PDF to JSON extraction")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--force", action="store_true",
+                      help="re-extract every PDF, even if its JSON is up to date")
+    mode.add_argument("--only-changed", action="store_true",
+                      help="extract only new or modified PDFs, even after an extractor change")
+    args = parser.parse_args()
+    process_all_pdfs(force=args.force, only_changed=args.only_changed)
@@ -1,218 +1,331 @@
 """
 Phase 3: Fast PDF to JSON Extraction Script
-Uses multi-processing for maximum speed.
+Uses multi-processing for maximum speed, with per-file timeouts and worker
+recycling (service/extract_scheduler.py).
 Extracts content from scraped PDFs and converts to clean JSON files
+(or compact JSONL shards with --format jsonl, see service/jsonl_shards.py)
 Filters out Hindi/non-English content and keeps only English text.
 """
 
 import os
 import json
-import re
+import argparse
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from concurrent.futures import ProcessPoolExecutor, as_completed
-
-# Try importing PDF libraries
-PDF_LIBRARY = None
-try:
-    import pdfplumber
-    PDF_LIBRARY = "pdfplumber"
-except ImportError:
-    try:
-        import PyPDF2
-        PDF_LIBRARY = "PyPDF2"
-    except ImportError:
-        pass
+
+from service.extract_manifest import ExtractManifest, FailureLog
+from service.extract_scheduler import EXTRACT_TIMEOUT, MAX_MEMORY_MB, MAX_TASKS_PER_CHILD, ExtractScheduler
+from service.jsonl_shards import ShardWriter, compact_record, dumps, prune_superseded
+from service.pdf_engines import ENGINES, available_engines, default_engine, get_engine
+from service.pdf_sources import iter_sources, open_source, source_name
+
+# Default engine: pdfplumber if installed, otherwise the fastest available
+# text-layer engine (see service/pdf_engines.py). Override with --engine.
+PDF_LIBRARY = default_engine()
 
 # Directories
 SCRAPPED_PDF_DIR = "data/scrapped"
 JSON_OUTPUT_DIR = "data/JSON"
+PARTS_DIR = ".parts"
 
-def is_english_text(text: str) -> bool:
-    """Check if text contains primarily English characters."""
-    if not text or not text.strip():
-        return False
-    # Remove whitespace and special characters for analysis
-    cleaned_text = re.sub(r'[^\w\s]', '', text)
-    if not cleaned_text:
-        return False
-    # Count English characters (ASCII letters and numbers)
-    english_chars = sum(1 for c in cleaned_text if ord(c) < 128 and (c.isalnum() or c.isspace()))
-    total_chars = len(cleaned_text)
-    # If more than 70% are English characters, consider it English
-    if total_chars > 0:
-        return (english_chars / total_chars) > 0.7
-    return False
-
-def clean_english_text(text: str) -> str:
-    """Clean text by removing Hindi and non-English content."""
-    if not text:
-        return ""
-    # Split into lines and filter
-    lines = text.split('\n')
-    english_lines = []
-    for line in lines:
-        line = line.strip()
-        if line and is_english_text(line):
-            # Remove any remaining non-ASCII characters
-            clean_line = ''.join(char if ord(char) < 128 else ' ' for char in line)
-            clean_line = ' '.join(clean_line.split())  # Normalize whitespace
-            if clean_line:
-                english_lines.append(clean_line)
-    return '\n'.join(english_lines)
-
-def extract_with_pdfplumber(pdf_path: str) -> Dict[str, Any]:
-    """Extract PDF content using pdfplumber library."""
-    import pdfplumber
-    result = {"text_content": "", "tables": [], "metadata": {}, "total_pages": 0}
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            result["total_pages"] = len(pdf.pages)
-            # Extract metadata
-            if pdf.metadata:
-                for key, value in pdf.metadata.items():
-                    if value:
-                        str_val = str(value)
-                        if is_english_text(str_val):
-                            result["metadata"][key] = clean_english_text(str_val)
-            # Extract text from all pages
-            full_text = ""
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    clean_txt = clean_english_text(text)
-                    if clean_txt:
-                        full_text += clean_txt + "\n"
-            result["text_content"] = full_text.strip()
-            # Extract tables
-            for page_num, page in enumerate(pdf.pages, start=1):
-                tables = page.extract_tables()
-                if tables:
-                    for table_num, table in enumerate(tables, start=1):
-                        clean_table = []
-                        for row in table:
-                            clean_row = []
-                            for cell in row:
-                                if cell:
-                                    cell_text = str(cell).strip()
-                                    if is_english_text(cell_text):
-                                        clean_row.append(clean_english_text(cell_text))
-                                    else:
-                                        clean_row.append("")
-                                else:
-                                    clean_row.append("")
-                            if any(clean_row):
-                                clean_table.append(clean_row)
-                        if clean_table:
-                            result["tables"].append({
-                                "page": page_num, "table_number": table_num, "data": clean_table
-                            })
-    except Exception as e:
-        print(f"Error with pdfplumber on {pdf_path}: {e}")
-    return result
-
-def extract_with_pypdf2(pdf_path: str) -> Dict[str, Any]:
-    """Extract PDF content using PyPDF2 library."""
-    import PyPDF2
-    result = {"text_content": "", "tables": [], "metadata": {}, "total_pages": 0}
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            result["total_pages"] = len(pdf_reader.pages)
-            # Extract metadata
-            if pdf_reader.metadata:
-                for key, value in pdf_reader.metadata.items():
-                    if value:
-                        str_val = str(value)
-                        if is_english_text(str_val):
-                            result["metadata"][key.replace('/', '')] = clean_english_text(str_val)
-            # Extract text from all pages
-            full_text = ""
-            for page in pdf_reader.pages:
-                text = page.extract_text()
-                if text:
-                    clean_txt = clean_english_text(text)
-                    if clean_txt:
-                        full_text += clean_txt + "\n"
-            result["text_content"] = full_text.strip()
-    except Exception as e:
-        print(f"Error with PyPDF2 on {pdf_path}: {e}")
-    return result
+# PDFs with more pages are extracted as ranges of this many pages on
+# several workers (engines with page_ranges support); 0 disables splitting
+PAGE_CHUNK = 8
 
-def process_single_pdf(args: Tuple[str, str, str]) -> bool:
-    """Task for worker processes."""
-    pdf_path, output_path, lib = args
+# "json": one pretty-printed file per PDF; "jsonl": records appended to
+# rotating shards (data/JSON/contracts-NNNNNN.jsonl)
+OUTPUT_FORMATS = ("json", "jsonl")
+OUTPUT_FORMAT = "json"
+
+def build_json_data(pdf_path: str, lib: str, extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON structure written for one PDF."""
+    json_data = {
+        "source_file": source_name(pdf_path),
+        "extraction_date": datetime.now().isoformat(),
+        "extraction_method": lib,
+        "metadata": extracted_data["metadata"],
+        "text_content": extracted_data["text_content"],
+        "tables": extracted_data["tables"],
+        "table_count": len(extracted_data["tables"]),
+        "total_pages": extracted_data["total_pages"]
+    }
+    if extracted_data.get("char_dedupe"):
+        json_data["char_dedupe"] = True
+    if extracted_data.get("regions"):
+        json_data["regions"] = extracted_data["regions"]
+    return json_data
+
+def write_output(pdf_path: str, output_path: str, lib: str, extracted_data: Dict[str, Any],
+                 output_format: str = OUTPUT_FORMAT) -> Optional[Dict[str, bytes]]:
+    """
+    Write the JSON file of a PDF, or (jsonl) return {"line": ...}: the
+    serialized shard record, appended to the current shard by the parent.
+    """
+    json_data = build_json_data(pdf_path, lib, extracted_data)
+    if output_format == "jsonl":
+        return {"line": dumps(compact_record(json_data))}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(json_data, f, indent=2, ensure_ascii=False)
+    return None
+
+def part_path(output_path: str, start: int) -> Path:
+    """Partial result of the page range starting at `start` of a split PDF."""
+    out = Path(output_path)
+    return out.parent / PARTS_DIR / f"{out.stem}.{start:06d}.json"
+
+def write_part(output_path: str, extracted_data: Dict[str, Any], start: int):
+    path = part_path(output_path, start)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(extracted_data, f, ensure_ascii=False)
+
+def discard_parts(output_path: str):
+    out = Path(output_path)
+    for path in (out.parent / PARTS_DIR).glob(f"{out.stem}.*.json"):
+        path.unlink()
+
+def merge_parts(pdf_path: str, output_path: str, lib: str, total_pages: int, page_chunk: int,
+                output_format: str = OUTPUT_FORMAT) -> Any:
+    """
+    Join the page ranges of a split PDF, in page order, into its JSON file
+    (write_output). Returns what write_output returns, or why it failed.
+    """
+    merged = None
+    text_parts = []
     try:
-        # Extract based on available library
-        if lib == "pdfplumber":
-            extracted_data = extract_with_pdfplumber(pdf_path)
-        elif lib == "PyPDF2":
-            extracted_data = extract_with_pypdf2(pdf_path)
+        for start in range(0, total_pages, page_chunk):
+            with open(part_path(output_path, start), 'r', encoding='utf-8') as f:
+                part = json.load(f)
+            if merged is None:
+                merged = part
+            else:
+                merged["tables"].extend(part["tables"])
+            if part["text_content"]:
+                text_parts.append(part["text_content"])
+        merged["text_content"] = "\n".join(text_parts)
+        merged.pop("page_range", None)
+        return write_output(pdf_path, output_path, lib, merged, output_format)
+    except (OSError, ValueError, KeyError) as e:
+        return f"merge failed: {type(e).__name__}: {e}"
+    finally:
+        discard_parts(output_path)
+
+def extract_single_pdf(args: Tuple) -> Any:
+    """
+    Task for worker processes:
+    (pdf_path, output_path, engine[, page_range, page_chunk, output_format]).
+    pdf_path may be a ZIP member reference (service/pdf_sources.py).
+    Returns None ({"line": ...} for jsonl, see write_output) on success,
+    otherwise why the PDF failed. A JSON file with whatever was extracted
+    is still written when the engine reports an error part-way.
+
+    PDFs longer than page_chunk pages (with an engine that supports page
+    ranges) are split: this task extracts the first page_chunk pages and
+    returns {"split": total_pages}; the parent then queues the remaining
+    ranges and merges the parts (merge_parts). A range task returns
+    {"part": start}.
+    """
+    defaults = (None, 0, OUTPUT_FORMAT)
+    pdf_path, output_path, lib, page_range, page_chunk, output_format = tuple(args) + defaults[len(args) - 3:]
+    # Extract with the selected engine
+    if lib not in ENGINES:
+        return f"unknown engine {lib}"
+    engine = get_engine(lib)
+
+    # Files are memory-mapped, ZIP members read into memory (no temp files)
+    with open_source(pdf_path) as pdf:
+        if page_range is not None:
+            extracted_data = engine.extract(pdf, page_range=tuple(page_range))
+            if extracted_data.get("error"):
+                return extracted_data["error"]
+            write_part(output_path, extracted_data, page_range[0])
+            return {"part": page_range[0]}
+
+        if engine.page_ranges and page_chunk:
+            extracted_data = engine.extract(pdf, page_range=(0, page_chunk))
+            if extracted_data["total_pages"] > page_chunk and not extracted_data.get("error"):
+                write_part(output_path, extracted_data, 0)
+                return {"split": extracted_data["total_pages"]}
+            extracted_data.pop("page_range", None)
         else:
-            return False
-
-        # Build JSON structure
-        json_data = {
-            "source_file": os.path.basename(pdf_path),
-            "extraction_date": datetime.now().isoformat(),
-            "extraction_method": lib,
-            "metadata": extracted_data["metadata"],
-            "text_content": extracted_data["text_content"],
-            "tables": extracted_data["tables"],
-            "table_count": len(extracted_data["tables"]),
-            "total_pages": extracted_data["total_pages"]
-        }
-        # Save to JSON file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception:
-        return False
-
-def process_all_pdfs():
-    """Process all PDFs in parallel."""
+            extracted_data = engine.extract(pdf)
+
+    # Save to JSON file (or hand the shard record to the parent)
+    output = write_output(pdf_path, output_path, lib, extracted_data, output_format)
+    if extracted_data.get("error"):
+        return f"partial: {extracted_data['error']}"
+    return output
+
+def process_single_pdf(args: Tuple[str, str, str]) -> bool:
+    """True if the PDF was extracted without errors (whole document, JSON output)."""
+    return extract_single_pdf(args) is None
+
+def collect_pdfs(inputs: List[str]) -> List[str]:
+    """PDF refs in the inputs; the same contract in two inputs (e.g. a folder and an archive): first wins."""
+    pdf_files = []
+    seen_names = set()
+    for ref in iter_sources(inputs):
+        if source_name(ref) not in seen_names:
+            seen_names.add(source_name(ref))
+            pdf_files.append(ref)
+    return pdf_files
+
+def process_all_pdfs(engine: str = None, force: bool = False, only_changed: bool = False,
+                     workers: int = None, timeout: float = EXTRACT_TIMEOUT,
+                     max_tasks_per_child: int = MAX_TASKS_PER_CHILD,
+                     max_memory_mb: float = MAX_MEMORY_MB, page_chunk: int = PAGE_CHUNK,
+                     inputs: List[str] = None, output_format: str = OUTPUT_FORMAT):
+    """
+    Process PDFs in parallel (service/extract_scheduler.py).
+    By default only PDFs that are new, changed or were extracted by another
+    engine/extractor version (see service/extract_manifest.py) are processed.
+    force: re-extract everything.
+    only_changed: ignore extractor changes, extract only new/changed PDFs.
+    Failed PDFs and the reason are listed in data/JSON/.failures.json and
+    retried on the next run.
+    PDFs longer than page_chunk pages are extracted as page ranges on
+    several workers and merged back in page order.
+    inputs: directories, PDFs and ZIP archives (default: data/scrapped).
+    output_format: "json" files, or "jsonl" shards written by this process
+    (shards left without a current record are deleted after the run).
+    """
+    engine = engine or PDF_LIBRARY
     Path(JSON_OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
-    pdf_files = list(Path(SCRAPPED_PDF_DIR).glob("*.pdf"))
+    inputs = inputs or [SCRAPPED_PDF_DIR]
+    pdf_files = collect_pdfs(inputs)
     if not pdf_files:
-        print(f"No PDF files found in {SCRAPPED_PDF_DIR}")
+        print(f"No PDF files found in {', '.join(inputs)}")
         return
 
-    if not PDF_LIBRARY:
+    if not engine:
         print("✗ No PDF library found. Please install: pip install pdfplumber or PyPDF2")
         return
+    if not get_engine(engine).available:
+        print(f"✗ Engine '{engine}' is not installed (pip install {get_engine(engine).module})")
+        return
 
+    mode = "force" if force else "only-changed" if only_changed else "incremental"
+    scheduler = ExtractScheduler(extract_single_pdf, workers=workers, timeout=timeout,
+                                 max_tasks_per_child=max_tasks_per_child,
+                                 max_memory_mb=max_memory_mb)
     print(f"\n🚀 Phase 3: Fast Parallel Extraction")
-    print(f"   Mode: {PDF_LIBRARY} | Files: {len(pdf_files)}")
+    print(f"   Mode: {engine} | Files: {len(pdf_files)} | Run: {mode} | Output: {output_format}")
+    print(f"   Workers: {scheduler.workers} | Timeout: {timeout:.0f}s/file | "
+          f"Recycle: {max_tasks_per_child} files or {max_memory_mb or '-'} MB")
     print("=" * 70)
 
-    # Prepare tasks
-    tasks = []
-    for pdf_file in pdf_files:
-        json_path = os.path.join(JSON_OUTPUT_DIR, pdf_file.stem + ".json")
-        tasks.append((str(pdf_file), json_path, PDF_LIBRARY))
+    manifest = ExtractManifest(JSON_OUTPUT_DIR)
+    failures = FailureLog(JSON_OUTPUT_DIR)
+    fingerprints = {}
+    reasons = {}
+    shards = ShardWriter(JSON_OUTPUT_DIR) if output_format == "jsonl" else None
+
+    def pending_tasks():
+        for pdf_file, _ in manifest.stale(pdf_files, engine, fingerprints, force=force,
+                                          ignore_version=only_changed, reasons=reasons):
+            json_path = os.path.join(JSON_OUTPUT_DIR, Path(source_name(pdf_file)).stem + ".json")
+            yield (pdf_file, json_path, engine, None, page_chunk, output_format)
 
     success_count = 0
-    # Utilize all CPU cores
-    with ProcessPoolExecutor() as executor:
-        futures = {executor.submit(process_single_pdf, task): task for task in tasks}
-        
-        count = 0
-        for future in as_completed(futures):
+    count = 0
+    splits = {}   # pdf_path -> {"total", "remaining", "error"} of split PDFs
+    split_count = 0
+    try:
+        for task, result in scheduler.run(pending_tasks()):
+            pdf_path, json_path, _, page_range, _, _ = task
+            if isinstance(result, dict) and "split" in result:
+                # Large PDF: first range done, queue the rest ahead of new files
+                total = result["split"]
+                ranges = [(start, min(start + page_chunk, total)) for start in range(page_chunk, total, page_chunk)]
+                splits[pdf_path] = {"total": total, "remaining": len(ranges), "error": None}
+                for rng in ranges:
+                    scheduler.submit((pdf_path, json_path, engine, rng, page_chunk, output_format))
+                continue
+            if page_range is not None:
+                state = splits[pdf_path]
+                state["remaining"] -= 1
+                if isinstance(result, str) and not state["error"]:
+                    state["error"] = f"pages {page_range[0] + 1}-{page_range[1]}: {result}"
+                if state["remaining"]:
+                    continue
+                del splits[pdf_path]
+                if state["error"]:
+                    discard_parts(json_path)
+                    result = state["error"]
+                else:
+                    result = merge_parts(pdf_path, json_path, engine, state["total"], page_chunk, output_format)
+                    split_count += 1
+            error = result if isinstance(result, str) else None
             count += 1
-            pdf_path = futures[future][0]
-            if future.result():
+            if error is None and shards is not None:
+                json_path = shards.write(result["line"])
+            if error is None:
                 success_count += 1
-                if count % 5 == 0 or count == len(pdf_files):
-                    print(f"[{count}/{len(pdf_files)}] Processed: {os.path.basename(pdf_path)}")
+                manifest.record(pdf_path, fingerprints[pdf_path], engine, json_path)
+                failures.clear(pdf_path)
+                if count % 5 == 0:
+                    print(f"[{count}] Processed: {source_name(pdf_path)}")
             else:
-                print(f"[{count}/{len(pdf_files)}] ✗ Failed: {os.path.basename(pdf_path)}")
+                failures.record(pdf_path, error)
+                print(f"[{count}] ✗ Failed: {source_name(pdf_path)} ({error})")
+        if shards is not None:
+            shards.close()
+            prune_superseded(JSON_OUTPUT_DIR, manifest)
+    finally:
+        if shards is not None:
+            shards.close()
+        manifest.save()
+        failures.save()
 
+    skipped = len(pdf_files) - count
+    stats = scheduler.stats
     print("\n" + "=" * 70)
     print(f"📊 Fast Processing Complete!")
-    print(f"   ✓ Success: {success_count}/{len(pdf_files)}")
+    print(f"   ✓ Success: {success_count}/{count} (skipped {skipped} up to date"
+          + (f"; {', '.join(f'{k}: {v}' for k, v in sorted(reasons.items()))}" if reasons else "") + ")")
+    if count - success_count:
+        print(f"   ✗ Failed: {count - success_count} (timeouts: {stats['timeouts']}, "
+              f"memory: {stats['killed_memory']}, crashed: {stats['crashed']}) "
+              f"→ {failures.path}")
+    if split_count:
+        print(f"   📄 Split into {page_chunk}-page ranges: {split_count} large PDF(s)")
+    print(f"   ♻️  Workers recycled: {stats['recycled']}")
+    if shards is not None and shards.written:
+        print(f"   📦 Shards: {', '.join(path.name for path in shards.written)}")
     print(f"   📁 JSON: {JSON_OUTPUT_DIR}")
     print("=" * 70)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 3: PDF to JSON extraction")
+    parser.add_argument("--engine", choices=list(ENGINES), default=PDF_LIBRARY,
+                        help=f"extraction engine (default: {PDF_LIBRARY}; installed: "
+                             f"{', '.join(available_engines()) or 'none'})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--force", action="store_true",
+                      help="re-extract every PDF, even if its JSON is up to date")
+    mode.add_argument("--only-changed", action="store_true",
+                      help="extract only new or modified PDFs, even after an extractor change")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=EXTRACT_TIMEOUT,
+                        help=f"seconds per PDF before its worker is killed (default: {EXTRACT_TIMEOUT})")
+    parser.add_argument("--max-tasks-per-child", type=int, default=MAX_TASKS_PER_CHILD,
+                        help=f"PDFs per worker before it is replaced (default: {MAX_TASKS_PER_CHILD})")
+    parser.add_argument("--input", nargs="+", default=None, metavar="PATH",
+                        help=f"directories, PDFs or ZIP archives to extract (default: {SCRAPPED_PDF_DIR})")
+    parser.add_argument("--page-chunk", type=int, default=PAGE_CHUNK,
+                        help=f"split PDFs longer than N pages across workers, 0 = never (default: {PAGE_CHUNK})")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT, dest="output_format",
+                        help="json: one file per PDF; jsonl: compact rotating shards (default: json)")
+    parser.add_argument("--max-memory-mb", type=float, default=MAX_MEMORY_MB,
+                        help=f"worker RSS cap in MB, 0 = no cap (default: {MAX_MEMORY_MB})")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    process_all_pdfs()
+    args = parse_args()
+    process_all_pdfs(args.engine, force=args.force, only_changed=args.only_changed,
+                     workers=args.workers, timeout=args.timeout,
+                     max_tasks_per_child=args.max_tasks_per_child,
+                     max_memory_mb=args.max_memory_mb or None, page_chunk=args.page_chunk,
+                     inputs=args.input, output_format=args.output_format)
@@ -1,123 +1,189 @@
 """
 Phase 3B: Extract Seller Information from JSON to CSV
 Extracts bid_no, seller_id, seller_name, seller_email, seller_contact, unit_price
-from JSON files and saves to seller_info.csv
+from JSON files (and JSONL shards) and saves to seller_info.csv
+Documents are processed on a process pool and rows streamed to the CSV.
+Fields are cached per document and extractor version (service/field_cache.py):
+only fields whose version changed are recomputed, and the rows that changed
+since the last run also go to seller_info.delta.csv for the database sync.
 """
 
 import os
+import sys
 import json
 import csv
 import re
+import time
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List, Pattern, Tuple
+
+from service.extract_manifest import ExtractManifest
+from service.field_cache import (FieldCache, bytes_doc_key, cached_row, make_entry,
+                                 manifest_doc_key, stale_fields)
+from service.jsonl_shards import expand_record, iter_shard, iter_shard_lines, loads, shard_chunks, shard_paths
 
 # Directories
 JSON_DIR = "data/JSON"
 OUTPUT_CSV = "data/seller_info.csv"
+# Rows changed since the last run, consumed by save_seller_info_to_db.py --delta
+DELTA_CSV = "data/seller_info.delta.csv"
+
+# Parallel stage: JSON files per worker task, shard bytes per worker task,
+# tasks queued per worker, seconds between progress line updates
+BATCH_SIZE = 64
+SHARD_CHUNK_BYTES = 4 * 1024 * 1024
+INFLIGHT_PER_WORKER = 4
+PROGRESS_INTERVAL = 0.5
 
 # CSV Headers
 CSV_HEADERS = ["bid_no", "seller_id", "seller_name", "seller_email", "unit_price"]
 
 
-def extract_contract_number(text_content: str) -> Optional[str]:
-    """Extract Contract Number from text content."""
-    patterns = [
-        r'Contract\s+No\s*:+\s*([A-Z0-9-]+)',
-        r'CCoonnttrraacctt\s+NNoo\s*:+\s*([A-Z0-9-]+)',
-        r'Contract\s+Number\s*:+\s*([A-Z0-9-]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_content, re.IGNORECASE)
+def _compile(patterns: List[Tuple[str, bool]]) -> List[Tuple[Pattern, bool]]:
+    return [(re.compile(pattern, re.IGNORECASE), doubled_only) for pattern, doubled_only in patterns]
+
+
+# Patterns in priority order. Entries flagged True only match the doubled
+# glyphs ("CCoonnttrraacctt NNoo") of JSON extracted before char dedupe and
+# are skipped for files marked "char_dedupe".
+CONTRACT_NO_PATTERNS = _compile([
+    (r'Contract\s+No\s*:+\s*([A-Z0-9-]+)', False),
+    (r'CCoonnttrraacctt\s+NNoo\s*:+\s*([A-Z0-9-]+)', True),
+    (r'Contract\s+Number\s*:+\s*([A-Z0-9-]+)', False),
+])
+
+SELLER_ID_PATTERNS = _compile([
+    (r'GeM\s+Seller\s+ID\s*:+\s*([A-Z0-9]+)', False),
+    (r'GGeeM\s+SSeelllleerr\s+IIDD\s*:+\s*([A-Z0-9]+)', True),
+    (r'Seller\s+ID\s*:+\s*([A-Z0-9]+)', False),
+])
+
+SELLER_NAME_PATTERNS = _compile([
+    (r'Company\s+Name\s*:+\s*([^\n]+)', False),
+    (r'CCoommppaannyy\s+NNaammee\s*:+\s*([^\n]+)', True),
+    (r'Seller\s+Name\s*:+\s*([^\n]+)', False),
+    (r'SSeelllleerr\s+NNaammee\s*:+\s*([^\n]+)', True),
+    (r'Firm\s+Name\s*:+\s*([^\n]+)', False),
+])
+
+EMAIL_PATTERNS = _compile([
+    (r'Email\s+ID\s*:+\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', False),
+    (r'EEmmaaiill\s+IIDD\s*:+\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', True),
+    (r'Email\s*:+\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', False),
+])
+
+CONTACT_PATTERNS = _compile([
+    (r'Contact\s+No\.?\s*:+\s*([0-9]+)', False),
+    (r'CCoonntaacctt\s+NNoo\.?\s*:+\s*([0-9]+)', True),
+    (r'Phone\s*:+\s*([0-9]+)', False),
+    (r'Mobile\s*:+\s*([0-9]+)', False),
+])
+
+DOUBLED_CHAR_RE = re.compile(r'(.)\1')
+PRICE_CELL_RE = re.compile(r'^[\d,]+\.?\d*$')
+PRICE_HINT_RE = re.compile(r'p+r+i+c+e+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Text fields written to the CSV, with their patterns in priority order
+TEXT_FIELDS = {
+    "bid_no": CONTRACT_NO_PATTERNS,
+    "seller_id": SELLER_ID_PATTERNS,
+    "seller_name": SELLER_NAME_PATTERNS,
+    "seller_email": EMAIL_PATTERNS,
+}
+
+# Extractor version of every CSV field. Bump a field's version whenever its
+# patterns or cleanup change: cached values of that field are recomputed on
+# the next run, every other field is reused.
+FIELD_VERSIONS = {
+    "bid_no": 1,
+    "seller_id": 1,
+    "seller_name": 1,
+    "seller_email": 1,
+    "unit_price": 1,
+}
+
+
+def _search(patterns: List[Tuple[Pattern, bool]], text_content: str, doubled: bool) -> Optional[str]:
+    """First capture of the first matching pattern."""
+    for pattern, doubled_only in patterns:
+        if doubled_only and not doubled:
+            continue
+        match = pattern.search(text_content)
         if match:
             return match.group(1).strip()
-    
     return None
 
 
-def extract_seller_id(text_content: str) -> Optional[str]:
+def extract_contract_number(text_content: str, doubled: bool = True) -> Optional[str]:
+    """Extract Contract Number from text content."""
+    return _search(CONTRACT_NO_PATTERNS, text_content, doubled)
+
+
+def extract_seller_id(text_content: str, doubled: bool = True) -> Optional[str]:
     """Extract GeM Seller ID from text content."""
-    patterns = [
-        r'GeM\s+Seller\s+ID\s*:+\s*([A-Z0-9]+)',
-        r'GGeeM\s+SSeelllleerr\s+IIDD\s*:+\s*([A-Z0-9]+)',
-        r'Seller\s+ID\s*:+\s*([A-Z0-9]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_content, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-    
-    return None
+    return _search(SELLER_ID_PATTERNS, text_content, doubled)
 
 
-def extract_seller_name(text_content: str) -> Optional[str]:
+def extract_seller_name(text_content: str, doubled: bool = True) -> Optional[str]:
     """Extract Seller/Company Name from text content."""
-    patterns = [
-        r'Company\s+Name\s*:+\s*([^\n]+)',
-        r'CCoommppaannyy\s+NNaammee\s*:+\s*([^\n]+)',
-        r'Seller\s+Name\s*:+\s*([^\n]+)',
-        r'SSeelllleerr\s+NNaammee\s*:+\s*([^\n]+)',
-        r'Firm\s+Name\s*:+\s*([^\n]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_content, re.IGNORECASE)
-        if match:
-            name = match.group(1).strip()
-            # Clean up any extra formatting
-            name = re.sub(r'\s+', ' ', name)
-            return name
-    
-    return None
+    name = _search(SELLER_NAME_PATTERNS, text_content, doubled)
+    if name is None:
+        return None
+    # Clean up any extra formatting
+    return WHITESPACE_RE.sub(' ', name)
 
 
-def extract_email(text_content: str) -> Optional[str]:
+def extract_email(text_content: str, doubled: bool = True) -> Optional[str]:
     """Extract Email ID from text content."""
-    patterns = [
-        r'Email\s+ID\s*:+\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'EEmmaaiill\s+IIDD\s*:+\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'Email\s*:+\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_content, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-    
-    return None
+    return _search(EMAIL_PATTERNS, text_content, doubled)
 
 
-def extract_contact(text_content: str) -> Optional[str]:
+def extract_contact(text_content: str, doubled: bool = True) -> Optional[str]:
     """Extract Contact Number from text content."""
-    patterns = [
-        r'Contact\s+No\.?\s*:+\s*([0-9]+)',
-        r'CCoonntaacctt\s+NNoo\.?\s*:+\s*([0-9]+)',
-        r'Phone\s*:+\s*([0-9]+)',
-        r'Mobile\s*:+\s*([0-9]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_content, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-    
-    return None
+    return _search(CONTACT_PATTERNS, text_content, doubled)
 
 
-def normalize_for_match(text: str) -> str:
+def normalize_for_match(text: str, doubled: bool = True) -> str:
     """Normalize text for matching by removing artifacts and spaces."""
     if not text:
         return ""
-    # Remove doubled characters (e.g., 'UUnniitt' -> 'Unit')
-    # This is a common artifact in some PDF extractions
-    text = re.sub(r'(.)\1', r'\1', text)
+    if doubled:
+        # Remove doubled characters (e.g., 'UUnniitt' -> 'Unit')
+        # left by extraction without char dedupe
+        text = DOUBLED_CHAR_RE.sub(r'\1', text)
     return text.lower().replace(" ", "").replace("\n", "")
 
-def extract_unit_price_from_tables(tables: List[Dict]) -> Optional[str]:
+def find_price_column(table_data: List[List[str]], doubled: bool = True) -> Tuple[int, int]:
+    """
+    (header row, column) of the first cell naming the unit price ("Unit
+    Price", or a "Price" that is not a total), or (-1, -1).
+    """
+    for row_idx, row in enumerate(table_data):
+        for col_idx, cell in enumerate(row):
+            if not cell:
+                continue
+            norm_cell = cell.lower().replace(" ", "").replace("\n", "")
+            if doubled:
+                # Undoubling only drops repeats, so "price" can only appear
+                # in the normalized cell if p+r+i+c+e+ is already there
+                if not PRICE_HINT_RE.search(norm_cell):
+                    continue
+                norm_cell = normalize_for_match(cell, doubled)
+            if "unitprice" in norm_cell or ("price" in norm_cell and "total" not in norm_cell):
+                return row_idx, col_idx
+    return -1, -1
+
+
+def extract_unit_price_from_tables(tables: List[Dict], doubled: bool = True) -> Optional[str]:
     """
-    Extract Unit Price from table data.
-    Handles 'doubled' characters like 'UUnniitt PPrriiccee'.
+    Extract Unit Price from table data: the first positive number below the
+    unit price header of a table (find_price_column).
+    Handles 'doubled' characters like 'UUnniitt PPrriiccee' unless doubled=False.
     """
     if not tables:
         return None
@@ -127,43 +193,78 @@ def extract_unit_price_from_tables(tables: List[Dict]) -> Optional[str]:
         if not table_data:
             continue
         
-        unit_price_col_idx = -1
-        header_row_idx = -1
-        
-        # 1. Search for the header row
-        for row_idx, row in enumerate(table_data):
-            for col_idx, cell in enumerate(row):
-                if not cell:
-                    continue
-                
-                norm_cell = normalize_for_match(cell)
-                # Look for "unitprice" or "price" in the normalized text
-                if "unitprice" in norm_cell or ("price" in norm_cell and "total" not in norm_cell):
-                    unit_price_col_idx = col_idx
-                    header_row_idx = row_idx
-                    break
-            if unit_price_col_idx != -1:
-                break
+        header_row_idx, unit_price_col_idx = find_price_column(table_data, doubled)
+        if unit_price_col_idx == -1:
+            continue
         
-        # 2. Extract the value from subsequent rows
-        if unit_price_col_idx != -1 and header_row_idx != -1:
-            for row_idx in range(header_row_idx + 1, len(table_data)):
-                row = table_data[row_idx]
-                if unit_price_col_idx < len(row):
-                    price_cell = row[unit_price_col_idx].strip()
-                    # Match numbers like "1,648" or "14,498.4" or "380"
-                    if price_cell and re.match(r'^[\d,]+\.?\d*$', price_cell):
-                        try:
-                            # Verify it is a valid numeric value
-                            price_num = float(price_cell.replace(',', ''))
-                            if price_num > 0:
-                                return price_cell
-                        except ValueError:
-                            continue
+        for row in table_data[header_row_idx + 1:]:
+            if unit_price_col_idx < len(row):
+                price_cell = (row[unit_price_col_idx] or "").strip()
+                # Match numbers like "1,648" or "14,498.4" or "380"
+                if price_cell and PRICE_CELL_RE.match(price_cell):
+                    try:
+                        # Verify it is a valid numeric value
+                        price_num = float(price_cell.replace(',', ''))
+                        if price_num > 0:
+                            return price_cell
+                    except ValueError:
+                        continue
                             
     return None
 
 
+def extract_text_fields(text_content: str, doubled: bool = True,
+                        only: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    The text fields of a contract ("Label : value" lines) as a dict, in CSV
+    column order. Each field takes the first match of its highest-priority
+    pattern that matches. `only` limits the fields searched for.
+    """
+    fields = {}
+    for field, patterns in TEXT_FIELDS.items():
+        if only is not None and field not in only:
+            continue
+        value = _search(patterns, text_content, doubled)
+        if value is not None:
+            fields[field] = value
+    if "seller_name" in fields:
+        # Clean up any extra formatting
+        fields["seller_name"] = WHITESPACE_RE.sub(' ', fields["seller_name"])
+    return fields
+
+
+def extract_fields(data: Dict, source_name: str = "", only: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    The CSV fields in `only` (default: all) of an already loaded extraction
+    result, each "" when not found. Fields are independent of each other,
+    so a subset gives the same values as a full extraction.
+    """
+    only = CSV_HEADERS if only is None else only
+    text_content = data.get('text_content', '')
+    # Files extracted before char dedupe still hold doubled glyphs
+    doubled = not data.get('char_dedupe', False)
+    
+    result = {field: "" for field in only}
+    result.update(extract_text_fields(text_content, doubled, only))
+    if "unit_price" in only:
+        result["unit_price"] = extract_unit_price_from_tables(data.get('tables', []), doubled) or ""
+    
+    # If bid_no is empty, try to get from filename
+    if "bid_no" in only and not result['bid_no'] and source_name.startswith('GEMC-'):
+        result['bid_no'] = source_name
+    
+    return result
+
+
+def extract_seller_info_from_data(data: Dict, source_name: str = "") -> Dict[str, str]:
+    """
+    Extract all seller information from an already loaded extraction result
+    (the JSON structure written by the PDF extractor).
+    source_name is the file stem used as bid_no fallback (GEMC-...).
+    """
+    return extract_fields(data, source_name)
+
+
 def extract_seller_info_from_json(json_path: str) -> Dict[str, str]:
     """
     Extract all seller information from a JSON file.
@@ -181,21 +282,7 @@ def extract_seller_info_from_json(json_path: str) -> Dict[str, str]:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        text_content = data.get('text_content', '')
-        tables = data.get('tables', [])
-        
-        # Extract each field
-        result['bid_no'] = extract_contract_number(text_content) or ""
-        result['seller_id'] = extract_seller_id(text_content) or ""
-        result['seller_name'] = extract_seller_name(text_content) or ""
-        result['seller_email'] = extract_email(text_content) or ""
-        result['unit_price'] = extract_unit_price_from_tables(tables) or ""
-        
-        # If bid_no is empty, try to get from filename
-        if not result['bid_no']:
-            filename = Path(json_path).stem
-            if filename.startswith('GEMC-'):
-                result['bid_no'] = filename
+        result = extract_seller_info_from_data(data, Path(json_path).stem)
         
     except Exception as e:
         print(f"  Error processing {os.path.basename(json_path)}: {e}")
@@ -203,59 +290,362 @@ def extract_seller_info_from_json(json_path: str) -> Dict[str, str]:
     return result
 
 
-def process_all_json_to_csv():
+def load_current(json_dir: str = JSON_DIR) -> Dict[str, str]:
+    """PDF name -> JSON file or shard holding its current record (extraction manifest)."""
+    return {name: entry.get("json") for name, entry in ExtractManifest(json_dir).entries.items()}
+
+
+def is_current(current: Dict[str, str], name: str, container: str) -> bool:
+    """Whether the record of PDF `name` found in `container` is the one the manifest points to."""
+    return not current or current.get(name) == container
+
+
+def iter_extracted(json_dir: str = JSON_DIR) -> Iterator[Tuple[str, Dict]]:
     """
-    Process all JSON files and create seller_info.csv
+    Stream (file stem, extraction data) for every extracted PDF in json_dir,
+    from JSONL shards (newest first) and JSON files alike, one record in
+    memory at a time. When there is an extraction manifest, only the record
+    it points to is used for each PDF, so superseded records are skipped;
+    without one, the first record seen for a PDF wins.
     """
-    # Get all JSON files
-    json_files = list(Path(JSON_DIR).glob("*.json"))
-    
-    if not json_files:
-        print(f"No JSON files found in {JSON_DIR}")
-        print("Please run the PDF extraction script first (run_phase3_extract_pdf_v2.py)")
+    current = load_current(json_dir)
+    containers = set(current.values())
+    seen = set()
+
+    for shard in reversed(shard_paths(json_dir)):
+        if current and shard.name not in containers:
+            continue
+        for record in iter_shard(shard):
+            name = record.get("source_file", "")
+            if not is_current(current, name, shard.name) or name in seen:
+                continue
+            seen.add(name)
+            yield Path(name).stem, expand_record(record)
+
+    for json_file in sorted(Path(json_dir).glob("*.json")):
+        # Skip .manifest.json, .fields.json and other bookkeeping files
+        if json_file.name.startswith(".") or (current and json_file.name not in containers):
+            continue
+        try:
+            with open(json_file, 'rb') as f:
+                data = loads(f.read())
+        except Exception as e:
+            print(f"  Error processing {json_file.name}: {e}")
+            continue
+        name = data.get("source_file") or json_file.stem + ".pdf"
+        if not is_current(current, name, json_file.name) or name in seen:
+            continue
+        seen.add(name)
+        yield json_file.stem, data
+
+
+# --------------------------------------------------
+# PARALLEL STREAMING
+# --------------------------------------------------
+def docs_by_container(manifest: Dict[str, Dict]) -> Dict[str, Dict[str, str]]:
+    """JSON file or shard -> {PDF name: record identity} of the current records it holds."""
+    grouped: Dict[str, Dict[str, str]] = {}
+    for name, entry in manifest.items():
+        grouped.setdefault(entry.get("json"), {})[name] = manifest_doc_key(entry)
+    return grouped
+
+
+def plan_tasks(json_dir: str, containers: Dict[str, Dict[str, str]], batch_size: int = BATCH_SIZE,
+               chunk_bytes: int = SHARD_CHUNK_BYTES) -> Iterator[Tuple]:
+    """
+    Worker tasks, in iter_extracted order, generated lazily, each carrying
+    only the record identities of its own documents (see docs_by_container;
+    empty without a manifest, when identities come from the record bytes):
+    ("shard", path, start, end, {name: doc} or None) for a byte range of a
+    shard and ("json", [(path, name or None, doc or None)]) for a batch of
+    JSON files.
+    """
+    for shard in reversed(shard_paths(json_dir)):
+        if containers and shard.name not in containers:
+            continue
+        docs = containers.get(shard.name) if containers else None
+        for start, end in shard_chunks(shard, chunk_bytes):
+            yield ("shard", str(shard), start, end, docs)
+
+    batch = []
+    for json_file in sorted(Path(json_dir).glob("*.json")):
+        # Skip .manifest.json and other bookkeeping files
+        if json_file.name.startswith(".") or (containers and json_file.name not in containers):
+            continue
+        # A JSON file holds one record: its PDF name and identity are known up front
+        name, doc = next(iter(containers[json_file.name].items())) if containers else (None, None)
+        batch.append((str(json_file), name, doc))
+        if len(batch) >= batch_size:
+            yield ("json", batch)
+            batch = []
+    if batch:
+        yield ("json", batch)
+
+
+# Field cache of the worker process, read-only (set by _init_worker; None = cache off)
+_CACHE: Optional[FieldCache] = None
+
+
+def _init_worker(cache_dir: Optional[str] = None):
+    global _CACHE
+    _CACHE = FieldCache(cache_dir, readonly=True) if cache_dir else None
+
+
+def _cached_fields(name: str, stem: str, doc: str, load,
+                   entry: Optional[Dict] = None) -> Tuple[Dict[str, str], Optional[Dict], bool]:
+    """
+    (CSV row, new cache entry or None if the cached one is still valid,
+    whether the row differs from the cached one) for one document. Only
+    stale fields are extracted; load() is called only if there are any.
+    """
+    if entry is None and _CACHE is not None:
+        entry = _CACHE.get(name)
+    stale = stale_fields(entry, doc, FIELD_VERSIONS)
+    previous = cached_row(entry, CSV_HEADERS) if entry is not None else None
+    if not stale:
+        return previous, None, False
+    row = dict(previous) if previous is not None else {field: "" for field in CSV_HEADERS}
+    row.update(extract_fields(load(), stem, stale))
+    return row, make_entry(doc, row, FIELD_VERSIONS), row != previous
+
+
+def rows_for_task(task: Tuple) -> Tuple[List[Tuple[str, Dict[str, str], Optional[Dict], bool]], List[str]]:
+    """
+    Worker: ([(PDF name, CSV row, new cache entry or None, changed)],
+    [error messages]) for a task from plan_tasks (see _cached_fields).
+    Files that cannot be read are reported and skipped.
+    """
+    rows = []
+    errors = []
+    if task[0] == "shard":
+        _, path, start, end, docs = task
+        container = os.path.basename(path)
+        for offset, line in iter_shard_lines(path, start, end):
+            try:
+                record = loads(line)
+            except ValueError:
+                print(f"[SHARD] ⚠️ Skipping unreadable line at byte {offset} of {path}")
+                continue
+            name = record.get("source_file", "")
+            if docs is not None and name not in docs:
+                continue   # superseded by a newer record elsewhere
+            try:
+                doc = docs[name] if docs is not None else bytes_doc_key(line)
+                rows.append((name, *_cached_fields(name, Path(name).stem, doc,
+                                                   lambda: expand_record(record))))
+            except Exception as e:
+                errors.append(f"{name} ({container}): {e}")
+        return rows, errors
+
+    for path, name, doc in task[1]:
+        container = os.path.basename(path)
+        stem = Path(path).stem
+        try:
+            entry = None
+            if name is not None and _CACHE is not None:
+                entry = _CACHE.get(name)
+                if not stale_fields(entry, doc, FIELD_VERSIONS):
+                    # Cached: the file need not even be opened
+                    rows.append((name, cached_row(entry, CSV_HEADERS), None, False))
+                    continue
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = loads(raw)
+            source = data.get("source_file") or stem + ".pdf"
+            if name is not None and source != name:
+                continue
+            rows.append((source, *_cached_fields(source, stem, doc or bytes_doc_key(raw),
+                                                 lambda: data, entry)))
+        except Exception as e:
+            errors.append(f"{container}: {e}")
+    return rows, errors
+
+
+def iter_task_results(tasks: Iterator[Tuple], workers: int, ordered: bool = True,
+                      max_inflight: int = None, cache_dir: Optional[str] = None) -> Iterator[Tuple[List, List]]:
+    """
+    rows_for_task results, in task order (ordered) or as they finish. At
+    most max_inflight tasks are queued or running, so memory stays flat
+    however many files there are. workers=1 runs in this process.
+    cache_dir: the field cache the workers look documents up in (None: off).
+    """
+    initargs = (cache_dir,)
+    if workers <= 1:
+        _init_worker(*initargs)
+        try:
+            for task in tasks:
+                yield rows_for_task(task)
+        finally:
+            if _CACHE is not None:
+                _CACHE.close()
         return
-    
-    print(f"Found {len(json_files)} JSON files to process")
+
+    tasks = iter(tasks)
+    max_inflight = max_inflight or workers * INFLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=initargs) as pool:
+        pending = deque()
+
+        def fill():
+            for task in itertools.islice(tasks, max_inflight - len(pending)):
+                pending.append(pool.submit(rows_for_task, task))
+
+        fill()
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            result = future.result()
+            fill()
+            yield result
+
+
+def merge_pending_delta(tmp_delta: str, changed_bids: set):
+    """
+    Append to the new delta the rows of a delta the database sync has not
+    consumed yet, unless superseded, and move it into place.
+    """
+    if os.path.exists(DELTA_CSV):
+        pending = {}  # bid_no -> row (last one wins, like the database sync)
+        with open(DELTA_CSV, 'r', newline='', encoding='utf-8') as old:
+            for row in csv.DictReader(old):
+                if row.get('bid_no') and row['bid_no'] not in changed_bids:
+                    pending[row['bid_no']] = {field: row.get(field) or "" for field in CSV_HEADERS}
+        with open(tmp_delta, 'a', newline='', encoding='utf-8') as new:
+            csv.DictWriter(new, fieldnames=CSV_HEADERS).writerows(pending.values())
+    os.replace(tmp_delta, DELTA_CSV)
+
+
+def process_all_json_to_csv(workers: int = None, ordered: bool = True, batch_size: int = BATCH_SIZE,
+                            use_cache: bool = True):
+    """
+    Process all JSON files (and JSONL shards) and create seller_info.csv.
+    Documents are parsed and their fields extracted on `workers` processes
+    (default: CPU count); rows are written as results arrive, in input
+    order unless ordered=False. The CSV is replaced only once complete.
+    Fields are taken from the field cache where their record and extractor
+    version are unchanged (use_cache=False recomputes everything); rows
+    that differ from the cached ones are added to DELTA_CSV.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    containers = docs_by_container(ExtractManifest(JSON_DIR).entries)
+    # Workers look their documents up themselves; this process only writes
+    field_cache = FieldCache(JSON_DIR)
+    field_cache.begin()
+    if not use_cache:
+        field_cache.clear()
+    # Without a manifest, duplicates are dropped here (first row wins)
+    seen = None if containers else set()
+    print(f"Reading extracted PDFs from {JSON_DIR}")
+    cache_note = f"{len(field_cache):,} document(s)" if use_cache else "off"
+    print(f"Workers: {workers} | Order: {'input' if ordered else 'as finished'} | Field cache: {cache_note}")
     print("=" * 70)
     
-    all_records = []
-    success_count = 0
-    
-    for idx, json_file in enumerate(json_files, 1):
-        print(f"[{idx}/{len(json_files)}] Processing: {json_file.name}...")
-        
-        seller_info = extract_seller_info_from_json(str(json_file))
-        all_records.append(seller_info)
-        
-        # Show extracted data
-        print(f"  ✓ Bid: {seller_info['bid_no']}")
-        print(f"    Seller ID: {seller_info['seller_id']}")
-        print(f"    Email: {seller_info['seller_email']}")
-        print(f"    Unit Price: {seller_info['unit_price']}")
-        
-        if seller_info['bid_no'] and seller_info['seller_id']:
-            success_count += 1
+    total = 0
+    complete = 0
+    error_count = 0
+    recomputed = 0
+    changed = 0
+    changed_bids = set()
+    start = time.perf_counter()
+    last_progress = 0.0
     
-    # Write to CSV
-    print("\n" + "=" * 70)
-    print("Writing to CSV...")
+    def progress(end=""):
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        sys.stdout.write(f"\r  {total:,} rows | {total / elapsed:,.0f}/s | complete: {complete:,} | "
+                         f"recomputed: {recomputed:,} | errors: {error_count}{end}")
+        sys.stdout.flush()
     
-    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as csvfile:
+    tmp_csv = OUTPUT_CSV + ".tmp"
+    tmp_delta = DELTA_CSV + ".tmp"
+    Path(OUTPUT_CSV).parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp_csv, 'w', newline='', encoding='utf-8') as csvfile, \
+            open(tmp_delta, 'w', newline='', encoding='utf-8') as deltafile:
         writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
         writer.writeheader()
-        writer.writerows(all_records)
+        delta_writer = csv.DictWriter(deltafile, fieldnames=CSV_HEADERS)
+        delta_writer.writeheader()
+        tasks = plan_tasks(JSON_DIR, containers, batch_size)
+        for rows, errors in iter_task_results(tasks, workers, ordered,
+                                              cache_dir=JSON_DIR if use_cache else None):
+            for message in errors:
+                error_count += 1
+                sys.stdout.write("\r")
+                print(f"  Error processing {message}")
+            reused = []
+            for name, row, entry, row_changed in rows:
+                if seen is not None:
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                writer.writerow(row)
+                total += 1
+                if row['bid_no'] and row['seller_id']:
+                    complete += 1
+                if entry is not None:
+                    recomputed += 1
+                    field_cache.put(name, entry)
+                else:
+                    reused.append(name)
+                # Rows without bid_no cannot be matched in the database
+                if row_changed and row['bid_no']:
+                    delta_writer.writerow(row)
+                    changed += 1
+                    changed_bids.add(row['bid_no'])
+            field_cache.touch(reused)
+            if time.perf_counter() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.perf_counter()
+                progress()
+    progress("\n")
+    
+    if not total:
+        os.remove(tmp_csv)
+        os.remove(tmp_delta)
+        field_cache.close()   # uncommitted: the cache stays as it was
+        print(f"No JSON files found in {JSON_DIR}")
+        print("Please run the PDF extraction script first (run_phase3_extract_pdf_v2.py)")
+        return
+    os.replace(tmp_csv, OUTPUT_CSV)
+    merge_pending_delta(tmp_delta, changed_bids)
+    # Documents no longer extracted drop out of the cache
+    field_cache.commit(prune=True)
+    field_cache.close()
     
+    print("=" * 70)
     print(f"✓ CSV file created: {OUTPUT_CSV}")
-    print(f"  Total records: {len(all_records)}")
-    print(f"  Complete records: {success_count}")
+    print(f"  Total records: {total}")
+    print(f"  Complete records: {complete}")
+    print(f"  Fields recomputed for: {recomputed} (reused from cache: {total - recomputed})")
+    print(f"✓ Changed rows for the database sync: {changed} → {DELTA_CSV}")
+    if error_count:
+        print(f"  Unreadable files/records: {error_count}")
+    print(f"  Time: {time.perf_counter() - start:.1f}s")
     print("=" * 70)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 3B: JSON to CSV extraction")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write rows as workers finish instead of in input order")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"JSON files per worker task (default: {BATCH_SIZE})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="recompute every field instead of reusing the field cache")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
     print("=" * 70)
     print("Phase 3B: JSON to CSV Extraction")
     print("Extracting seller information from JSON files")
     print("=" * 70)
     print()
     
-    process_all_json_to_csv()
+    process_all_json_to_csv(workers=args.workers, ordered=not args.unordered,
+                            batch_size=args.batch_size, use_cache=not args.no_cache)
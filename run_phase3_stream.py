@@ -0,0 +1,334 @@
+"""
+Phase 3: Streaming PDF to Database
+One pass per PDF instead of three scripts chained through files: each PDF is
+extracted on a worker (service/extract_scheduler.py), its seller fields are
+taken straight from the extraction result in the same worker, and the row is
+handed to a write-behind batch writer (service/batch_writer.py) that updates
+the contracts table in batches within seconds of the extraction.
+
+JSON files (or JSONL shards) and a CSV are optional side outputs. Without
+JSON the run keeps its own extraction manifest in data/stream/, so reruns
+still only process new or changed PDFs.
+
+Usage:
+    python run_phase3_stream.py [--input data/scrapped] [--json json|jsonl] [--csv data/seller_info.stream.csv]
+    python run_phase3_stream.py --no-db --csv data/seller_info.stream.csv   # without MySQL
+"""
+
+import argparse
+import csv
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from service.extract_manifest import ExtractManifest, FailureLog
+from service.extract_scheduler import EXTRACT_TIMEOUT, MAX_MEMORY_MB, MAX_TASKS_PER_CHILD, ExtractScheduler
+from service.jsonl_shards import ShardWriter, prune_superseded
+from service.pdf_engines import ENGINES, get_engine
+from service.pdf_sources import open_source, source_name
+from run_phase3_extract_pdf_v2 import (JSON_OUTPUT_DIR, OUTPUT_FORMATS, PDF_LIBRARY, SCRAPPED_PDF_DIR,
+                                       collect_pdfs, write_output)
+from run_phase3_json_to_csv import CSV_HEADERS, extract_fields
+
+# Extraction manifest and failure log of runs without JSON side output
+STREAM_STATE_DIR = "data/stream"
+
+# Seconds a partial batch of DB updates may wait
+DB_FLUSH_INTERVAL = 1.0
+# PDFs between checkpoints: DB updates flushed, then the manifest saved, so
+# a PDF is only marked done once its row is in MySQL (or the writer spool)
+CHECKPOINT_EVERY = 100
+# ...or after this many seconds, so a long-lived feed (run_daemon.py) is saved too
+CHECKPOINT_INTERVAL = 30.0
+# Downloaded PDFs that may wait for extraction before PdfFeed.put() blocks
+FEED_MAXSIZE = 64
+
+
+def stream_single_pdf(task: Tuple) -> Any:
+    """
+    Task for worker processes: (pdf_path, json_path, engine, side_output).
+    Returns {"row": CSV row} (plus {"line": ...} for jsonl, see
+    write_output) on success, otherwise why the PDF failed. With side
+    output "json" the JSON file is written here, as by the extractor.
+    """
+    pdf_path, json_path, lib, side_output = task
+    if lib not in ENGINES:
+        return f"unknown engine {lib}"
+    with open_source(pdf_path) as pdf:
+        extracted_data = get_engine(lib).extract(pdf)
+
+    output = write_output(pdf_path, json_path, lib, extracted_data, side_output) if side_output else None
+    if extracted_data.get("error"):
+        return f"partial: {extracted_data['error']}"
+    # Fields from the extraction result itself: no JSON written and read back
+    result = {"row": extract_fields(extracted_data, Path(source_name(pdf_path)).stem)}
+    result.update(output or {})
+    return result
+
+
+def open_db_writer():
+    """Batch writer for seller rows, or None if the database is unreachable."""
+    # MySQL is only needed with the database enabled (--no-db runs without it)
+    from service.batch_writer import BatchWriter
+    from save_seller_info_to_db import UPDATE_SELLER_SQL, connect_db, prepare_table
+
+    db = connect_db()
+    if db is None:
+        return None
+    prepare_table(db)
+    return BatchWriter({"seller": UPDATE_SELLER_SQL}, name="seller_info", db=db,
+                       flush_interval=DB_FLUSH_INTERVAL).start()
+
+
+class PdfFeed:
+    """
+    Bounded queue of PDFs for stream_pdfs() while they are still being
+    downloaded (run_main.py --overlap): put() blocks once maxsize PDFs wait
+    for extraction, so the producer cannot run arbitrarily far ahead.
+    Iterating yields the backlog, then queued PDFs, None whenever the queue
+    is empty (see ExtractScheduler.run), and stops once closed and drained.
+    """
+
+    def __init__(self, maxsize: int = FEED_MAXSIZE, backlog: Iterable[str] = ()):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._backlog = backlog
+        self._closed = threading.Event()
+        self._abandoned = threading.Event()
+
+    def put(self, pdf_path: str) -> bool:
+        """Queue a PDF, waiting while the queue is full; False if the consumer is gone."""
+        while not self._abandoned.is_set():
+            try:
+                self._queue.put(str(pdf_path), timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close(self):
+        """No more PDFs: iteration ends once the queue is drained."""
+        self._closed.set()
+
+    def abandon(self):
+        """The consumer stopped: put() no longer waits (PDFs are left for the next Phase 3 run)."""
+        self._abandoned.set()
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        yield from self._backlog
+        while True:
+            try:
+                yield self._queue.get_nowait()
+            except queue.Empty:
+                if self._closed.is_set() and self._queue.empty():
+                    return
+                yield None
+
+
+def start_stream_consumer(backlog_dir: str = SCRAPPED_PDF_DIR) -> Tuple[PdfFeed, threading.Thread, dict]:
+    """
+    Start stream_pdfs() on a thread fed by downloads (run_main.py --overlap,
+    run_daemon.py). PDFs already in backlog_dir go first if new or changed.
+    Returns (feed, thread, outcome): put() downloaded PDFs on the feed,
+    close() it, join() the thread; outcome["phase3"] is then the result.
+    """
+    Path(backlog_dir).mkdir(parents=True, exist_ok=True)
+    feed = PdfFeed(backlog=collect_pdfs([backlog_dir]))
+    outcome = {}
+
+    def consume():
+        try:
+            # JSON side output keeps data/JSON and its manifest current for the CSV export;
+            # spawned workers do not inherit the browser's threads
+            outcome["phase3"] = stream_pdfs(feed, side_output="json", start_method="spawn")
+        except Exception as e:
+            print(f"\n❌ Phase 3 consumer crashed: {e}")
+            outcome["phase3"] = False
+        finally:
+            feed.abandon()
+
+    consumer = threading.Thread(target=consume, name="phase3-stream")
+    consumer.start()
+    return feed, consumer, outcome
+
+
+def stream_all(inputs: List[str] = None, engine: str = None, **options) -> bool:
+    """Stream the PDFs in inputs (default: data/scrapped); see stream_pdfs."""
+    inputs = inputs or [SCRAPPED_PDF_DIR]
+    pdf_files = collect_pdfs(inputs)
+    if not pdf_files:
+        print(f"No PDF files found in {', '.join(inputs)}")
+        return False
+    return stream_pdfs(pdf_files, engine, **options)
+
+
+def stream_pdfs(pdf_files: Iterable[Optional[str]], engine: str = None, side_output: Optional[str] = None,
+                csv_path: Optional[str] = None, use_db: bool = True, force: bool = False,
+                workers: int = None, timeout: float = EXTRACT_TIMEOUT,
+                max_tasks_per_child: int = MAX_TASKS_PER_CHILD,
+                max_memory_mb: float = MAX_MEMORY_MB, start_method: Optional[str] = None) -> bool:
+    """
+    Extract new/changed PDFs (all with force) and update their contracts
+    rows as they finish. pdf_files: PDF refs, a list or a PdfFeed.
+    side_output: None, "json" or "jsonl" (written to data/JSON with its
+    extraction manifest); csv_path: also write the rows of this run to a
+    CSV. Large PDFs are extracted whole (no page ranges). start_method:
+    multiprocessing start method of the workers (default: the platform's).
+    Returns False if the run could not start.
+    """
+    engine = engine or PDF_LIBRARY
+    if not engine:
+        print("✗ No PDF library found. Please install: pip install pdfplumber or PyPDF2")
+        return False
+    if not get_engine(engine).available:
+        print(f"✗ Engine '{engine}' is not installed (pip install {get_engine(engine).module})")
+        return False
+
+    writer = None
+    update_params = None
+    if use_db:
+        writer = open_db_writer()
+        if writer is None:
+            print("✗ Database unavailable (use --no-db to extract without it)")
+            return False
+        from save_seller_info_to_db import update_params
+
+    state_dir = JSON_OUTPUT_DIR if side_output else STREAM_STATE_DIR
+    Path(state_dir).mkdir(parents=True, exist_ok=True)
+    manifest = ExtractManifest(state_dir)
+    failures = FailureLog(state_dir)
+    shards = ShardWriter(JSON_OUTPUT_DIR) if side_output == "jsonl" else None
+    csv_file = None
+    csv_writer = None
+    if csv_path:
+        Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
+        csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+        csv_writer = csv.DictWriter(csv_file, fieldnames=CSV_HEADERS)
+        csv_writer.writeheader()
+
+    scheduler = ExtractScheduler(stream_single_pdf, workers=workers, timeout=timeout,
+                                 max_tasks_per_child=max_tasks_per_child,
+                                 max_memory_mb=max_memory_mb, start_method=start_method)
+    print(f"\n🚀 Phase 3: Streaming PDF → Database")
+    files = len(pdf_files) if isinstance(pdf_files, list) else "as downloaded"
+    print(f"   Mode: {engine} | Files: {files} | Run: {'force' if force else 'incremental'}")
+    print(f"   Workers: {scheduler.workers} | DB: {'on' if writer else 'off'} | "
+          f"JSON: {side_output or 'off'} | CSV: {csv_path or 'off'}")
+    print("=" * 70)
+
+    fingerprints = {}
+    done: List[Tuple[str, str]] = []   # (pdf, json) extracted since the last checkpoint
+    seen_names = set()
+
+    def pending_tasks():
+        for item in manifest.stale(pdf_files, engine, fingerprints, force=force,
+                                   require_json=side_output is not None, seen=seen_names):
+            if item is None:
+                yield None   # nothing downloaded yet (PdfFeed)
+                continue
+            pdf_file = item[0]
+            json_path = os.path.join(JSON_OUTPUT_DIR, Path(source_name(pdf_file)).stem + ".json")
+            yield (pdf_file, json_path, engine, side_output)
+
+    last_checkpoint = [time.perf_counter()]
+
+    def checkpoint():
+        last_checkpoint[0] = time.perf_counter()
+        if writer is not None:
+            writer.flush()
+        if csv_file is not None:
+            csv_file.flush()
+        for pdf_path, json_path in done:
+            manifest.record(pdf_path, fingerprints[pdf_path], engine, json_path)
+        done.clear()
+        manifest.save()
+        failures.save()
+
+    count = 0
+    success_count = 0
+    synced = 0
+    start = time.perf_counter()
+    try:
+        for task, result in scheduler.run(pending_tasks()):
+            pdf_path, json_path = task[0], task[1]
+            count += 1
+            if isinstance(result, str) or result is None:
+                failures.record(pdf_path, result or "no result")
+                print(f"[{count}] ✗ Failed: {source_name(pdf_path)} ({result})")
+                continue
+            row = result["row"]
+            if shards is not None:
+                json_path = shards.write(result["line"])
+            if writer is not None and row["bid_no"]:
+                writer.put("seller", update_params(row))
+                synced += 1
+            if csv_writer is not None:
+                csv_writer.writerow(row)
+            success_count += 1
+            failures.clear(pdf_path)
+            done.append((pdf_path, json_path if side_output else ""))
+            if count % 5 == 0:
+                print(f"[{count}] Processed: {source_name(pdf_path)} → {row['bid_no'] or '-'} "
+                      f"({time.perf_counter() - start:.1f}s)")
+            if (len(done) >= CHECKPOINT_EVERY
+                    or time.perf_counter() - last_checkpoint[0] >= CHECKPOINT_INTERVAL):
+                checkpoint()
+        if shards is not None:
+            shards.close()
+            checkpoint()
+            prune_superseded(JSON_OUTPUT_DIR, manifest)
+    finally:
+        if shards is not None:
+            shards.close()
+        checkpoint()
+        if writer is not None:
+            writer.close()
+        if csv_file is not None:
+            csv_file.close()
+
+    stats = scheduler.stats
+    print("\n" + "=" * 70)
+    print(f"📊 Streaming Complete!")
+    print(f"   ✓ Success: {success_count}/{count} (skipped {len(seen_names) - count} up to date)")
+    if count - success_count:
+        print(f"   ✗ Failed: {count - success_count} (timeouts: {stats['timeouts']}, "
+              f"memory: {stats['killed_memory']}, crashed: {stats['crashed']}) → {failures.path}")
+    if writer is not None:
+        print(f"   🗄️  Rows sent to the database: {synced}")
+    if csv_path:
+        print(f"   📊 CSV: {csv_path}")
+    print(f"   ⏱️  {time.perf_counter() - start:.1f}s")
+    print("=" * 70)
+    return True
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 3: stream PDFs to seller fields to the database")
+    parser.add_argument("--input", nargs="+", default=None, metavar="PATH",
+                        help=f"directories, PDFs or ZIP archives (default: {SCRAPPED_PDF_DIR})")
+    parser.add_argument("--engine", choices=list(ENGINES), default=PDF_LIBRARY,
+                        help=f"extraction engine (default: {PDF_LIBRARY})")
+    parser.add_argument("--json", choices=OUTPUT_FORMATS, default=None, dest="side_output",
+                        help=f"also write extraction output to {JSON_OUTPUT_DIR} (default: none)")
+    parser.add_argument("--csv", default=None, metavar="PATH",
+                        help="also write the rows of this run to a CSV")
+    parser.add_argument("--no-db", action="store_true", help="do not update the database")
+    parser.add_argument("--force", action="store_true", help="process every PDF, even if up to date")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=EXTRACT_TIMEOUT,
+                        help=f"seconds per PDF before its worker is killed (default: {EXTRACT_TIMEOUT})")
+    parser.add_argument("--max-tasks-per-child", type=int, default=MAX_TASKS_PER_CHILD,
+                        help=f"PDFs per worker before it is replaced (default: {MAX_TASKS_PER_CHILD})")
+    parser.add_argument("--max-memory-mb", type=float, default=MAX_MEMORY_MB,
+                        help=f"worker RSS cap in MB, 0 = no cap (default: {MAX_MEMORY_MB})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    stream_all(args.input, args.engine, side_output=args.side_output, csv_path=args.csv,
+               use_db=not args.no_db, force=args.force, workers=args.workers, timeout=args.timeout,
+               max_tasks_per_child=args.max_tasks_per_child, max_memory_mb=args.max_memory_mb or None)
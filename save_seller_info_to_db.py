@@ -2,68 +2,108 @@
 Phase 3C: Save Extracted Seller Information to Database
 Updates the 'contracts' table with seller details from seller_info.csv
 Matches records using 'bid_no' as the identifier
+
+Modes:
+  bulk (default) - load the CSV into a staging table with batched inserts and
+                   apply it with one joined UPDATE; rows whose content hash is
+                   unchanged since the last sync are not rewritten
+  per-row        - one UPDATE per CSV row (original behaviour)
+
+--delta syncs only seller_info.delta.csv, the rows run_phase3_json_to_csv.py
+found changed since its last run. Applied rows are removed from it; rows
+whose bid has no contracts row yet stay for the next sync.
 """
 
+import argparse
 import csv
-import mysql.connector
+import hashlib
+import os
 from mysql.connector import Error
 from pathlib import Path
 
-# Database Configuration (matching controller/contracts_controller.py)
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",
-    "database": "tender_automation_with_ai"
-}
+from service.database import get_db
 
 CSV_FILE = "data/seller_info.csv"
+DELTA_CSV_FILE = "data/seller_info.delta.csv"
+
+SELLER_FIELDS = ["seller_id", "seller_name", "seller_email", "unit_price"]
+STAGING_BATCH_SIZE = 1000
+
+# Update query
+# We match on bid_no
+UPDATE_SELLER_SQL = """
+UPDATE contracts 
+SET seller_id = %s, 
+    seller_name = %s, 
+    seller_email = %s, 
+    unit_price = %s,
+    seller_info_hash = %s
+WHERE bid_no = %s
+"""
+
+def row_hash(row):
+    """Content hash of the seller fields of one CSV row."""
+    payload = "\x1f".join(row.get(field) or "" for field in SELLER_FIELDS)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+def update_params(row):
+    """UPDATE_SELLER_SQL parameters for one CSV row."""
+    return (
+        row.get('seller_id'),
+        row.get('seller_name'),
+        row.get('seller_email'),
+        row.get('unit_price'),
+        row_hash(row),
+        row.get('bid_no')
+    )
 
 def connect_db():
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        db = get_db()
+        db.ping()
         print("[DB] ✅ Connected to database")
-        return conn
+        return db
     except Error as e:
         print(f"[DB] ❌ Connection error: {e}")
         return None
 
-def prepare_table(conn):
+def prepare_table(db):
     """Add missing columns to the contracts table if they don't exist."""
-    cursor = conn.cursor()
-    
     # Columns to add
     new_columns = [
         ("seller_id", "VARCHAR(100)"),
         ("seller_name", "TEXT"),
         ("seller_email", "VARCHAR(255)"),
-        ("unit_price", "VARCHAR(50)")
+        ("unit_price", "VARCHAR(50)"),
+        ("seller_info_hash", "CHAR(32)")
     ]
     
-    # Check existing columns
-    cursor.execute("DESCRIBE contracts")
-    existing_columns = [col[0] for col in cursor.fetchall()]
-    
-    for col_name, col_type in new_columns:
-        if col_name not in existing_columns:
-            print(f"[DB] ➕ Adding column: {col_name}")
-            cursor.execute(f"ALTER TABLE contracts ADD COLUMN {col_name} {col_type}")
-    
-    conn.commit()
-    cursor.close()
+    with db.cursor() as cursor:
+        # Check existing columns
+        cursor.execute("DESCRIBE contracts")
+        existing_columns = [col[0] for col in cursor.fetchall()]
+        
+        for col_name, col_type in new_columns:
+            if col_name not in existing_columns:
+                print(f"[DB] ➕ Adding column: {col_name}")
+                cursor.execute(f"ALTER TABLE contracts ADD COLUMN {col_name} {col_type}")
 
-def update_db_from_csv(conn):
+def update_db_from_csv(db, csv_file=CSV_FILE):
     """Read CSV and update database records."""
-    if not Path(CSV_FILE).exists():
-        print(f"[CSV] ❌ File not found: {CSV_FILE}")
+    if not Path(csv_file).exists():
+        print(f"[CSV] ❌ File not found: {csv_file}")
         return
 
-    cursor = conn.cursor()
-    
     success_count = 0
     total_count = 0
-    
-    with open(CSV_FILE, mode='r', encoding='utf-8') as f:
+    unchanged = []   # rowcount 0: bid unknown, or its seller fields already current
+    failed = set()
+
+    query = UPDATE_SELLER_SQL
+
+    # One prepared statement for the whole file, committed once
+    with open(csv_file, mode='r', encoding='utf-8') as f, \
+            db.cursor(prepared=True) as cursor, db.timed(query):
         reader = csv.DictReader(f)
         for row in reader:
             total_count += 1
@@ -72,34 +112,18 @@ def update_db_from_csv(conn):
             if not bid_no:
                 continue
                 
-            # Update query
-            # We match on bid_no
-            query = """
-            UPDATE contracts 
-            SET seller_id = %s, 
-                seller_name = %s, 
-                seller_email = %s, 
-                unit_price = %s
-            WHERE bid_no = %s
-            """
-            params = (
-                row.get('seller_id'),
-                row.get('seller_name'),
-                row.get('seller_email'),
-                row.get('unit_price'),
-                bid_no
-            )
-            
             try:
-                cursor.execute(query, params)
+                cursor.execute(query, update_params(row))
                 if cursor.rowcount > 0:
                     success_count += 1
+                else:
+                    unchanged.append(bid_no)
             except Error as e:
                 print(f"[DB] ❌ Error updating bid {bid_no}: {e}")
+                failed.add(bid_no)
+
+    unmatched = missing_bids(db, unchanged)
 
-    conn.commit()
-    cursor.close()
-    
     print("\n" + "=" * 50)
     print(f"📊 DATABASE UPDATE SUMMARY")
     print("=" * 50)
@@ -107,15 +131,156 @@ def update_db_from_csv(conn):
     print(f"📝 Total records in CSV: {total_count}")
     print(f"❌ Records not found in DB: {total_count - success_count}")
     print("=" * 50)
+    return unmatched | failed
+
+def missing_bids(db, bid_nos):
+    """The bid_nos that have no contracts row."""
+    bid_nos = list(dict.fromkeys(bid_nos))
+    found = set()
+    for start in range(0, len(bid_nos), STAGING_BATCH_SIZE):
+        batch = bid_nos[start:start + STAGING_BATCH_SIZE]
+        rows = db.fetchall(
+            f"SELECT bid_no FROM contracts WHERE bid_no IN ({', '.join(['%s'] * len(batch))})",
+            tuple(batch), dictionary=False, prepared=False
+        )
+        found.update(row[0] for row in rows)
+    return set(bid_nos) - found
+
+def bulk_update_from_csv(db, csv_file=CSV_FILE):
+    """Stage the CSV and apply it with one set-based UPDATE."""
+    if not Path(csv_file).exists():
+        print(f"[CSV] ❌ File not found: {csv_file}")
+        return
+
+    total_count = 0
+    staged = {}  # bid_no -> row (last one wins, like the per-row path)
+    with open(csv_file, mode='r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            total_count += 1
+            bid_no = row.get('bid_no')
+            if bid_no:
+                staged[bid_no] = (
+                    bid_no,
+                    row.get('seller_id'),
+                    row.get('seller_name'),
+                    row.get('seller_email'),
+                    row.get('unit_price'),
+                    row_hash(row)
+                )
+
+    rows = list(staged.values())
+    insert_query = """
+    INSERT INTO seller_info_staging
+        (bid_no, seller_id, seller_name, seller_email, unit_price, row_hash)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    update_query = """
+    UPDATE contracts c
+    JOIN seller_info_staging s ON s.bid_no = c.bid_no
+    SET c.seller_id = s.seller_id,
+        c.seller_name = s.seller_name,
+        c.seller_email = s.seller_email,
+        c.unit_price = s.unit_price,
+        c.seller_info_hash = s.row_hash
+    WHERE c.seller_info_hash IS NULL OR c.seller_info_hash <> s.row_hash
+    """
+
+    # TEMPORARY tables live in one session: keep a single connection throughout
+    with db.cursor() as cursor:
+        cursor.execute("""
+        CREATE TEMPORARY TABLE IF NOT EXISTS seller_info_staging (
+            bid_no VARCHAR(100) PRIMARY KEY,
+            seller_id VARCHAR(100),
+            seller_name TEXT,
+            seller_email VARCHAR(255),
+            unit_price VARCHAR(50),
+            row_hash CHAR(32)
+        ) ENGINE=InnoDB
+        """)
+        cursor.execute("TRUNCATE TABLE seller_info_staging")
+
+        with db.timed(insert_query):
+            for start in range(0, len(rows), STAGING_BATCH_SIZE):
+                cursor.executemany(insert_query, rows[start:start + STAGING_BATCH_SIZE])
+
+        cursor.execute("""
+        SELECT COUNT(*) FROM seller_info_staging s
+        JOIN contracts c ON c.bid_no = s.bid_no
+        """)
+        matched_count = cursor.fetchone()[0]
+
+        with db.timed(update_query):
+            cursor.execute(update_query)
+        changed_count = cursor.rowcount
+
+        cursor.execute("""
+        SELECT s.bid_no FROM seller_info_staging s
+        LEFT JOIN contracts c ON c.bid_no = s.bid_no
+        WHERE c.bid_no IS NULL
+        """)
+        unmatched = {row[0] for row in cursor.fetchall()}
+
+        cursor.execute("DROP TEMPORARY TABLE seller_info_staging")
+
+    print("\n" + "=" * 50)
+    print(f"📊 DATABASE UPDATE SUMMARY (bulk)")
+    print("=" * 50)
+    print(f"✅ Records matched in DB: {matched_count}")
+    print(f"✏️  Records changed since last sync: {changed_count}")
+    print(f"⏭️  Records unchanged (skipped): {matched_count - changed_count}")
+    print(f"📝 Total records in CSV: {total_count}")
+    print(f"❌ Records not found in DB: {total_count - matched_count}")
+    print("=" * 50)
+    return unmatched
+
+def keep_unmatched_delta(csv_file, pending):
+    """
+    After a --delta sync: keep only the rows of bids still pending (no
+    contracts row yet, or the update failed) for the next sync, since the
+    JSON to CSV field cache will not report them as changed again.
+    """
+    if not pending:
+        # Applied: the next JSON to CSV run starts a fresh delta
+        Path(csv_file).unlink()
+        return
+    tmp_file = csv_file + ".tmp"
+    kept = 0
+    with open(csv_file, mode='r', encoding='utf-8') as f, \
+            open(tmp_file, 'w', newline='', encoding='utf-8') as out:
+        reader = csv.DictReader(f)
+        writer = csv.DictWriter(out, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        for row in reader:
+            if row.get('bid_no') in pending:
+                writer.writerow(row)
+                kept += 1
+    os.replace(tmp_file, csv_file)
+    print(f"[CSV] ⏳ Kept {kept} row(s) not yet in the DB in {csv_file} for the next sync")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 3C: save seller_info.csv to the contracts table")
+    parser.add_argument("--mode", choices=["bulk", "per-row"], default="bulk",
+                        help="bulk: staging table + one joined UPDATE (default); per-row: one UPDATE per row")
+    parser.add_argument("--delta", action="store_true",
+                        help=f"only the changed rows in {DELTA_CSV_FILE}, removed once applied")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    print("🚀 Starting Database Update (Phase 3C)...")
+    args = parse_args()
+    csv_file = DELTA_CSV_FILE if args.delta else CSV_FILE
+    print(f"🚀 Starting Database Update (Phase 3C, {args.mode}, {csv_file})...")
     
-    connection = connect_db()
-    if connection:
-        try:
-            prepare_table(connection)
-            update_db_from_csv(connection)
-        finally:
-            connection.close()
-            print("[DB] 🔒 Connection closed")
+    if args.delta and not Path(csv_file).exists():
+        print("[CSV] ⏭️ No changed rows to sync")
+        raise SystemExit(0)
+
+    db = connect_db()
+    if db:
+        prepare_table(db)
+        if args.mode == "bulk":
+            pending = bulk_update_from_csv(db, csv_file)
+        else:
+            pending = update_db_from_csv(db, csv_file)
+        db.timing_report()
+        if args.delta and pending is not None:
+            keep_unmatched_delta(csv_file, pending)
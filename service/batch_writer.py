@@ -0,0 +1,302 @@
+"""
+Write-Behind Batch Writer
+The browser thread hands rows to put() and moves on; a background thread
+groups them and writes each group with one executemany() as soon as the batch
+is full or flush_interval has passed. If MySQL is unreachable the batch is
+appended to a local spool file (one JSON row per line) and replayed once the
+database answers again, so a DB outage never loses scraped rows and never
+stalls the crawl. Rows the database rejects as bad data, written or replayed,
+go to <name>.rejected.jsonl (a rejected replay batch is retried row by row).
+Spool lines that cannot be read back (cut short by a crash mid-append) are
+moved to <name>.corrupt.jsonl instead of blocking the replay.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
+
+from service.database import get_db
+
+
+SPOOL_DIR = Path(__file__).resolve().parents[1] / "data" / "spool"
+
+BATCH_SIZE = 200          # rows per executemany
+FLUSH_INTERVAL = 2.0      # seconds a partial batch may wait
+RETRY_INTERVAL = 30.0     # seconds between DB retries while spooling
+QUEUE_MAXSIZE = 20000     # beyond this, rows go straight to the spool
+
+
+class BatchWriter:
+    """
+    statements maps a record kind to its INSERT statement, e.g.
+    {"contract": INSERT_CONTRACT_SQL}. Rows are tuples in statement order.
+    """
+
+    def __init__(self, statements, name="contracts", db=None,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 spool_dir=SPOOL_DIR):
+        self.statements = statements
+        self.name = name
+        self.db = db or get_db()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        self.spool_path = spool_dir / f"{name}.jsonl"
+        self.rejected_path = spool_dir / f"{name}.rejected.jsonl"
+        self.corrupt_path = spool_dir / f"{name}.corrupt.jsonl"
+        self._spool_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=QUEUE_MAXSIZE)
+        self._stop = threading.Event()
+        self._thread = None
+        self._db_down_until = 0.0
+        # Set if the background thread died: flush()/close() raise it instead of waiting
+        self._error = None
+
+        self.stats = {"written": 0, "batches": 0, "spooled": 0, "replayed": 0}
+
+    # --------------------------------------------------
+    # PUBLIC API (called from the browser thread)
+    # --------------------------------------------------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=f"{self.name}-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, kind, row):
+        """Never blocks on the database."""
+        try:
+            self._queue.put_nowait((kind, row))
+        except queue.Full:
+            self._spool([(kind, row)])
+
+    def flush(self):
+        """
+        Wait until everything queued so far is in MySQL or in the spool.
+        Raises RuntimeError if the writer thread died (its rows are spooled).
+        """
+        q = self._queue
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                if self._thread is not None and not self._thread.is_alive():
+                    break
+                q.all_tasks_done.wait(timeout=0.5)
+            else:
+                return
+        self._raise_dead()
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.flush()   # raises if the writer thread died
+        self._stop.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+
+        print(f"[WRITER] 📊 {self.name}: {self.stats['written']} rows in "
+              f"{self.stats['batches']} batches | spooled {self.stats['spooled']} | "
+              f"replayed {self.stats['replayed']}")
+        if self.spool_path.exists() and self.spool_path.stat().st_size:
+            print(f"[WRITER] ⚠️ Rows still spooled in {self.spool_path} (replayed on next run)")
+
+    def _raise_dead(self):
+        # Nothing will consume the queue any more: keep its rows in the spool
+        drained = []
+        while True:
+            try:
+                drained.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if drained:
+            self._spool(drained)
+        print(f"[WRITER] ❌ {self.name} writer thread died ({self._error}). "
+              f"{len(drained)} queued row(s) spooled to {self.spool_path.name}")
+        raise RuntimeError(f"{self.name} writer thread died: {self._error}") from self._error
+
+    # --------------------------------------------------
+    # BACKGROUND THREAD
+    # --------------------------------------------------
+    def _loop(self):
+        try:
+            self._run()
+        except BaseException as e:
+            self._error = e
+            raise
+
+    def _run(self):
+        self._replay_spool()
+
+        batch = []
+        deadline = None
+        while not (self._stop.is_set() and not batch and self._queue.empty()):
+            timeout = self.flush_interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+            full = len(batch) >= self.batch_size
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (full or due or self._stop.is_set()):
+                try:
+                    self._write(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                batch = []
+                deadline = None
+            elif not batch and time.monotonic() >= self._db_down_until:
+                # Idle: a good moment to drain what an outage left behind
+                self._replay_spool()
+
+    def _write(self, records):
+        if time.monotonic() < self._db_down_until:
+            self._spool(records)
+            return
+
+        try:
+            self._execute(records)
+            self.stats["written"] += len(records)
+        except (OperationalError, InterfaceError, PoolError) as e:
+            print(f"[WRITER] ⚠️ DB unavailable ({e}). Spooling {len(records)} row(s)")
+            self._db_down_until = time.monotonic() + RETRY_INTERVAL
+            self._spool(records)
+            return
+        except Error as e:
+            # Bad data, not an outage: retrying would fail forever
+            print(f"[WRITER] ❌ Batch rejected ({e}). Saved to {self.rejected_path.name}")
+            self._spool(records, path=self.rejected_path)
+            return
+        except Exception as e:
+            # Unexpected (driver bug, bad kind, ...): keep the rows and back off like an outage
+            print(f"[WRITER] ⚠️ Batch write failed ({e!r}). Spooling {len(records)} row(s)")
+            self._db_down_until = time.monotonic() + RETRY_INTERVAL
+            self._spool(records)
+            return
+
+        # DB is healthy again: replay anything spooled earlier
+        self._replay_spool()
+
+    def _execute(self, records):
+        by_kind = {}
+        for kind, row in records:
+            by_kind.setdefault(kind, []).append(row)
+        for kind, rows in by_kind.items():
+            self.db.executemany(self.statements[kind], rows)
+            self.stats["batches"] += 1
+
+    # --------------------------------------------------
+    # SPOOL (append-only JSONL)
+    # --------------------------------------------------
+    def _spool(self, records, path=None):
+        with self._spool_lock, open(path or self.spool_path, "a", encoding="utf-8") as f:
+            for kind, row in records:
+                f.write(json.dumps({"k": kind, "r": list(row)}, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if path is None:
+            self.stats["spooled"] += len(records)
+
+    def _replay_spool(self):
+        try:
+            self._replay_pending()
+        except Exception as e:
+            # Never let a replay problem stop the writer: the files stay for the next try
+            print(f"[WRITER] ⚠️ Replay failed ({e!r}); retrying in {RETRY_INTERVAL:.0f}s")
+            self._db_down_until = time.monotonic() + RETRY_INTERVAL
+
+    def _replay_pending(self):
+        with self._spool_lock:
+            if self.spool_path.exists() and self.spool_path.stat().st_size:
+                # Move the spool aside so rows spooled meanwhile don't race the replay
+                os.replace(self.spool_path, self.spool_path.with_name(
+                    f"{self.name}.replay-{time.time_ns()}.jsonl"))
+            # Includes replays interrupted by a crash in an earlier run
+            pending = sorted(self.spool_path.parent.glob(f"{self.name}.replay-*.jsonl"))
+
+        for replay_path in pending:
+            records = self._read_spool(replay_path)
+
+            print(f"[WRITER] 🔁 Replaying {len(records)} spooled row(s) from {replay_path.name}")
+            for start in range(0, len(records), self.batch_size):
+                chunk = records[start:start + self.batch_size]
+                try:
+                    self._execute(chunk)
+                except (OperationalError, InterfaceError, PoolError) as e:
+                    self._keep_spooled(records[start:], e)
+                    replay_path.unlink()
+                    return
+                except Error:
+                    # Bad data, not an outage: row by row, so one bad row doesn't hold back its batch
+                    if not self._replay_rows(chunk):
+                        self._keep_spooled(records[start + self.batch_size:])
+                        replay_path.unlink()
+                        return
+                    continue
+                except Exception as e:
+                    self._keep_spooled(records[start:], e)
+                    replay_path.unlink()
+                    return
+                self.stats["replayed"] += len(chunk)
+
+            replay_path.unlink()
+
+    def _replay_rows(self, records):
+        """
+        Replay records one at a time after their batch was rejected; rows
+        the database rejects go to the rejected file. Returns False (the
+        rest kept spooled) if the database became unavailable.
+        """
+        for index, record in enumerate(records):
+            try:
+                self._execute([record])
+                self.stats["replayed"] += 1
+            except (OperationalError, InterfaceError, PoolError) as e:
+                self._keep_spooled(records[index:], e)
+                return False
+            except Error as e:
+                print(f"[WRITER] ❌ Spooled row rejected ({e}). Saved to {self.rejected_path.name}")
+                self._spool([record], path=self.rejected_path)
+            except Exception as e:
+                self._keep_spooled(records[index:], e)
+                return False
+        return True
+
+    def _keep_spooled(self, records, error=None):
+        # Outage (or unexpected failure) mid-replay: back off, the rows wait for the next replay
+        if error is not None:
+            print(f"[WRITER] ⚠️ Replay interrupted ({error!r}); keeping the rest spooled")
+        self._db_down_until = time.monotonic() + RETRY_INTERVAL
+        if records:
+            self._spool(records, path=self.spool_path)
+
+    def _read_spool(self, path):
+        """Records of a spool file; unreadable lines are moved to the corrupt file."""
+        records = []
+        corrupt = []
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                    records.append((item["k"], tuple(item["r"])))
+                except (ValueError, KeyError, TypeError):
+                    corrupt.append(line if line.endswith("\n") else line + "\n")
+        if corrupt:
+            print(f"[WRITER] ⚠️ {len(corrupt)} unreadable spool line(s) in {path.name} "
+                  f"moved to {self.corrupt_path.name}")
+            with self._spool_lock, open(self.corrupt_path, "a", encoding="utf-8") as f:
+                f.writelines(corrupt)
+        return records
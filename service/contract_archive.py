@@ -0,0 +1,197 @@
+"""
+Phase 3: Contract Archive
+Single-file archive for extracted contract JSON (and optionally the PDFs)
+with random access by bid_no.
+
+GeM contracts are generated from one template, so most of every document
+is boilerplate shared with all the others ("Organisation Details", terms,
+table headers). Compressing each file on its own (ZIP) cannot exploit
+that; compressing the corpus as one stream can, but loses random access.
+Here every document is its own zstd frame, compressed with a dictionary
+trained on the corpus itself, so the shared boilerplate costs nothing per
+document and any contract is read with one seek and one small decompress.
+
+Layout (all offsets absolute, little-endian):
+
+    MAGIC
+    zstd frame per document ...
+    dictionary per kind ("json", "pdf") ...
+    index (JSON): {"version", "level", "dicts": {kind: [offset, length]},
+                   "entries": {kind: {bid_no: [offset, length, size]}}}
+    footer: index offset (u64), index length (u64), MAGIC
+
+    with ContractArchive("data/contracts.gca") as archive:
+        data = archive.get_json("GEMC-511687701265917")
+
+Requires the optional zstandard package (pip install zstandard).
+"""
+
+import itertools
+import json
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+MAGIC = b"GEMCZA1\n"
+FOOTER = struct.Struct("<QQ")
+FORMAT_VERSION = 1
+KINDS = ("json", "pdf")
+
+ARCHIVE_PATH = "data/contracts.gca"
+COMPRESSION_LEVEL = 19
+DICT_SIZE = 112 * 1024
+# Documents per kind the dictionary is trained on (held in memory)
+TRAIN_SAMPLES = 2000
+# Below this the corpus is too small to train on; frames are written without a dictionary
+MIN_TRAIN_SAMPLES = 8
+
+
+def require_zstd():
+    if zstd is None:
+        raise ImportError("zstandard is not installed (pip install zstandard)")
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = DICT_SIZE,
+                     level: int = COMPRESSION_LEVEL) -> Optional[bytes]:
+    """zstd dictionary for the samples, or None if there are too few to train on."""
+    require_zstd()
+    if len(samples) < MIN_TRAIN_SAMPLES:
+        return None
+    # The trainer rejects dictionaries larger than what it learns from
+    dict_size = min(dict_size, sum(len(sample) for sample in samples) // 4)
+    try:
+        return zstd.train_dictionary(dict_size, samples, level=level).as_bytes()
+    except zstd.ZstdError as e:
+        print(f"[ARCHIVE] ⚠️ Dictionary training failed, compressing without: {e}")
+        return None
+
+
+def pack(path: str, documents: Dict[str, Iterable[Tuple[str, bytes]]],
+         level: int = COMPRESSION_LEVEL, dict_size: int = DICT_SIZE) -> Dict[str, Dict[str, int]]:
+    """
+    Write an archive from {kind: iterable of (bid_no, bytes)}. The first
+    TRAIN_SAMPLES documents of each kind train its dictionary; the rest are
+    streamed. A later document with the same bid_no replaces the earlier
+    one. Returns per-kind stats (count, raw and stored bytes, dict size).
+    """
+    require_zstd()
+    stats = {}
+    index = {"version": FORMAT_VERSION, "level": level, "dicts": {}, "entries": {}}
+    dicts: Dict[str, bytes] = {}
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        for kind, docs in documents.items():
+            docs = iter(docs)
+            head = list(itertools.islice(docs, TRAIN_SAMPLES))
+            dict_data = train_dictionary([data for _, data in head], dict_size, level)
+            if dict_data:
+                dicts[kind] = dict_data
+                cctx = zstd.ZstdCompressor(level=level, dict_data=zstd.ZstdCompressionDict(dict_data))
+            else:
+                cctx = zstd.ZstdCompressor(level=level)
+
+            entries = index["entries"][kind] = {}
+            kind_stats = stats[kind] = {"count": 0, "raw": 0, "stored": 0,
+                                        "dict": len(dict_data or b"")}
+            for bid_no, data in itertools.chain(head, docs):
+                frame = cctx.compress(data)
+                entries[bid_no] = [f.tell(), len(frame), len(data)]
+                f.write(frame)
+                kind_stats["raw"] += len(data)
+                kind_stats["stored"] += len(frame)
+            kind_stats["count"] = len(entries)
+
+        for kind, dict_data in dicts.items():
+            index["dicts"][kind] = [f.tell(), len(dict_data)]
+            f.write(dict_data)
+
+        index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        index_offset = f.tell()
+        f.write(index_bytes)
+        f.write(FOOTER.pack(index_offset, len(index_bytes)))
+        f.write(MAGIC)
+    os.replace(tmp, path)
+    return stats
+
+
+class ContractArchive:
+    """Read access to an archive written by pack()."""
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        require_zstd()
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._load_index()
+        except Exception:
+            self._file.close()
+            raise
+        self._dctx: Dict[str, Any] = {}
+
+    def _load_index(self):
+        f = self._file
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a contract archive")
+        f.seek(-(FOOTER.size + len(MAGIC)), os.SEEK_END)
+        index_offset, index_length = FOOTER.unpack(f.read(FOOTER.size))
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is truncated (no footer)")
+        f.seek(index_offset)
+        index = json.loads(f.read(index_length))
+        if index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported archive version {index.get('version')}")
+        self.level = index["level"]
+        self.entries: Dict[str, Dict[str, List[int]]] = index["entries"]
+        self.dicts: Dict[str, List[int]] = index["dicts"]
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def _decompressor(self, kind: str):
+        dctx = self._dctx.get(kind)
+        if dctx is None:
+            if kind in self.dicts:
+                dict_data = zstd.ZstdCompressionDict(self._read(*self.dicts[kind]))
+                dctx = zstd.ZstdDecompressor(dict_data=dict_data)
+            else:
+                dctx = zstd.ZstdDecompressor()
+            self._dctx[kind] = dctx
+        return dctx
+
+    def keys(self, kind: str = "json") -> List[str]:
+        return list(self.entries.get(kind, {}))
+
+    def __contains__(self, bid_no: str) -> bool:
+        return any(bid_no in entries for entries in self.entries.values())
+
+    def get(self, bid_no: str, kind: str = "json") -> bytes:
+        """Stored bytes of a document; KeyError if the archive does not have it."""
+        offset, length, size = self.entries.get(kind, {})[bid_no]
+        return self._decompressor(kind).decompress(self._read(offset, length), max_output_size=size)
+
+    def get_json(self, bid_no: str) -> Dict[str, Any]:
+        return json.loads(self.get(bid_no, "json"))
+
+    def iter(self, kind: str = "json") -> Iterator[Tuple[str, bytes]]:
+        """(bid_no, bytes) in file order (sequential reads)."""
+        entries = sorted(self.entries.get(kind, {}).items(), key=lambda item: item[1][0])
+        for bid_no, _ in entries:
+            yield bid_no, self.get(bid_no, kind)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,283 @@
+"""
+Shared Data-Access Layer
+One mysql.connector connection pool per process, shared by every DB
+touchpoint (Phase 1 controller, category leases, Phase 2 downloader,
+Phase 3 DB sync). Connections are pinged on checkout and reconnected if the
+server dropped the session, parameterized statements run through cached
+server-side prepared statements, and every query is timed per statement.
+"""
+
+import os
+import re
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from mysql.connector import Error, errorcode, pooling
+from mysql.connector.errors import PoolError
+
+from config import DB_CONFIG, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_SLOW_QUERY_SECONDS
+
+
+RECONNECT_ATTEMPTS = 3
+RECONNECT_DELAY = 1
+
+# Errors that mean "the session is gone", safe to retry on a fresh connection
+CONNECTION_LOST_ERRORS = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_CONNECTION_ERROR,
+    errorcode.CR_CONN_HOST_ERROR,
+}
+
+_WS_RE = re.compile(r"\s+")
+
+
+def query_label(query):
+    """Short, stable label used to group timings ('SELECT id, bid_no FROM contracts ...')."""
+    label = _WS_RE.sub(" ", query).strip()
+    return label if len(label) <= 70 else label[:67] + "..."
+
+
+class Database:
+    def __init__(self, config=None, pool_size=DB_POOL_SIZE, pool_name="gem_pool"):
+        self.config = dict(config or DB_CONFIG)
+        self.pool_size = pool_size
+        self.pool_name = pool_name
+
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        # underlying connection -> {query: prepared cursor}
+        self._prepared = weakref.WeakKeyDictionary()
+
+        # label -> [calls, total_seconds, max_seconds]
+        self.timings = {}
+        self.slow_query_seconds = DB_SLOW_QUERY_SECONDS
+
+    # --------------------------------------------------
+    # POOL
+    # --------------------------------------------------
+    def _get_pool(self):
+        # Pools must not cross a fork: worker processes build their own
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=f"{self.pool_name}_{pid}",
+                        pool_size=self.pool_size,
+                        # Keep the session on return so prepared statements survive
+                        pool_reset_session=False,
+                        **self.config
+                    )
+                    self._prepared = weakref.WeakKeyDictionary()
+                    self._pid = pid
+                    print(f"[DB] ✅ Connection pool ready ({self.pool_size} connections)")
+        return self._pool
+
+    def get_connection(self, timeout=DB_POOL_TIMEOUT):
+        """Check a connection out of the pool, waiting up to `timeout` seconds."""
+        pool = self._get_pool()
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                conn = pool.get_connection()
+                break
+            except PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+        try:
+            conn.ping()
+        except Error:
+            # Session dropped (wait_timeout, server restart): its prepared
+            # statements died with it
+            self._prepared.pop(getattr(conn, "_cnx", conn), None)
+            try:
+                conn.reconnect(attempts=RECONNECT_ATTEMPTS, delay=RECONNECT_DELAY)
+            except Error:
+                conn.close()
+                raise
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()  # returns it to the pool
+
+    @contextmanager
+    def cursor(self, dictionary=False, prepared=False, commit=True):
+        """
+        Cursor on a pooled connection. Commits when the block finishes and
+        rolls back if it raises.
+
+            with db.cursor(prepared=True) as cur:
+                for row in rows:
+                    cur.execute(INSERT_SQL, row)
+        """
+        with self.connection() as conn:
+            cur = conn.cursor(dictionary=dictionary, prepared=prepared)
+            try:
+                yield cur
+                if commit:
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    @contextmanager
+    def transaction(self, dictionary=False):
+        """Explicit transaction (needed for SELECT ... FOR UPDATE)."""
+        with self.connection() as conn:
+            conn.start_transaction()
+            cur = conn.cursor(dictionary=dictionary)
+            try:
+                yield cur
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    # --------------------------------------------------
+    # PREPARED STATEMENTS
+    # --------------------------------------------------
+    def _prepared_cursor(self, conn, query, dictionary=False):
+        # Reuse one prepared cursor per (connection, statement) so the
+        # statement is prepared once and then only executed
+        raw = getattr(conn, "_cnx", conn)
+        cache = self._prepared.setdefault(raw, {})
+        key = (query, dictionary)
+        cur = cache.get(key)
+        if cur is None:
+            cur = conn.cursor(prepared=True, dictionary=dictionary)
+            cache[key] = cur
+        return cur
+
+    # --------------------------------------------------
+    # TIMING
+    # --------------------------------------------------
+    @contextmanager
+    def timed(self, query):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            label = query_label(query)
+            with self._lock:
+                stats = self.timings.setdefault(label, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], elapsed)
+            if elapsed >= self.slow_query_seconds:
+                print(f"[DB] 🐢 Slow query ({elapsed:.2f}s): {label}")
+
+    def timing_report(self, top=10):
+        rows = sorted(self.timings.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        if not rows:
+            return
+        print("\n[DB] ⏱️  Query timings (calls | total | avg | max)")
+        for label, (calls, total, worst) in rows:
+            print(f"  {calls:>7} | {total:8.2f}s | {total / calls * 1000:7.1f}ms | "
+                  f"{worst * 1000:7.1f}ms | {label}")
+
+    # --------------------------------------------------
+    # HELPERS (auto-retry once on a dropped session)
+    # --------------------------------------------------
+    def _run(self, fn, query):
+        for attempt in (1, 2):
+            try:
+                with self.connection() as conn, self.timed(query):
+                    return fn(conn)
+            except Error as e:
+                if attempt == 2 or e.errno not in CONNECTION_LOST_ERRORS:
+                    raise
+                print(f"[DB] 🔄 Connection lost ({e.errno}), retrying on a fresh connection")
+
+    def execute(self, query, params=None, prepared=True):
+        """Run a single write statement and commit. Returns the rowcount."""
+        def fn(conn):
+            if prepared and params:
+                cur = self._prepared_cursor(conn, query)
+            else:
+                cur = conn.cursor()
+            try:
+                cur.execute(query, params or ())
+                conn.commit()
+                return cur.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                if not (prepared and params):
+                    cur.close()
+        return self._run(fn, query)
+
+    def executemany(self, query, rows):
+        """
+        Batch write. Uses a plain cursor on purpose: mysql.connector rewrites
+        INSERT ... VALUES into one multi-row statement, which is far faster
+        than executing a prepared statement per row.
+        """
+        if not rows:
+            return 0
+
+        def fn(conn):
+            cur = conn.cursor()
+            try:
+                cur.executemany(query, rows)
+                conn.commit()
+                return cur.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        return self._run(fn, query)
+
+    def fetchall(self, query, params=None, dictionary=True, prepared=True):
+        def fn(conn):
+            if prepared and params:
+                cur = self._prepared_cursor(conn, query, dictionary)
+            else:
+                cur = conn.cursor(dictionary=dictionary)
+            try:
+                cur.execute(query, params or ())
+                return cur.fetchall()
+            finally:
+                if not (prepared and params):
+                    cur.close()
+        return self._run(fn, query)
+
+    def fetchone(self, query, params=None, dictionary=True):
+        rows = self.fetchall(query, params, dictionary=dictionary)
+        return rows[0] if rows else None
+
+    def ping(self):
+        with self.connection() as conn:
+            return conn.is_connected()
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Process-wide Database instance (the pool itself is created lazily)."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = Database()
+    return _db
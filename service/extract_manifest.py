@@ -0,0 +1,181 @@
+"""
+Phase 3: Extraction Manifest
+Remembers, for every PDF already extracted to JSON, the PDF's content hash
+and the extractor that produced the JSON. A run then only extracts PDFs that
+are new, changed, or were extracted by another engine/version, so daily
+runs cost time proportional to the new downloads rather than the archive.
+
+The manifest lives next to the JSON files (data/JSON/.manifest.json):
+
+    {"GEMC-123.pdf": {"sha256": "...", "size": 81234, "mtime_ns": ...,   # or "crc32"
+                      "extractor": "pdfplumber:4", "json": "GEMC-123.json"}}
+
+Hashing reads the whole file, so it is skipped when size and mtime (CRC-32
+for PDFs read from ZIP archives) still match the manifest entry. Entries
+are keyed by file name, so a PDF moved into an archive is still known.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Set, Tuple
+
+from service.pdf_sources import read_chunks, source_name, source_stat
+
+# Bump when a code change alters the JSON written for the same PDF
+EXTRACTOR_VERSION = 4
+
+MANIFEST_NAME = ".manifest.json"
+FAILURES_NAME = ".failures.json"
+HASH_CHUNK = 1024 * 1024
+
+
+def extractor_id(engine: str) -> str:
+    return f"{engine}:{EXTRACTOR_VERSION}"
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a PDF file or ZIP member reference (service/pdf_sources.py)."""
+    digest = hashlib.sha256()
+    for chunk in read_chunks(path, HASH_CHUNK):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractManifest:
+    def __init__(self, json_dir: str):
+        self.json_dir = Path(json_dir)
+        self.path = self.json_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            # A broken manifest only costs a full re-extraction
+            print(f"[MANIFEST] ⚠️ Ignoring unreadable {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        self.json_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._dirty = 0
+
+    def fingerprint(self, pdf_path: str) -> Dict[str, Any]:
+        """Content hash of a PDF, reusing the stored hash if its size/mtime (CRC for ZIP members) are unchanged."""
+        stat = source_stat(pdf_path)
+        entry = self.entries.get(source_name(pdf_path))
+        if entry and all(entry.get(key) == value for key, value in stat.items()):
+            sha256 = entry["sha256"]
+        else:
+            sha256 = file_sha256(pdf_path)
+        return dict(stat, sha256=sha256)
+
+    def check(self, pdf_path: str, engine: str, ignore_version: bool = False,
+              require_json: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Why a PDF needs extracting ("new", "changed", "extractor",
+        "missing-json") or None if its JSON is current. require_json=False
+        for runs that keep no JSON (run_phase3_stream.py).
+        """
+        fp = self.fingerprint(pdf_path)
+        entry = self.entries.get(source_name(pdf_path))
+        if entry is None:
+            return "new", fp
+        if entry["sha256"] != fp["sha256"]:
+            return "changed", fp
+        if not ignore_version and entry.get("extractor") != extractor_id(engine):
+            return "extractor", fp
+        if require_json and not (self.json_dir / entry["json"]).exists():
+            return "missing-json", fp
+        return None, fp
+
+    def stale(self, pdf_files: Iterable[Optional[str]], engine: str, fingerprints: Dict[str, Any],
+              force: bool = False, ignore_version: bool = False, require_json: bool = True,
+              reasons: Dict[str, int] = None, seen: Set[str] = None) -> Iterator[Optional[Tuple[str, str]]]:
+        """
+        (pdf, reason) of the PDFs that need extracting, checked lazily so
+        workers start on the first one right away. Fingerprints go into
+        fingerprints (for record()), reason counts into reasons; a PDF
+        whose name is already in seen is skipped. None items (a feed with
+        nothing downloaded yet) are passed through.
+        """
+        seen = set() if seen is None else seen
+        for pdf_file in pdf_files:
+            if pdf_file is None:
+                yield None
+                continue
+            name = source_name(pdf_file)
+            if name in seen:
+                continue
+            seen.add(name)
+            reason, fingerprints[pdf_file] = self.check(pdf_file, engine, ignore_version=ignore_version,
+                                                        require_json=require_json)
+            if force:
+                reason = reason or "forced"
+            if reason is None:
+                continue
+            if reasons is not None:
+                reasons[reason] = reasons.get(reason, 0) + 1
+            yield pdf_file, reason
+
+    def referenced(self) -> Set[str]:
+        """Names of the JSON files / shards the entries point to."""
+        return {entry["json"] for entry in self.entries.values()}
+
+    def record(self, pdf_path: str, fp: Dict[str, Any], engine: str, json_path: str,
+               save_every: int = 50):
+        # Replace: a file entry must not keep a stale ZIP stamp (or vice versa)
+        self.entries[source_name(pdf_path)] = dict(
+            fp, extractor=extractor_id(engine), json=os.path.basename(json_path)
+        )
+        self._dirty += 1
+        # Periodic saves so an interrupted run keeps most of its progress
+        if self._dirty >= save_every:
+            self.save()
+
+
+class FailureLog:
+    """
+    PDFs that failed to extract, with the reason (data/JSON/.failures.json).
+    Entries are dropped once the PDF extracts cleanly; attempts count across
+    runs so files that always fail stand out.
+    """
+
+    def __init__(self, json_dir: str):
+        self.json_dir = Path(json_dir)
+        self.path = self.json_dir / FAILURES_NAME
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries: Dict[str, Dict[str, Any]] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def record(self, pdf_path: str, reason: str):
+        name = source_name(pdf_path)
+        previous = self.entries.get(name, {})
+        self.entries[name] = {
+            "reason": reason,
+            "attempts": previous.get("attempts", 0) + 1,
+            "last_attempt": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def clear(self, pdf_path: str):
+        self.entries.pop(source_name(pdf_path), None)
+
+    def save(self):
+        self.json_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,221 @@
+"""
+Phase 3: Extraction Scheduler
+Process pool for long PDF backlogs, replacing a bare ProcessPoolExecutor:
+
+  - one file per dispatch, so a hung file can be timed out on its own: the
+    worker is killed, the file recorded as failed and a fresh worker started
+  - workers exit after max_tasks_per_child files (or once their RSS passes
+    max_memory_mb) and are replaced, bounding pdfplumber's memory growth
+  - a worker whose RSS passes the cap mid-file is killed like a timeout
+  - tasks are pulled lazily from an iterator, only when a worker is idle,
+    so nothing is queued up front for a 100k-file backlog
+  - follow-up tasks (e.g. the remaining page ranges of a large PDF) can be
+    submit()ted while running; they go ahead of new files
+  - the task iterator may yield None when it has nothing yet (e.g. it is
+    fed by a queue while files are still downloading); idle workers ask
+    again on the next poll, and the run ends only once it is exhausted
+
+Each worker talks to the parent over its own pipe; killing one never
+touches another worker's channel.
+
+    scheduler = ExtractScheduler(extract_fn, workers=8, timeout=120)
+    for task, result in scheduler.run(tasks):
+        ...   # result is None/dict on success, else the failure reason (str)
+
+extract_fn(task) runs in the worker and returns None (or a dict of details)
+on success, or a failure reason string; exceptions are reported as
+"<Type>: <message>".
+"""
+
+import multiprocessing as mp
+import os
+import signal
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+EXTRACT_TIMEOUT = 120          # seconds per PDF
+MAX_TASKS_PER_CHILD = 25
+MAX_MEMORY_MB = 1024           # per worker RSS
+POLL_INTERVAL = 1.0
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Current resident memory of a process in MB (None if unknown)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _worker_main(extract_fn, conn, max_tasks: int, max_memory_mb: Optional[float]):
+    # Ctrl-C is handled by the parent, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    done = 0
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        try:
+            result = extract_fn(task)
+        except Exception as e:
+            result = f"{type(e).__name__}: {e}"
+        done += 1
+        rss = rss_mb(os.getpid())
+        recycle = done >= max_tasks or bool(max_memory_mb and rss and rss > max_memory_mb)
+        conn.send((result, recycle))
+        if recycle:
+            break
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, extract_fn, max_tasks, max_memory_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main,
+                                args=(extract_fn, child_conn, max_tasks, max_memory_mb),
+                                daemon=True)
+        self.proc.start()
+        child_conn.close()
+        self.task = None
+        self.started = 0.0
+
+    def assign(self, task):
+        self.task = task
+        self.started = time.monotonic()
+        self.conn.send(task)
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.conn.close()
+
+
+class ExtractScheduler:
+    def __init__(self, extract_fn: Callable[[Any], Any], workers: int = None,
+                 timeout: float = EXTRACT_TIMEOUT, max_tasks_per_child: int = MAX_TASKS_PER_CHILD,
+                 max_memory_mb: Optional[float] = MAX_MEMORY_MB, start_method: Optional[str] = None):
+        self.extract_fn = extract_fn
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_tasks_per_child = max(1, max_tasks_per_child)
+        self.max_memory_mb = max_memory_mb
+        # "spawn" when the parent runs other threads (e.g. a browser) that forked workers must not inherit
+        self.ctx = mp.get_context(start_method)
+        self.stats = {"done": 0, "failed": 0, "timeouts": 0, "killed_memory": 0,
+                      "crashed": 0, "recycled": 0}
+        self._submitted = deque()
+
+    def submit(self, task):
+        """Queue a task ahead of the remaining input (call while run() iterates)."""
+        self._submitted.append(task)
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self.ctx, self.extract_fn, self.max_tasks_per_child, self.max_memory_mb)
+
+    def run(self, tasks: Iterable[Any]) -> Iterator[Tuple[Any, Any]]:
+        """Yield (task, result) as tasks finish, in completion order."""
+        pending = iter(tasks)
+        exhausted = False
+        pool = [self._spawn() for _ in range(self.workers)]
+
+        def refill(worker):
+            nonlocal exhausted
+            if self._submitted:
+                worker.assign(self._submitted.popleft())
+                return
+            if exhausted:
+                return
+            try:
+                task = next(pending)
+            except StopIteration:
+                exhausted = True
+                return
+            if task is not None:
+                worker.assign(task)
+
+        def replace(worker, reason_key=None):
+            if reason_key:
+                self.stats[reason_key] += 1
+            pool[pool.index(worker)] = new = self._spawn()
+            refill(new)
+
+        try:
+            for worker in pool:
+                refill(worker)
+
+            while any(w.task is not None for w in pool) or self._submitted or not exhausted:
+                # Tasks submitted (or fed) while workers sat idle
+                for worker in pool:
+                    if worker.task is None and (self._submitted or not exhausted):
+                        refill(worker)
+                        if worker.task is None:
+                            break   # nothing available right now
+                busy = {w.conn: w for w in pool if w.task is not None}
+                for conn in wait(list(busy), timeout=POLL_INTERVAL):
+                    worker = busy[conn]
+                    task = worker.task
+                    try:
+                        result, recycle = conn.recv()
+                    except (EOFError, OSError):
+                        # Died mid-file (segfault, OOM killer, ...)
+                        worker.kill()
+                        self.stats["failed"] += 1
+                        yield task, f"worker crashed (exit code {worker.proc.exitcode})"
+                        replace(worker, "crashed")
+                        continue
+
+                    worker.task = None
+                    self.stats["failed" if isinstance(result, str) else "done"] += 1
+                    yield task, result
+                    if recycle:
+                        worker.stop()
+                        replace(worker, "recycled")
+                    else:
+                        refill(worker)
+
+                # Hung or bloated workers
+                now = time.monotonic()
+                for worker in list(pool):
+                    if worker.task is None:
+                        continue
+                    reason = None
+                    if self.timeout and now - worker.started > self.timeout:
+                        reason, key = f"timeout after {self.timeout:.0f}s", "timeouts"
+                    elif self.max_memory_mb:
+                        rss = rss_mb(worker.proc.pid)
+                        if rss and rss > self.max_memory_mb:
+                            reason, key = f"memory {rss:.0f}MB > {self.max_memory_mb:.0f}MB", "killed_memory"
+                    if reason:
+                        task = worker.task
+                        worker.kill()
+                        self.stats["failed"] += 1
+                        yield task, reason
+                        replace(worker, key)
+        finally:
+            for worker in pool:
+                if worker.task is None:
+                    worker.stop()
+                else:
+                    worker.kill()
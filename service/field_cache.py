@@ -0,0 +1,162 @@
+"""
+Phase 3: Field Cache
+Remembers, for every extracted PDF, the seller fields computed from its
+record and which version of each field's extractor computed them. When a
+pattern in run_phase3_json_to_csv.py changes, only the field whose version
+was bumped is recomputed, and a document whose record and field versions
+are all unchanged is not read again at all.
+
+The cache is a SQLite file next to the JSON files (data/JSON/.fields.sqlite),
+one row per document, so entries are looked up and written one document at
+a time instead of the whole cache living in memory (and in every worker):
+
+    name          "GEMC-123.pdf"
+    doc           "<sha256>:pdfplumber:4"
+    fields        {"bid_no": [1, "GEMC-123"], "unit_price": [2, "1,648"], ...}
+    generation    last CSV run that used the entry (older ones are pruned)
+
+"doc" identifies the extraction record the fields came from: the PDF hash
+and extractor id from the extraction manifest, or a hash of the record's
+bytes when there is no manifest. A different "doc" invalidates all fields.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from service.jsonl_shards import dumps, loads
+
+CACHE_NAME = ".fields.sqlite"
+# Cache file of earlier versions, imported once
+LEGACY_CACHE_NAME = ".fields.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    name        TEXT PRIMARY KEY,
+    doc         TEXT NOT NULL,
+    fields      BLOB NOT NULL,
+    generation  INTEGER NOT NULL
+)
+"""
+
+
+def manifest_doc_key(entry: Dict[str, Any]) -> str:
+    """Record identity from an extraction manifest entry (PDF content + extractor)."""
+    return f"{entry.get('sha256')}:{entry.get('extractor')}"
+
+
+def bytes_doc_key(raw: bytes) -> str:
+    """Record identity from the record's own bytes (no manifest)."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def stale_fields(entry: Optional[Dict[str, Any]], doc: str, versions: Dict[str, int]) -> List[str]:
+    """Fields of a cache entry that must be recomputed for record `doc`, in `versions` order."""
+    if entry is None or entry.get("doc") != doc:
+        return list(versions)
+    fields = entry["fields"]
+    return [field for field, version in versions.items()
+            if field not in fields or fields[field][0] != version]
+
+
+def make_entry(doc: str, row: Dict[str, str], versions: Dict[str, int]) -> Dict[str, Any]:
+    return {"doc": doc, "fields": {field: [version, row.get(field, "")]
+                                   for field, version in versions.items()}}
+
+
+def cached_row(entry: Dict[str, Any], headers: Iterable[str]) -> Dict[str, str]:
+    fields = entry["fields"]
+    return {field: fields[field][1] if field in fields else "" for field in headers}
+
+
+class FieldCache:
+    """
+    Parent side: begin() a CSV run, put() recomputed entries and touch()
+    reused ones, then commit(prune=True) drops entries of documents the run
+    no longer saw. Nothing is visible to readers until commit().
+    Workers open the same file with readonly=True and only get().
+    """
+
+    def __init__(self, json_dir: str, readonly: bool = False):
+        self.json_dir = Path(json_dir)
+        self.path = self.json_dir / CACHE_NAME
+        self.generation = 0
+        if readonly:
+            self.conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=30,
+                                        check_same_thread=False) if self.path.exists() else None
+            return
+        self.json_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self.conn = self._open()
+        except sqlite3.DatabaseError as e:
+            # A broken cache only costs recomputing every field
+            print(f"[FIELDS] ⚠️ Replacing unreadable {self.path}: {e}")
+            self.path.unlink()
+            self.conn = self._open()
+        self._import_legacy()
+
+    def _open(self):
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(SCHEMA)
+        conn.commit()
+        return conn
+
+    def _import_legacy(self):
+        legacy = self.json_dir / LEGACY_CACHE_NAME
+        if not legacy.exists():
+            return
+        try:
+            with open(legacy, "rb") as f:
+                entries = loads(f.read())
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fields (name, doc, fields, generation) VALUES (?, ?, ?, 0)",
+                ((name, entry["doc"], dumps(entry["fields"])) for name, entry in entries.items())
+            )
+            self.conn.commit()
+            print(f"[FIELDS] Imported {len(entries):,} entries from {legacy.name}")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[FIELDS] ⚠️ Ignoring unreadable {legacy}: {e}")
+        legacy.unlink()
+
+    def __len__(self) -> int:
+        if self.conn is None:
+            return 0
+        return self.conn.execute("SELECT COUNT(*) FROM fields").fetchone()[0]
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        if self.conn is None:
+            return None
+        row = self.conn.execute("SELECT doc, fields FROM fields WHERE name = ?", (name,)).fetchone()
+        return {"doc": row[0], "fields": loads(row[1])} if row else None
+
+    def begin(self):
+        """Start a CSV run: entries it neither puts nor touches are pruned on commit."""
+        self.generation = self.conn.execute("SELECT COALESCE(MAX(generation), 0) + 1 FROM fields").fetchone()[0]
+
+    def put(self, name: str, entry: Dict[str, Any]):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fields (name, doc, fields, generation) VALUES (?, ?, ?, ?)",
+            (name, entry["doc"], dumps(entry["fields"]), self.generation)
+        )
+
+    def touch(self, names: List[str]):
+        self.conn.executemany("UPDATE fields SET generation = ? WHERE name = ?",
+                              ((self.generation, name) for name in names))
+
+    def commit(self, prune: bool = False) -> int:
+        """Make the run's entries visible; prune: drop the ones it did not see. Returns how many."""
+        pruned = 0
+        if prune:
+            pruned = self.conn.execute("DELETE FROM fields WHERE generation < ?", (self.generation,)).rowcount
+        self.conn.commit()
+        return pruned
+
+    def clear(self):
+        self.conn.execute("DELETE FROM fields")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
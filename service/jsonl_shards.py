@@ -0,0 +1,247 @@
+"""
+Phase 3: JSONL Shards
+Compact alternative to one pretty-printed JSON file per PDF: extraction
+records are appended, one per line, to rotating shard files next to the
+JSON files (data/JSON/contracts-000001.jsonl, ...). Tens of thousands of
+~28KB files become a handful of shards that stream line by line.
+
+Records are serialized without indentation (orjson when installed, else the
+json module) and their tables do not repeat text already in text_content:
+a table cell found in the text (or else each of its lines) is stored as the
+number of an (offset, length) span of the text. expand_record() restores
+the exact structure written to the JSON files.
+
+    with ShardWriter("data/JSON") as shards:
+        shard_path = shards.write(dumps(compact_record(json_data)))
+
+    for record in iter_shard(shard_path):
+        data = expand_record(record)
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SHARD_PREFIX = "contracts-"
+SHARD_SUFFIX = ".jsonl"
+SHARD_RE = re.compile(rf"^{SHARD_PREFIX}(\d+){re.escape(SHARD_SUFFIX)}$")
+SHARD_MAX_RECORDS = 2000
+SHARD_MAX_BYTES = 64 * 1024 * 1024
+
+# Lines shorter than this cost less stored literally than as a reference
+MIN_REF_LEN = 12
+
+def dumps(record: Dict[str, Any]) -> bytes:
+    """One JSONL line (with trailing newline) for a record."""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def loads(line: bytes) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+# --------------------------------------------------
+# TABLE CELLS AS TEXT REFERENCES
+# --------------------------------------------------
+def _find(text: str, piece: str, cursor: List[int]) -> int:
+    # Cells mostly follow the text order: look after the previous hit first
+    offset = text.find(piece, cursor[0])
+    if offset < 0:
+        offset = text.find(piece)
+    if offset >= 0:
+        cursor[0] = offset + len(piece)
+    return offset
+
+
+def _pack_table(text: str, table: Dict[str, Any], cursor: List[int]) -> Dict[str, Any]:
+    """
+    Table whose cells found in text are span numbers: cell k is
+    text[spans[2k]:spans[2k] + spans[2k + 1]]. Other cells become a list of
+    their lines, each a span number or the literal line.
+    """
+    spans: List[int] = []
+
+    def span(piece: str) -> Union[int, str]:
+        offset = _find(text, piece, cursor) if len(piece) >= MIN_REF_LEN else -1
+        if offset < 0:
+            return piece
+        spans.extend((offset, len(piece)))
+        return len(spans) // 2 - 1
+
+    rows = []
+    for row in table["data"]:
+        cells = []
+        for cell in row:
+            if cell:
+                packed = span(cell)
+                if packed.__class__ is str and "\n" in cell:
+                    packed = [span(line) for line in cell.split("\n")]
+                cells.append(packed)
+            else:
+                cells.append(cell)
+        rows.append(cells)
+    return dict(table, data=rows, spans=spans)
+
+
+def compact_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shard record for the JSON structure of one PDF (tables as text references)."""
+    text = json_data.get("text_content") or ""
+    cursor = [0]
+    record = dict(json_data)
+    record["tables"] = [_pack_table(text, table, cursor) for table in json_data.get("tables", [])]
+    record["table_cells"] = "spans"
+    return record
+
+
+def expand_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The JSON structure of one PDF, as written to data/JSON/*.json (expanded in place)."""
+    if record.pop("table_cells", None) != "spans":
+        return record
+    text = record.get("text_content") or ""
+    for table in record.get("tables", []):
+        spans = table.pop("spans")
+        pieces = [text[spans[i]:spans[i] + spans[i + 1]] for i in range(0, len(spans), 2)]
+        for row in table["data"]:
+            for i, cell in enumerate(row):
+                if cell.__class__ is int:
+                    row[i] = pieces[cell]
+                elif cell.__class__ is list:
+                    row[i] = "\n".join([pieces[seg] if seg.__class__ is int else seg for seg in cell])
+    return record
+
+
+# --------------------------------------------------
+# SHARD FILES
+# --------------------------------------------------
+def shard_paths(json_dir: str) -> List[Path]:
+    """Shards in write order."""
+    found = []
+    for path in Path(json_dir).glob(f"{SHARD_PREFIX}*{SHARD_SUFFIX}"):
+        match = SHARD_RE.match(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return [path for _, path in sorted(found)]
+
+
+def iter_shard_lines(path: Union[str, Path], start: int = 0,
+                     end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """(byte offset, raw line) of the non-blank lines of a shard, or of bytes [start, end)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            if end is not None and position >= end:
+                break
+            offset = position
+            position += len(line)
+            if line.strip():
+                yield offset, line
+
+
+def iter_shard(path: Union[str, Path], start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Compact records of a shard, or of its lines in bytes [start, end) (see
+    shard_chunks); a line cut short by an interrupted run is skipped.
+    """
+    for offset, line in iter_shard_lines(path, start, end):
+        try:
+            yield loads(line)
+        except ValueError:
+            print(f"[SHARD] ⚠️ Skipping unreadable line at byte {offset} of {path}")
+
+
+def shard_chunks(path: Union[str, Path], chunk_bytes: int) -> Iterator[Tuple[int, int]]:
+    """Byte ranges of about chunk_bytes covering a shard, split at line ends."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(size, start + max(1, chunk_bytes)))
+            f.readline()
+            end = min(size, f.tell())
+            yield start, end
+            start = end
+
+
+class ShardWriter:
+    """
+    Appends JSONL lines to data/JSON/contracts-NNNNNN.jsonl. Every writer
+    starts a new shard, rotated after max_records lines or max_bytes.
+    """
+
+    def __init__(self, json_dir: str, max_records: int = SHARD_MAX_RECORDS,
+                 max_bytes: int = SHARD_MAX_BYTES):
+        self.json_dir = Path(json_dir)
+        self.max_records = max(1, max_records)
+        self.max_bytes = max_bytes
+        existing = shard_paths(json_dir)
+        self._index = int(SHARD_RE.match(existing[-1].name).group(1)) if existing else 0
+        self._file = None
+        self.path: Optional[Path] = None
+        self.records = 0
+        self.bytes = 0
+        self.written: List[Path] = []
+
+    def _rotate(self):
+        self.close()
+        self._index += 1
+        self.json_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.json_dir / f"{SHARD_PREFIX}{self._index:06d}{SHARD_SUFFIX}"
+        self._file = open(self.path, "ab")
+        self.records = 0
+        self.bytes = 0
+        self.written.append(self.path)
+
+    def write(self, line: bytes) -> str:
+        """Append one line; returns the shard it went to."""
+        if self._file is None or self.records >= self.max_records or self.bytes >= self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        # Flushed per record: the manifest may be saved right after
+        self._file.flush()
+        self.records += 1
+        self.bytes += len(line)
+        return str(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prune_shards(json_dir: str, referenced: set) -> int:
+    """Delete shards no manifest entry points to any more; returns how many."""
+    removed = 0
+    for path in shard_paths(json_dir):
+        if path.name not in referenced:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def prune_superseded(json_dir: str, manifest) -> int:
+    """
+    After a run: delete shards whose every record was re-extracted since
+    (no entry of the ExtractManifest points to them any more).
+    """
+    pruned = prune_shards(json_dir, manifest.referenced())
+    if pruned:
+        print(f"🧹 Removed {pruned} superseded shard(s)")
+    return pruned
@@ -0,0 +1,259 @@
+"""
+Phase 3: PDF Extraction Engines
+Registry of interchangeable extraction backends. Every engine takes a PDF
+path or an in-memory/mmapped binary buffer (service/pdf_sources.py) and
+returns the same structure:
+
+    {"text_content": str, "tables": [{"page", "table_number", "data"}],
+     "metadata": {...}, "total_pages": int}
+
+so run_phase3_extract_pdf_v2.py can write the same JSON schema whichever
+engine is selected (--engine). pdfplumber is the reference (and slowest)
+engine; the others only read the text layer and are much faster.
+bench_pdf_engines.py compares them on the bundled corpus: on it every engine
+matches pdfplumber's bid_no and seller fields, and pymupdf also its
+unit_price (find_tables). pypdfium2, pdfminer and PyPDF2 return no tables,
+so unit_price is lost with them.
+"""
+
+import importlib.util
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from service.pdf_extractor import clean_english_text, clean_metadata, clean_table, extract_with_pdfplumber
+from service.pdf_regions import extract_with_regions
+
+
+class Engine:
+    def __init__(self, name: str, module: str, extract: Callable[..., Dict[str, Any]],
+                 tables: bool, description: str, page_ranges: bool = False):
+        self.name = name
+        self.module = module
+        self.extract = extract
+        self.tables = tables
+        self.description = description
+        # extract(pdf_path, page_range=(start, stop)) supported
+        self.page_ranges = page_ranges
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+
+ENGINES: Dict[str, Engine] = {}
+
+# Used when no engine is requested: reference first, then fastest
+DEFAULT_ORDER = ["pdfplumber", "pymupdf", "pypdfium2", "pdfminer", "PyPDF2"]
+
+# pdfminer joins chars closer than this many char widths into one line. The
+# default (2.0) splits "Company Name :" from its value into separate column
+# boxes; a wide margin keeps each printed row on one line, like pdfplumber.
+PDFMINER_CHAR_MARGIN = 100.0
+
+
+def register(name: str, module: str, tables: bool, description: str, page_ranges: bool = False):
+    def decorator(fn):
+        ENGINES[name] = Engine(name, module, fn, tables, description, page_ranges)
+        return fn
+    return decorator
+
+
+def get_engine(name: str) -> Engine:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF engine '{name}'. Choose from: {', '.join(ENGINES)}")
+
+
+def available_engines() -> List[str]:
+    return [name for name, engine in ENGINES.items() if engine.available]
+
+
+def default_engine() -> Optional[str]:
+    for name in DEFAULT_ORDER:
+        if name in ENGINES and ENGINES[name].available:
+            return name
+    return None
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {"text_content": "", "tables": [], "metadata": {}, "total_pages": 0}
+
+
+def _is_path(pdf) -> bool:
+    return isinstance(pdf, (str, os.PathLike))
+
+
+def _pdf_bytes(pdf) -> bytes:
+    """Whole PDF of a buffer, for libraries that only take bytes."""
+    if hasattr(pdf, "getvalue"):
+        return pdf.getvalue()
+    pdf.seek(0)
+    return pdf.read()
+
+
+@contextmanager
+def _binary_file(pdf):
+    """Binary file object for a path or a buffer."""
+    if _is_path(pdf):
+        with open(pdf, "rb") as fp:
+            yield fp
+    else:
+        pdf.seek(0)
+        yield pdf
+
+
+def _join_pages(page_texts) -> str:
+    parts = []
+    for text in page_texts:
+        if text:
+            clean_txt = clean_english_text(text)
+            if clean_txt:
+                parts.append(clean_txt)
+    return "\n".join(parts)
+
+
+# --------------------------------------------------
+# ENGINES
+# --------------------------------------------------
+register("pdfplumber", "pdfplumber", tables=True, page_ranges=True,
+         description="reference: full layout analysis, text + tables")(extract_with_pdfplumber)
+register("pdfplumber_regions", "pdfplumber", tables=True,
+         description="pdfplumber, tables only from the template's price band")(extract_with_regions)
+
+
+@register("pymupdf", "fitz", tables=True, page_ranges=True,
+          description="MuPDF text layer, tables via find_tables()")
+def extract_with_pymupdf(pdf_path: str, page_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    """Extract PDF content using PyMuPDF."""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    result = _empty_result()
+    page_texts = []
+    try:
+        doc = pymupdf.open(pdf_path) if _is_path(pdf_path) else \
+            pymupdf.open(stream=_pdf_bytes(pdf_path), filetype="pdf")
+        with doc:
+            result["total_pages"] = doc.page_count
+            # MuPDF uses lowercase keys; match pdfplumber's ('Creator', ...)
+            result["metadata"] = clean_metadata({
+                key[:1].upper() + key[1:]: value for key, value in (doc.metadata or {}).items()
+                if key != "format"
+            })
+            start, stop = page_range or (0, doc.page_count)
+            stop = min(stop, doc.page_count)
+            if page_range:
+                result["page_range"] = [start, stop]
+            for page_num in range(start + 1, stop + 1):
+                page = doc[page_num - 1]
+                # sort: reading order, so each label shares a line with its value (as in pdfplumber)
+                page_texts.append(page.get_text("text", sort=True))
+                if hasattr(page, "find_tables"):
+                    for table_num, table in enumerate(page.find_tables().tables, start=1):
+                        clean = clean_table(table.extract())
+                        if clean:
+                            result["tables"].append({
+                                "page": page_num, "table_number": table_num, "data": clean
+                            })
+    except Exception as e:
+        print(f"Error with PyMuPDF on {pdf_path}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["text_content"] = _join_pages(page_texts)
+    return result
+
+
+@register("pypdfium2", "pypdfium2", tables=False,
+          description="PDFium text layer only (no tables)")
+def extract_with_pypdfium2(pdf_path: str) -> Dict[str, Any]:
+    """Extract PDF text using pypdfium2."""
+    import pypdfium2 as pdfium
+    result = _empty_result()
+    page_texts = []
+    try:
+        pdf = pdfium.PdfDocument(pdf_path if _is_path(pdf_path) else _pdf_bytes(pdf_path))
+        try:
+            result["total_pages"] = len(pdf)
+            result["metadata"] = clean_metadata(pdf.get_metadata_dict(skip_empty=True))
+            for index in range(len(pdf)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                # PDFium ends lines with \r\n
+                page_texts.append(textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n"))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    except Exception as e:
+        print(f"Error with pypdfium2 on {pdf_path}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["text_content"] = _join_pages(page_texts)
+    return result
+
+
+@register("pdfminer", "pdfminer", tables=False,
+          description="pdfminer.six, one line per printed row (no tables)")
+def extract_with_pdfminer(pdf_path: str) -> Dict[str, Any]:
+    """Extract PDF text using pdfminer.six."""
+    from io import StringIO
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.utils import decode_text
+
+    result = _empty_result()
+    page_texts = []
+    try:
+        with _binary_file(pdf_path) as fp:
+            document = PDFDocument(PDFParser(fp))
+            info = document.info[0] if document.info else {}
+            result["metadata"] = clean_metadata({
+                key: decode_text(value) if isinstance(value, bytes) else value
+                for key, value in info.items()
+            })
+
+            rsrcmgr = PDFResourceManager(caching=True)
+            for page in PDFPage.create_pages(document):
+                out = StringIO()
+                # Layout analysis groups chars into lines; without it a page has no line breaks
+                device = TextConverter(rsrcmgr, out, laparams=LAParams(char_margin=PDFMINER_CHAR_MARGIN))
+                PDFPageInterpreter(rsrcmgr, device).process_page(page)
+                device.close()
+                page_texts.append(out.getvalue())
+                result["total_pages"] += 1
+    except Exception as e:
+        print(f"Error with pdfminer on {pdf_path}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["text_content"] = _join_pages(page_texts)
+    return result
+
+
+@register("PyPDF2", "PyPDF2", tables=False,
+          description="pure-Python fallback (no tables)")
+def extract_with_pypdf2(pdf_path: str) -> Dict[str, Any]:
+    """Extract PDF content using PyPDF2 library."""
+    import PyPDF2
+    result = _empty_result()
+    try:
+        with _binary_file(pdf_path) as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            result["total_pages"] = len(pdf_reader.pages)
+            # Extract metadata
+            if pdf_reader.metadata:
+                result["metadata"] = clean_metadata({
+                    key.replace('/', ''): value for key, value in pdf_reader.metadata.items()
+                })
+            # Extract text from all pages
+            result["text_content"] = _join_pages(page.extract_text() for page in pdf_reader.pages)
+    except Exception as e:
+        print(f"Error with PyPDF2 on {pdf_path}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
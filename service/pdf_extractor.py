@@ -0,0 +1,132 @@
+"""
+Phase 3: Shared PDF Extraction
+Single-pass pdfplumber extractor used by both run_phase3_extract_pdf.py and
+run_phase3_extract_pdf_v2.py. Each PDF is opened once and each page is
+visited once: text and tables come from the same parsed page layout (both
+read page.chars, parsed a single time), and the page's object cache is
+released before moving on, so peak memory is one page rather than the whole
+document.
+
+GeM contracts draw bold text twice at the same position (faux bold), which
+used to come out as "CCoonnttrraacctt NNoo". Overlapping duplicate chars are
+dropped (page.dedupe_chars()) before words are built, and the result carries
+"char_dedupe": True so downstream parsing can skip the doubled-letter
+variants.
+"""
+
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Tuple
+
+from service.text_normalize import clean_english_text, is_english_text, strip_cid
+
+
+def clean_metadata(metadata: Optional[Dict]) -> Dict[str, str]:
+    """Keep only metadata values with English content."""
+    result = {}
+    for key, value in (metadata or {}).items():
+        if value:
+            str_val = str(value)
+            if is_english_text(str_val):
+                result[key] = clean_english_text(str_val)
+    return result
+
+
+def clean_table(table: List[List[Optional[str]]]) -> List[List[str]]:
+    """English-only cells; rows without any content are dropped."""
+    clean_rows = []
+    for row in table:
+        clean_row = []
+        for cell in row:
+            if cell:
+                cell_text = strip_cid(str(cell)).strip()
+                if is_english_text(cell_text):
+                    clean_row.append(clean_english_text(cell_text))
+                else:
+                    clean_row.append("")
+            else:
+                clean_row.append("")
+        if any(clean_row):
+            clean_rows.append(clean_row)
+    return clean_rows
+
+
+def _release_page(page) -> None:
+    # Page.close() (pdfplumber >= 0.10) drops the cached layout objects
+    close = getattr(page, "close", None) or page.flush_cache
+    close()
+
+
+def dedupe_chars(chars: List[Dict[str, Any]], tolerance: float = 1) -> List[Dict[str, Any]]:
+    """
+    Same chars as pdfplumber.utils.dedupe_chars(): one char per cluster of
+    equal (upright, text, fontname, size) within `tolerance` on doctop and x0,
+    in the original order. pdfplumber restores that order with
+    sorted(key=chars.index), which is quadratic and cost more than the whole
+    page parse here; an index map does it in linear time.
+    """
+    from pdfplumber.utils import cluster_objects
+    key = itemgetter("upright", "text", "fontname", "size")
+    pos_key = itemgetter("doctop", "x0")
+    order = {id(char): i for i, char in enumerate(chars)}
+
+    unique = []
+    for _, group in groupby(sorted(chars, key=key), key=key):
+        for y_cluster in cluster_objects(list(group), itemgetter("doctop"), tolerance):
+            for x_cluster in cluster_objects(y_cluster, itemgetter("x0"), tolerance):
+                unique.append(min(x_cluster, key=pos_key))
+    unique.sort(key=lambda char: order[id(char)])
+    return unique
+
+
+def dedupe_page(page):
+    """Page view without overprinted duplicate glyphs."""
+    keep = {id(char) for char in dedupe_chars(page.chars)}
+    return page.filter(lambda obj: obj["object_type"] != "char" or id(obj) in keep)
+
+
+def extract_page(page, page_num: int, dedupe: bool = True) -> Dict[str, Any]:
+    """Text and tables of one page from a single layout parse."""
+    if dedupe:
+        page = dedupe_page(page)
+    text = page.extract_text()
+    tables = []
+    for table_num, table in enumerate(page.extract_tables(), start=1):
+        clean = clean_table(table)
+        if clean:
+            tables.append({"page": page_num, "table_number": table_num, "data": clean})
+    return {"text": clean_english_text(text) if text else "", "tables": tables}
+
+
+def extract_with_pdfplumber(pdf_path: str, page_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    """
+    Extract text, tables and metadata in one pass over the document.
+    page_range: (start, stop) 0-based page slice; total_pages stays the
+    document's page count and table page numbers stay absolute.
+    """
+    import pdfplumber
+    result = {"text_content": "", "tables": [], "metadata": {}, "total_pages": 0, "char_dedupe": True}
+    text_parts = []
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            result["total_pages"] = len(pdf.pages)
+            result["metadata"] = clean_metadata(pdf.metadata)
+
+            start, stop = page_range or (0, len(pdf.pages))
+            if page_range:
+                result["page_range"] = [start, min(stop, len(pdf.pages))]
+            for page_num, page in enumerate(pdf.pages[start:stop], start=start + 1):
+                try:
+                    extracted = extract_page(page, page_num)
+                finally:
+                    _release_page(page)
+                if extracted["text"]:
+                    text_parts.append(extracted["text"])
+                result["tables"].extend(extracted["tables"])
+    except Exception as e:
+        print(f"Error with pdfplumber on {pdf_path}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        # Keep whatever was extracted before an error
+        result["text_content"] = "\n".join(text_parts)
+    return result
@@ -0,0 +1,188 @@
+"""
+Phase 3: Template-Aware Region Extraction
+Every GeM contract PDF is rendered from the same wkhtmltopdf template, so the
+page is a fixed sequence of section headings (Buyer Details, Seller Details,
+Product Details, ..., Total Order Value). Instead of running pdfplumber's table
+detection over every page, this extractor:
+
+  1. fingerprints the template (Creator/Producer metadata + page size),
+  2. locates the section headings with one regex search per page, and
+  3. runs extract_tables() only inside the Product Details -> Total Order
+     Value band, which is where the price table is.
+
+Text extraction is unchanged (full page), so text_content matches the
+reference engine. The block positions found are returned as "regions" so
+field extraction can target them.
+
+The layout is chosen by the Creator metadata (TemplateLayout.matches) and
+the choice is remembered per fingerprint in each worker. Heading order and
+positions are not learned: the headings are searched again in every
+document. A fingerprint is only remembered as unknown when its Creator
+matches no layout, or when a document that extracted cleanly and has text
+shows none of the layout's headings; an error or an empty document decides
+nothing. Unknown templates (and any document where the price band is not
+found) fall back to full-page extraction.
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from service.pdf_extractor import clean_english_text, clean_metadata, clean_table, \
+    dedupe_page, extract_with_pdfplumber, _release_page
+
+
+def _heading_pattern(title: str) -> str:
+    # Headings are drawn twice ("SSeelllleerr DDeettaaiillss") unless the chars
+    # were deduped: allow each glyph once or twice and any spacing between words
+    return r"\s*".join("".join(re.escape(c) + "{1,2}" for c in word) for word in title.split())
+
+
+class TemplateLayout:
+    """Section headings of one PDF template, in reading order."""
+
+    def __init__(self, name: str, creator: str, headings: Dict[str, str],
+                 price_region: Tuple[str, str]):
+        self.name = name
+        self.creator = creator
+        self.headings = headings
+        self.price_start, self.price_end = price_region
+        self.pattern = re.compile("|".join(
+            f"(?P<{key}>{_heading_pattern(title)})" for key, title in headings.items()
+        ))
+
+    def matches(self, metadata: Dict[str, Any]) -> bool:
+        return str(metadata.get("Creator", "")).startswith(self.creator)
+
+
+GEM_CONTRACT_LAYOUT = TemplateLayout(
+    name="gem-contract",
+    creator="wkhtmltopdf",
+    headings={
+        "buyer": "Buyer Details",
+        "seller": "Seller Details",
+        "product": "Product Details",
+        "total": "Total Order Value",
+        "consignee": "Consignee Detail",
+    },
+    price_region=("product", "total"),
+)
+
+LAYOUTS = [GEM_CONTRACT_LAYOUT]
+
+# Blocks reported in "regions"
+REGION_BLOCKS = ("buyer", "seller", "product")
+
+# fingerprint -> layout, or None once a fingerprint is confirmed not to match.
+# Per process: each worker remembers the layout choice for a fingerprint.
+_LEARNED: Dict[Tuple, Optional[TemplateLayout]] = {}
+
+
+def fingerprint(pdf) -> Tuple:
+    """Template identity: producing software and page size."""
+    metadata = pdf.metadata or {}
+    first = pdf.pages[0] if pdf.pages else None
+    size = (round(first.width), round(first.height)) if first is not None else (0, 0)
+    return (str(metadata.get("Creator", "")), str(metadata.get("Producer", ""))) + size
+
+
+def find_headings(page, layout: TemplateLayout) -> List[Dict[str, Any]]:
+    """Section headings on a page, top to bottom."""
+    headings = []
+    for match in page.search(layout.pattern, regex=True, return_chars=False):
+        key = layout.pattern.fullmatch(match["text"])
+        if key:
+            headings.append({"key": key.lastgroup, "x0": match["x0"],
+                             "top": match["top"], "bottom": match["bottom"]})
+    headings.sort(key=lambda h: (h["top"], h["x0"]))
+    return headings
+
+
+def block_bboxes(page, headings: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """Each block runs from its heading down to the next heading row."""
+    bboxes = {}
+    for i, heading in enumerate(headings):
+        if heading["key"] not in REGION_BLOCKS:
+            continue
+        below = [h["top"] for h in headings[i + 1:] if h["top"] > heading["bottom"]]
+        # Headings right of the middle start the page's second column
+        x0 = page.width / 2 if heading["x0"] > page.width / 2 else 0
+        bboxes[heading["key"]] = [round(x0, 2), round(heading["top"], 2),
+                                  round(page.width, 2), round(below[0] if below else page.height, 2)]
+    return bboxes
+
+
+def extract_with_regions(pdf_path: str) -> Dict[str, Any]:
+    """Full-page text, tables only from the price band of a known template."""
+    import pdfplumber
+    result = {"text_content": "", "tables": [], "metadata": {}, "total_pages": 0,
+              "char_dedupe": True, "regions": {}}
+    text_parts = []
+    found_price = False
+    found_headings = False
+    layout = None
+    key = None
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            result["total_pages"] = len(pdf.pages)
+            result["metadata"] = clean_metadata(pdf.metadata)
+
+            key = fingerprint(pdf)
+            if key in _LEARNED:
+                layout = _LEARNED[key]
+            else:
+                layout = next((l for l in LAYOUTS if l.matches(pdf.metadata or {})), None)
+            if layout is None:
+                _LEARNED[key] = None
+                return extract_with_pdfplumber(pdf_path)
+
+            in_price = False
+            for page_num, page in enumerate(pdf.pages, start=1):
+                try:
+                    view = dedupe_page(page)
+                    text = view.extract_text()
+                    if text:
+                        clean_txt = clean_english_text(text)
+                        if clean_txt:
+                            text_parts.append(clean_txt)
+
+                    headings = find_headings(view, layout)
+                    found_headings = found_headings or bool(headings)
+                    for block, bbox in block_bboxes(view, headings).items():
+                        result["regions"].setdefault(block, {"page": page_num, "bbox": bbox})
+
+                    # Price band may continue onto the next page
+                    top, bottom = (0, None) if in_price else (None, None)
+                    for heading in headings:
+                        if heading["key"] == layout.price_start and top is None:
+                            top, in_price = heading["top"], True
+                        elif heading["key"] == layout.price_end and in_price:
+                            bottom, in_price = heading["bottom"], False
+                    if top is None:
+                        continue
+
+                    found_price = True
+                    band = view.crop((0, top, view.width, bottom if bottom is not None else view.height))
+                    for table_num, table in enumerate(band.extract_tables(), start=1):
+                        clean = clean_table(table)
+                        if clean:
+                            result["tables"].append({"page": page_num, "table_number": table_num, "data": clean})
+                finally:
+                    _release_page(page)
+    except Exception as e:
+        print(f"Error with pdfplumber_regions on {pdf_path}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["text_content"] = "\n".join(text_parts)
+
+    if key is not None and key not in _LEARNED and layout is not None:
+        if found_price:
+            _LEARNED[key] = layout
+        elif "error" not in result and text_parts and not found_headings:
+            # Clean document with text but none of the headings: not this template
+            _LEARNED[key] = None
+    if layout is not None and not found_price:
+        # Layout did not hold for this document
+        fallback = extract_with_pdfplumber(pdf_path)
+        fallback["regions"] = result["regions"]
+        return fallback
+    return result
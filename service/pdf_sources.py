@@ -0,0 +1,125 @@
+"""
+Phase 3: PDF Sources
+Extraction input can be any mix of directories, single PDFs and ZIP archives
+(e.g. data/ContractPDF.zip), so archived months are re-processed without
+unzipping them first.
+
+Each PDF is identified by a picklable reference string handed to worker
+processes:
+
+    data/scrapped/GEMC-1.pdf                       plain file
+    data/ContractPDF.zip!ContractPDF/GEMC-1.pdf    ZIP member
+
+open_source(ref) yields a read-only binary buffer for the engines: plain
+files are memory-mapped, ZIP members are decompressed straight into memory.
+No temp files are written. Each process keeps its ZIP archives open, so a
+worker reads an archive's central directory once, not once per member.
+"""
+
+import io
+import mmap
+import os
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+ZIP_MEMBER_SEP = "!"
+
+# (pid, archive path, mtime_ns) -> open ZipFile. Keyed by pid so forked
+# workers never share the parent's file offset.
+_ARCHIVES: Dict[Tuple[int, str, int], zipfile.ZipFile] = {}
+
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    """(archive, member) for a ZIP member reference, (path, "") otherwise."""
+    archive, sep, member = ref.partition(ZIP_MEMBER_SEP)
+    if sep and archive.lower().endswith(".zip") and os.path.isfile(archive):
+        return archive, member
+    return ref, ""
+
+
+def source_name(ref: str) -> str:
+    """File name of the PDF (GEMC-123.pdf), wherever it lives."""
+    archive, member = split_ref(ref)
+    return os.path.basename(member or archive)
+
+
+def _archive(path: str) -> zipfile.ZipFile:
+    key = (os.getpid(), os.path.abspath(path), os.stat(path).st_mtime_ns)
+    zf = _ARCHIVES.get(key)
+    if zf is None:
+        # Handles inherited from the parent, or of an archive replaced on disk
+        for old in [k for k in _ARCHIVES if k[1] == key[1]]:
+            stale = _ARCHIVES.pop(old)
+            if old[0] == key[0]:
+                stale.close()
+        zf = _ARCHIVES[key] = zipfile.ZipFile(path)
+    return zf
+
+
+def iter_sources(inputs: Iterable[str]) -> Iterator[str]:
+    """References of every PDF in the given directories, PDFs and ZIP archives."""
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for pdf in sorted(path.glob("*.pdf")):
+                yield str(pdf)
+        elif path.suffix.lower() == ".zip" and path.is_file():
+            for info in _archive(str(path)).infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield f"{path}{ZIP_MEMBER_SEP}{info.filename}"
+        elif path.suffix.lower() == ".pdf" and path.is_file():
+            yield str(path)
+        else:
+            print(f"[SOURCE] ⚠️ Skipping {item}: not a directory, PDF or ZIP archive")
+
+
+def list_sources(inputs: Iterable[str]) -> List[str]:
+    return list(iter_sources(inputs))
+
+
+def source_stat(ref: str) -> Dict[str, int]:
+    """
+    Cheap change stamp, read without touching the PDF's bytes: size and
+    mtime for files, size and the stored CRC-32 for ZIP members.
+    """
+    archive, member = split_ref(ref)
+    if member:
+        info = _archive(archive).getinfo(member)
+        return {"size": info.file_size, "crc32": info.CRC}
+    stat = os.stat(archive)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_chunks(ref: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Stream the PDF's bytes (for hashing)."""
+    archive, member = split_ref(ref)
+    opener = _archive(archive).open(member) if member else open(archive, "rb")
+    with opener as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield chunk
+
+
+@contextmanager
+def open_source(ref: str):
+    """Read-only binary buffer (mmap or BytesIO) with the PDF's bytes."""
+    archive, member = split_ref(ref)
+    if member:
+        buffer = io.BytesIO(_archive(archive).read(member))
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+        return
+
+    with open(archive, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map empty files; let the engine report it
+            yield io.BytesIO(b"")
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
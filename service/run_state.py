@@ -0,0 +1,220 @@
+"""
+Pipeline Run State
+Durable record of what a pipeline run has finished, so a run that crashed
+or was interrupted picks up where it stopped instead of starting over at
+category 1. Kept in a local SQLite file (data/run_state.sqlite), so it works
+before MySQL is reachable and across the separate phase processes.
+
+Every run has an id; completion is recorded per (kind, key, stage):
+
+    ("phase",    "phase1",               "done")
+    ("category", "Laptop - Notebook",    "scraped")
+    ("bid",      "GEM/2025/B/1234567",   "downloaded")
+
+Opening a pipeline resumes its latest run if that run never finished and
+covers the same scope (Phase 1's date window, see phase1_window), so already
+completed phases and categories are skipped. An unfinished run for another
+window is marked abandoned; a finished (or --fresh) run starts a new id.
+Per-document Phase 3 progress is kept by the extraction manifest
+(data/JSON/.manifest.json).
+
+Outside of runs, run_daemon.py keeps a contract_date watermark per category:
+the date up to which the category has been scraped, so each poll only asks
+for contracts from that date on.
+"""
+
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+
+RUN_STATE_PATH = Path(__file__).resolve().parents[1] / "data" / "run_state.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    pipeline    TEXT NOT NULL,
+    status      TEXT NOT NULL,          -- running | completed | failed | abandoned
+    scope       TEXT,                   -- what the run covers, e.g. "2026-10-01..2026-10-19"
+    started_at  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_runs_pipeline ON runs (pipeline, started_at);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id      TEXT NOT NULL,
+    kind        TEXT NOT NULL,          -- phase | category | bid | ...
+    item        TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    status      TEXT NOT NULL,          -- done | failed
+    detail      TEXT,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (run_id, kind, item, stage)
+);
+CREATE TABLE IF NOT EXISTS category_watermarks (
+    category       TEXT PRIMARY KEY,
+    contract_date  TEXT,                -- scraped up to this contract date (NULL: never succeeded)
+    polled_at      TEXT NOT NULL        -- last poll attempt
+);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def phase1_window(today=None):
+    """
+    Scope of a scraping run: the date window Phase 1 searches by default
+    (ContractsController.set_date_filter), 1st of the month → today.
+    """
+    to_date = today or date.today()
+    return f"{to_date.replace(day=1).isoformat()}..{to_date.isoformat()}"
+
+
+def new_run_id(pipeline):
+    return f"{pipeline}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class RunState:
+    def __init__(self, path=RUN_STATE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: every mark() is durable on its own
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if "scope" not in {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}:
+            # Files created before runs had a scope
+            self.conn.execute("ALTER TABLE runs ADD COLUMN scope TEXT")
+        self._lock = threading.Lock()
+        self.run_id = None
+
+    # --------------------------------------------------
+    # RUNS
+    # --------------------------------------------------
+    def open_run(self, pipeline, run_id=None, resume=True, scope=None):
+        """
+        Attach to run_id, else (resume) to the latest unfinished run of the
+        pipeline if it has the same scope, else start a new run with this
+        scope. Unfinished runs of other scopes are marked abandoned: their
+        completed stages do not hold for this scope. Returns the run id.
+        """
+        with self._lock:
+            if run_id is None and resume:
+                stale = self.conn.execute(
+                    "SELECT run_id, scope FROM runs WHERE pipeline = ? AND status = 'running' "
+                    "AND scope IS NOT ?", (pipeline, scope)
+                ).fetchall()
+                for old_id, old_scope in stale:
+                    self.conn.execute("UPDATE runs SET status = 'abandoned', updated_at = ? WHERE run_id = ?",
+                                      (_now(), old_id))
+                    print(f"[RUN] 🗑️ Abandoned unfinished run {old_id} (scope {old_scope}, now {scope})")
+                row = self.conn.execute(
+                    "SELECT run_id FROM runs WHERE pipeline = ? AND status = 'running' AND scope IS ? "
+                    "ORDER BY started_at DESC, rowid DESC LIMIT 1", (pipeline, scope)
+                ).fetchone()
+                run_id = row[0] if row else None
+
+            if run_id is not None and self.conn.execute(
+                    "SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone():
+                self.conn.execute("UPDATE runs SET status = 'running', updated_at = ? WHERE run_id = ?",
+                                  (_now(), run_id))
+                done = self.conn.execute(
+                    "SELECT COUNT(*) FROM stages WHERE run_id = ? AND status = 'done'", (run_id,)
+                ).fetchone()[0]
+                print(f"[RUN] ▶️ Resuming run {run_id} ({done} stage(s) already done)")
+            else:
+                run_id = run_id or new_run_id(pipeline)
+                self.conn.execute(
+                    "INSERT INTO runs (run_id, pipeline, status, scope, started_at, updated_at) "
+                    "VALUES (?, ?, 'running', ?, ?, ?)", (run_id, pipeline, scope, _now(), _now())
+                )
+                print(f"[RUN] 🆕 Run {run_id}" + (f" ({scope})" if scope else ""))
+            self.run_id = run_id
+        return run_id
+
+    def finish(self, status="completed"):
+        """Close the run; the next open_run() of the pipeline starts a new one."""
+        with self._lock:
+            self.conn.execute("UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                              (status, _now(), self.run_id))
+
+    # --------------------------------------------------
+    # STAGES
+    # --------------------------------------------------
+    def is_done(self, kind, item, stage):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM stages WHERE run_id = ? AND kind = ? AND item = ? AND stage = ? "
+                "AND status = 'done'", (self.run_id, kind, item, stage)
+            ).fetchone() is not None
+
+    def mark(self, kind, item, stage, status="done", detail=None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO stages (run_id, kind, item, stage, status, detail, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, kind, item, stage) DO UPDATE SET "
+                "status = excluded.status, detail = excluded.detail, updated_at = excluded.updated_at",
+                (self.run_id, kind, item, stage, status, None if detail is None else str(detail), _now())
+            )
+            self.conn.execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (_now(), self.run_id))
+
+    # --------------------------------------------------
+    # CATEGORY WATERMARKS (run_daemon.py)
+    # --------------------------------------------------
+    def watermarks(self):
+        """{category: (contract_date or None, polled_at)} of every polled category."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT category, contract_date, polled_at FROM category_watermarks"
+            ).fetchall()
+        return {category: (date.fromisoformat(covered) if covered else None,
+                           datetime.fromisoformat(polled_at))
+                for category, covered, polled_at in rows}
+
+    def record_poll(self, category, contract_date=None):
+        """Note a poll of category; a successful one moves its watermark to contract_date."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO category_watermarks (category, contract_date, polled_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (category) DO UPDATE SET polled_at = excluded.polled_at, "
+                "contract_date = COALESCE(excluded.contract_date, category_watermarks.contract_date)",
+                (category, contract_date.isoformat() if contract_date else None, _now())
+            )
+
+    # --------------------------------------------------
+    # REPORTING
+    # --------------------------------------------------
+    def summary(self, run_id=None):
+        """{(kind, stage, status): count} of a run (default: the open one)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT kind, stage, status, COUNT(*) FROM stages WHERE run_id = ? "
+                "GROUP BY kind, stage, status", (run_id or self.run_id,)
+            ).fetchall()
+        return {(kind, stage, status): count for kind, stage, status, count in rows}
+
+    def recent_runs(self, limit=10):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT run_id, pipeline, status, scope, started_at, updated_at FROM runs "
+                "ORDER BY started_at DESC, rowid DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def print_status(self, limit=10):
+        runs = self.recent_runs(limit)
+        if not runs:
+            print("[RUN] No runs recorded yet")
+            return
+        for run_id, pipeline, status, scope, started_at, updated_at in runs:
+            print(f"[RUN] {run_id}  {status:<9}  {scope or '-'}  started {started_at}  last update {updated_at}")
+            for (kind, stage, stage_status), count in sorted(self.summary(run_id).items()):
+                print(f"        {kind:<9} {stage:<11} {stage_status:<6} {count}")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,55 @@
+"""
+Seen-Bid Index
+In-memory set of the bid_nos Phase 1 has scraped in this run. The same
+contract is listed under many overlapping categories; with this index a
+repeat sighting is recorded as a (bid_no, category) link instead of reading
+and upserting the contract row again.
+
+By default the set starts empty, so the first sighting of a bid in every
+run refreshes its listing columns (order_status, ...) through the upsert.
+preload=True also loads every bid_no already stored in `contracts`: faster
+reruns, but the listing columns of known contracts are then never refreshed.
+
+A plain set is exact and small enough here (~100 bytes per bid, ~100 MB per
+million contracts), so no Bloom filter false positives to deal with.
+"""
+
+import threading
+
+from service.database import get_db
+
+
+class SeenBidIndex:
+    def __init__(self, db=None, preload=False):
+        self.db = db or get_db()
+        self._bids = set()
+        self._lock = threading.Lock()
+        if preload:
+            self.load()
+
+    def load(self):
+        rows = self.db.fetchall(
+            "SELECT bid_no FROM contracts WHERE bid_no IS NOT NULL", dictionary=False
+        )
+        with self._lock:
+            self._bids = {bid for (bid,) in rows}
+        print(f"[SEEN] Loaded {len(self._bids)} known bid(s)")
+
+    def reset(self):
+        """Forget this run's bids (run_daemon.py: every poll cycle refreshes listings)."""
+        with self._lock:
+            self._bids = set()
+
+    def add(self, bid_no):
+        """Record a bid. Returns True the first time it is seen."""
+        with self._lock:
+            if bid_no in self._bids:
+                return False
+            self._bids.add(bid_no)
+            return True
+
+    def __contains__(self, bid_no):
+        return bid_no in self._bids
+
+    def __len__(self):
+        return len(self._bids)
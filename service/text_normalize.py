@@ -0,0 +1,72 @@
+"""
+Phase 3: Text Normalization
+English-only text filtering shared by every extraction engine. Regexes and
+translate tables are built once at import, and lines that are pure ASCII
+(most of them) skip the per-character checks entirely:
+
+  - strip_cid()          drops "(cid:34)"-style tokens left by unmapped glyphs
+  - is_english_text()    > 70% of word/space characters are ASCII alnum/space
+  - clean_english_text() keeps English lines, blanks non-ASCII, collapses spaces
+
+is_english_text() gives exactly the same answer as the original
+regex + ord(c) < 128 loop; bench_text_normalize.py checks that and times
+both over the bundled JSON corpus.
+"""
+
+import re
+
+CID_RE = re.compile(r'\(cid:\d+\)')
+NON_WORD_RE = re.compile(r'[^\w\s]')
+NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+# ASCII chars that are neither \w nor \s (what NON_WORD_RE removes)
+_ASCII_NON_WORD = str.maketrans("", "", "".join(
+    chr(i) for i in range(128) if not (chr(i).isalnum() or chr(i).isspace() or chr(i) == "_")
+))
+
+ENGLISH_RATIO = 0.7
+
+
+def strip_cid(text: str) -> str:
+    """Remove (cid:N) tokens."""
+    if "(cid:" not in text:
+        return text
+    return CID_RE.sub("", text)
+
+
+def is_english_text(text: str) -> bool:
+    """Check if text contains primarily English characters."""
+    if not text or not text.strip():
+        return False
+    if text.isascii():
+        # Every remaining char is ASCII: only '_' is \w without being alnum
+        cleaned = text.translate(_ASCII_NON_WORD)
+        if not cleaned:
+            return False
+        english_chars = len(cleaned) - cleaned.count("_")
+    else:
+        # Remove whitespace and special characters for analysis
+        cleaned = NON_WORD_RE.sub("", text)
+        if not cleaned:
+            return False
+        # ASCII chars left are letters, digits, '_' or whitespace
+        english_chars = len(cleaned.encode("ascii", "ignore")) - cleaned.count("_")
+    # If more than 70% are English characters, consider it English
+    return (english_chars / len(cleaned)) > ENGLISH_RATIO
+
+
+def clean_english_text(text: str) -> str:
+    """Clean text by removing CID tokens, Hindi and non-English content."""
+    if not text:
+        return ""
+    english_lines = []
+    for line in strip_cid(text).split("\n"):
+        line = line.strip()
+        if line and is_english_text(line):
+            if not line.isascii():
+                # Remove any remaining non-ASCII characters
+                line = NON_ASCII_RE.sub(" ", line)
+            clean_line = " ".join(line.split())  # Normalize whitespace
+            if clean_line:
+                english_lines.append(clean_line)
+    return "\n".join(english_lines)
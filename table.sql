@@ -19,5 +19,8 @@ CREATE TABLE contracts (
     contract_date VARCHAR(100),
     order_status VARCHAR(100),
     download_link TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_contracts_bid_no (bid_no)
+) ENGINE=InnoDB;
+
+-- Existing MyISAM tables without the unique key: SQL/migrations/001_contracts_unique_bid_no.sql